@@ -1,30 +1,348 @@
 """Calculate the JSON source map."""
 
-import json
+import time
+import typing
 
-from . import errors, handle, types
+from . import (
+    check,
+    constants,
+    encoding,
+    errors,
+    handle,
+    scanner,
+    structural,
+    tree,
+    types,
+)
+from .diff import calculate as diff
+from .events import Visitor, walk
+from .export import dump_pointers, dumps_pointers, to_numpy
+from .follow import follow
+from .lazy import calculate as calculate_lazy
+from .lenient import calculate as calculate_lenient
+from .parallel import calculate as calculate_parallel
+from .parallel import calculate_many
+from .query import lookup_paths, query
+from .scanner import Checkpoint, Scanner
+from .shared import SharedSourceMap, attach, publish
+from .stream import calculate_file, calculate_stream
+from .structural import calculate as calculate_indexed
+from .viewport import ViewportIndex
 
+# The number of events between checks of max_seconds while checking a document
+_CHECK_INTERVAL = 1024
+
+
+def _valid_within_budget(
+    *, source: str, start: int, end: int, budget: types.Budget
+) -> None:
+    """
+    Check that the JSON document is valid within the budget.
+
+    The document is scanned without recursion or decoding its values and the
+    memory is estimated from the arrays and objects the scan is within. Values can
+    only be skipped once the whole document has been checked, which means that
+    BudgetExceededError is raised when the budget runs out while checking, even
+    when truncating.
+
+    Args:
+        source: The text that contains the JSON document.
+        start: The position of the start of the JSON document.
+        end: The position just after the end of the JSON document.
+        budget: The budget of the calculation.
 
-def calculate(source: str) -> types.TSourceMap:
+    """
+    check.valid_range(source=source, start=start, end=end)
+    depths = scanner.scan_depths(structural.tokens(source, start, end))
+    for count, (position, depth) in enumerate(depths, start=1):
+        if (
+            budget.max_memory is not None
+            and depth * budget.CONTAINER_BYTES > budget.max_memory
+        ):
+            raise errors.BudgetExceededError(
+                f"max_memory of {budget.max_memory} bytes exceeded while checking, "
+                f"position={position}"
+            )
+        if (
+            count % _CHECK_INTERVAL == 0
+            and budget.deadline is not None
+            and time.monotonic() >= budget.deadline
+        ):
+            raise errors.BudgetExceededError(
+                f"max_seconds exceeded while checking, position={position}"
+            )
+
+
+def _document(
+    source: str,
+    *,
+    options: types.Options,
+    start: typing.Optional[int] = None,
+    base: typing.Optional[types.Location] = None,
+) -> typing.Tuple[str, types.Location, int]:
+    """
+    Check the source and locate the JSON document within it.
+
+    Args:
+        source: The JSON document or the text that contains it.
+        options: The options for calculating the source map.
+        start: The position of the start of the JSON document within the source in
+            the units.
+        base: The location of the start of the JSON document within the source.
+
+    Returns:
+        The source converted to the units, the location of the start of the JSON
+        document and the position just after its end.
+
+    """
+    check.valid_units(units=options.units)
+    budget = options.budget
+    if start is None and base is None and options.end is None and budget is None:
+        check.valid_input(source=source)
+        view = encoding.view(source, units=options.units)
+        return view, types.Location(0, 0, 0), len(view)
+
+    check.valid_string(source=source)
+    if start is None:
+        start = 0 if base is None else base.position
+    if base is not None and base.position != start:
+        raise errors.InvalidInputError(
+            f"the position of base must be start, got {base.position=}, {start=}"
+        )
+    view = encoding.view(source, units=options.units)
+    end = len(view) if options.end is None else options.end
+    if budget is not None:
+        _valid_within_budget(source=view, start=start, end=end, budget=budget)
+    else:
+        check.valid_bounds(source=view, start=start, end=end)
+    if base is None:
+        line = view.count(constants.RETURN, 0, start)
+        base = types.Location(
+            line, start - view.rfind(constants.RETURN, 0, start) - 1, start
+        )
+    return view, types.Location(base.line, base.column, start), end
+
+
+def _entries(
+    source: str,
+    *,
+    options: types.Options,
+    start: typing.Optional[int] = None,
+    base: typing.Optional[types.Location] = None,
+) -> types.TKeyedEntries:
+    """
+    Check the source and calculate the source map entries.
+
+    Args:
+        source: The JSON document or the text that contains it.
+        options: The options for calculating the source map.
+        start: The position of the start of the JSON document within the source in
+            the units.
+        base: The location of the start of the JSON document within the source.
+
+    Returns:
+        A list of JSON pointers, or paths, and source map entries.
+
+    """
+    check.valid_key_style(key_style=options.key_style)
+    view, location, _ = _document(source, options=options, start=start, base=base)
+    return handle.value(source=view, current_location=location, options=options)
+
+
+@typing.overload
+def calculate(
+    source: str,
+    *,
+    units: encoding.TUnits = ...,
+    hashes: bool = ...,
+    kinds: bool = ...,
+    key_style: typing.Literal["pointer"] = ...,
+    start: typing.Optional[int] = ...,
+    end: typing.Optional[int] = ...,
+    base: typing.Optional[types.Location] = ...,
+    max_entries: typing.Optional[int] = ...,
+    max_depth: typing.Optional[int] = ...,
+    max_seconds: typing.Optional[float] = ...,
+    max_memory: typing.Optional[int] = ...,
+    truncate: bool = ...,
+) -> types.TSourceMap:
+    """Calculate the source map keyed by JSON pointers."""
+
+
+@typing.overload
+def calculate(
+    source: str,
+    *,
+    units: encoding.TUnits = ...,
+    hashes: bool = ...,
+    kinds: bool = ...,
+    key_style: typing.Literal["tuple"],
+    start: typing.Optional[int] = ...,
+    end: typing.Optional[int] = ...,
+    base: typing.Optional[types.Location] = ...,
+    max_entries: typing.Optional[int] = ...,
+    max_depth: typing.Optional[int] = ...,
+    max_seconds: typing.Optional[float] = ...,
+    max_memory: typing.Optional[int] = ...,
+    truncate: bool = ...,
+) -> types.TPathSourceMap:
+    """Calculate the source map keyed by tuples of the keys and array indexes."""
+
+
+def calculate(
+    source: str,
+    *,
+    units: encoding.TUnits = encoding.CODEPOINT,
+    hashes: bool = False,
+    kinds: bool = False,
+    key_style: types.TKeyStyle = types.POINTER,
+    start: typing.Optional[int] = None,
+    end: typing.Optional[int] = None,
+    base: typing.Optional[types.Location] = None,
+    max_entries: typing.Optional[int] = None,
+    max_depth: typing.Optional[int] = None,
+    max_seconds: typing.Optional[float] = None,
+    max_memory: typing.Optional[int] = None,
+    truncate: bool = False,
+) -> typing.Union[types.TSourceMap, types.TPathSourceMap]:
     """
     Calculate the source map for a JSON document.
 
     Assume that the source is valid JSON.
 
+    The JSON document can also be part of a larger text, such as a block of a
+    Markdown file, by passing its start and end within the source. The document is
+    calculated in place and the locations are within the whole source.
+
     Args:
-        source: The JSON document.
+        source: The JSON document or the text that contains it.
+        units: The units to count the column and position in, either "codepoint"
+            for Python string indexes, "utf16" for UTF-16 code units as used by
+            JavaScript or "utf8" for UTF-8 bytes.
+        hashes: Whether to calculate the content hash of each value. The hash of
+            an array or object is calculated from the hashes of the values within
+            it so that it only changes if a value within it changes.
+        kinds: Whether to record the kind of each value, one of "object", "array",
+            "string", "number", "boolean" or "null", and the number of values
+            within each array and object.
+        key_style: Either "pointer" to key the source map by JSON pointers or
+            "tuple" to key the source map by tuples of the keys and array indexes
+            to each value, which is how validators such as jsonschema report the
+            path to an error.
+        start: The position of the start of the JSON document within the source,
+            by default the position of base or the start of the source. Like the
+            positions of the source map it is counted in units, such as a byte
+            offset into the UTF-8 encoding of the source for "utf8".
+        end: The position just after the end of the JSON document within the
+            source in units, by default the end of the source.
+        base: The location of start in units, by default counted from the start of
+            the source. Pass it when it is already known, such as the location of a
+            line of a log, so that the text before start is not scanned.
+        max_entries: The maximum number of entries of the source map.
+        max_depth: The maximum number of arrays and objects that are nested within
+            each other. With any budget the document is checked without recursion,
+            so that documents nested deeper than the recursion limit can be
+            truncated.
+        max_seconds: The maximum time to calculate the source map for, including
+            checking that the document is valid.
+        max_memory: The maximum bytes used by the entries of the source map,
+            estimated from the number of entries, the length of their JSON
+            pointers and whether they have keys and content hashes, see
+            types.Budget. Checking that the document is valid is also limited to
+            this many bytes, estimated from how deeply the arrays and objects are
+            nested.
+        truncate: What to do when max_entries, max_seconds or max_memory runs out
+            or an array or object is nested deeper than max_depth. By default
+            BudgetExceededError is raised, otherwise the rest of the values within
+            each array or object are skipped and the entry of the array or object
+            is marked as truncated. BudgetExceededError is always raised when
+            max_seconds or max_memory runs out while checking that the document is
+            valid.
 
     Returns:
         The source map.
 
     """
-    if not isinstance(source, str):
-        raise errors.InvalidInputError(f"source must be a string, got {type(source)}")
-    if not source:
-        raise errors.InvalidInputError("source must not be empty")
-    try:
-        json.loads(source)
-    except json.JSONDecodeError as error:
-        raise errors.InvalidInputError("JSON is not valid") from error
+    limits = (max_entries, max_depth, max_seconds, max_memory)
+    budget = (
+        None
+        if all(limit is None for limit in limits)
+        else types.Budget(
+            max_entries=max_entries,
+            max_depth=max_depth,
+            max_seconds=max_seconds,
+            max_memory=max_memory,
+            truncate=truncate,
+        )
+    )
+    return dict(  # type: ignore[return-value]
+        _entries(
+            source,
+            options=types.Options(
+                units=units,
+                hashes=hashes,
+                kinds=kinds,
+                key_style=key_style,
+                end=end,
+                budget=budget,
+            ),
+            start=start,
+            base=base,
+        )
+    )
+
+
+def calculate_tree(
+    source: str,
+    *,
+    units: encoding.TUnits = encoding.CODEPOINT,
+    hashes: bool = False,
+    kinds: bool = False,
+    start: typing.Optional[int] = None,
+    end: typing.Optional[int] = None,
+    base: typing.Optional[types.Location] = None,
+) -> tree.Node:
+    """
+    Calculate the source map for a JSON document as a tree.
+
+    Each node only stores its own key or array index rather than the full JSON
+    pointer. The root node is also a mapping from JSON pointers to source map
+    entries with the same contents as the source map returned by calculate. Values
+    without values within them are stored as their entries and, unless hashes or
+    kinds are requested, the tree is built while the document is scanned without
+    the list of JSON pointers and entries that calculate builds first.
+
+    Args:
+        source: The JSON document.
+        units: The units to count the column and position in, see calculate.
+        hashes: Whether to calculate the content hash of each value, see
+            calculate.
+        kinds: Whether to record the kind of each value and the number of values
+            within each array and object, see calculate.
+        start: The position of the start of the JSON document, see calculate.
+        end: The position just after the end of the JSON document, see calculate.
+        base: The location of start, see calculate.
+
+    Returns:
+        The root node of the source map tree.
+
+    """
+    options = types.Options(units=units, hashes=hashes, kinds=kinds, end=end)
+    if hashes or kinds:
+        return tree.from_entries(
+            typing.cast(
+                types.TSourceMapEntries,
+                _entries(source, options=options, start=start, base=base),
+            )
+        )
 
-    return dict(handle.value(source=source, current_location=types.Location(0, 0, 0)))
+    view, location, end = _document(source, options=options, start=start, base=base)
+    state = scanner.State(
+        units=units,
+        position=location.position,
+        line=location.line,
+        column=location.column,
+    )
+    return tree.from_entries(
+        scanner.scan_entries(structural.tokens(view, location.position, end), state)
+    )
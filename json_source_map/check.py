@@ -1,6 +1,12 @@
 """Checks for calculating the JSON source map."""
 
-from . import errors, types
+import json
+from json import decoder
+
+from . import encoding, errors, types
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = decoder.WHITESPACE  # type: ignore[attr-defined]
 
 
 def not_end(*, source: str, current_location: types.Location) -> None:
@@ -16,3 +22,102 @@ def not_end(*, source: str, current_location: types.Location) -> None:
         raise errors.InvalidJsonError(
             f"the JSON document ended unexpectedly, {current_location=}"
         )
+
+
+def valid_string(*, source: str) -> None:
+    """
+    Check that the source is a string.
+
+    Args:
+        source: The JSON document.
+
+    """
+    if not isinstance(source, str):
+        raise errors.InvalidInputError(f"source must be a string, got {type(source)}")
+
+
+def valid_input(*, source: str) -> None:
+    """
+    Check that the source is a non-empty string that is valid JSON.
+
+    Args:
+        source: The JSON document.
+
+    """
+    valid_string(source=source)
+    if not source:
+        raise errors.InvalidInputError("source must not be empty")
+    try:
+        json.loads(source)
+    except json.JSONDecodeError as error:
+        raise errors.InvalidInputError("JSON is not valid") from error
+
+
+def valid_range(*, source: str, start: int, end: int) -> None:
+    """
+    Check that the start and end are within the source and not empty.
+
+    Args:
+        source: The text that contains the JSON document.
+        start: The position of the start of the JSON document.
+        end: The position just after the end of the JSON document.
+
+    """
+    if not 0 <= start < end <= len(source):
+        raise errors.InvalidInputError(
+            f"start and end must be within the source, got {start=}, {end=}"
+        )
+
+
+def valid_bounds(*, source: str, start: int, end: int) -> None:
+    """
+    Check that the source contains valid JSON between the start and end.
+
+    Only the JSON between the start and end is decoded, the rest of the source can
+    be anything.
+
+    Args:
+        source: The text that contains the JSON document.
+        start: The position of the start of the JSON document.
+        end: The position just after the end of the JSON document.
+
+    """
+    valid_range(source=source, start=start, end=end)
+    try:
+        _, value_end = _DECODER.raw_decode(
+            source, _WHITESPACE.match(source, start).end()
+        )
+    except json.JSONDecodeError as error:
+        raise errors.InvalidInputError("JSON is not valid") from error
+    if value_end > end or _WHITESPACE.match(source, value_end).end() < end:
+        raise errors.InvalidInputError(
+            f"JSON is not valid, the value does not end at {end=}"
+        )
+
+
+def valid_units(*, units: str) -> None:
+    """
+    Check that the units are supported.
+
+    Args:
+        units: The units to count the column and position in.
+
+    """
+    if units not in encoding.UNITS:
+        raise errors.InvalidInputError(
+            f"units must be one of {sorted(encoding.UNITS)}, got {units}"
+        )
+
+
+def valid_key_style(*, key_style: str) -> None:
+    """
+    Check that the key style is supported.
+
+    Args:
+        key_style: How the source map is keyed.
+
+    """
+    if key_style not in types.KEY_STYLES:
+        raise errors.InvalidInputError(
+            f"key_style must be one of {sorted(types.KEY_STYLES)}, got {key_style}"
+        )
@@ -0,0 +1,251 @@
+"""Calculate the differences between two JSON documents using their structure."""
+
+import dataclasses
+import functools
+import typing
+
+from . import check, constants, encoding, line_index, parallel, structural, tree, types
+
+_CONTAINER = frozenset({constants.BEGIN_ARRAY, constants.BEGIN_OBJECT})
+
+
+def _relocate(location: types.Location, start: types.Location) -> types.Location:
+    """
+    Move a location within a value to the location of the value in its document.
+
+    Args:
+        location: The location relative to the start of the value.
+        start: The location of the start of the value in the document.
+
+    Returns:
+        The location in the document.
+
+    """
+    return types.Location(
+        location.line + start.line,
+        location.column + start.column if location.line == 0 else location.column,
+        location.position + start.position,
+    )
+
+
+@dataclasses.dataclass
+class _Document:
+    """
+    One of the JSON documents that are compared.
+
+    Attrs:
+        source: The JSON document.
+
+    """
+
+    source: str
+
+    @functools.cached_property
+    def lines(self) -> line_index.LineIndex:
+        """The index of the new line characters, only built once a value differs."""
+        return line_index.LineIndex.from_source(self.source)
+
+    def same(
+        self,
+        member: parallel.TMember,
+        other: "_Document",
+        other_member: parallel.TMember,
+    ) -> bool:
+        """
+        Check whether the source of a value is the same as a value of another document.
+
+        Args:
+            member: The key and value positions of the value.
+            other: The other JSON document.
+            other_member: The key and value positions of the value in the other
+                document.
+
+        Returns:
+            Whether the source of the values is the same.
+
+        """
+        _, _, start, end = member
+        _, _, other_start, other_end = other_member
+        return (
+            end - start == other_end - other_start
+            and self.source[start:end] == other.source[other_start:other_end]
+        )
+
+    def entry(self, member: parallel.TMember) -> types.Entry:
+        """
+        Calculate the entry of a value.
+
+        Args:
+            member: The key and value positions of the value.
+
+        Returns:
+            The source map entry of the value.
+
+        """
+        key_start, key_end, value_start, value_end = member
+        return types.Entry(
+            value_start=self.lines.to_location(value_start),
+            value_end=self.lines.to_location(value_end),
+            key_start=None if key_start is None else self.lines.to_location(key_start),
+            key_end=None if key_end is None else self.lines.to_location(key_end),
+        )
+
+    def entries(
+        self, *, pointer: str, member: parallel.TMember
+    ) -> typing.Iterator[typing.Tuple[str, types.Entry]]:
+        """
+        Calculate the entries of a value and all the values within it.
+
+        Args:
+            pointer: The JSON pointer of the value.
+            member: The key and value positions of the value.
+
+        Returns:
+            The JSON pointers and source map entries.
+
+        """
+        _, _, value_start, value_end = member
+        yield pointer, self.entry(member)
+        if self.source[value_start] not in _CONTAINER:
+            return
+
+        start = self.lines.to_location(value_start)
+        source_map = structural.calculate(self.source[value_start:value_end])
+        del source_map[""]
+        for relative, entry in source_map.items():
+            yield f"{pointer}{relative}", types.Entry(
+                value_start=_relocate(entry.value_start, start),
+                value_end=_relocate(entry.value_end, start),
+                key_start=None
+                if entry.key_start is None
+                else _relocate(entry.key_start, start),
+                key_end=None
+                if entry.key_end is None
+                else _relocate(entry.key_end, start),
+            )
+
+    def children(
+        self, member: parallel.TMember
+    ) -> typing.Optional[typing.Dict[str, parallel.TMember]]:
+        """
+        Find the values within an array or object.
+
+        Args:
+            member: The key and value positions of the array or object.
+
+        Returns:
+            The key and value positions of each value within it by the segment of its
+            JSON pointer, None if the value is not an array or object.
+
+        """
+        _, _, value_start, _ = member
+        if self.source[value_start] not in _CONTAINER:
+            return None
+
+        found, _ = parallel.members(source=self.source, start=value_start)
+        children: typing.Dict[str, parallel.TMember] = {}
+        for index, child in enumerate(found):
+            key_start, key_end, _, _ = child
+            if key_start is None or key_end is None:
+                children[str(index)] = child
+                continue
+            name = encoding.decode_key(self.source[key_start + 1 : key_end - 1])
+            children[tree.escape(name)] = child
+        return children
+
+
+def _document(source: str) -> typing.Tuple[_Document, parallel.TMember]:
+    """
+    Check a JSON document and find its top level value.
+
+    Args:
+        source: The JSON document.
+
+    Returns:
+        The document and the value positions of its top level value.
+
+    """
+    check.valid_input(source=source)
+    start, end = parallel.strip(source=source, start=0, end=len(source))
+    return _Document(source), (None, None, start, end)
+
+
+# The JSON pointer of a value and its key and value positions in each document
+_TPair = typing.Tuple[str, parallel.TMember, parallel.TMember]
+
+
+def _compare(
+    *, old: _Document, new: _Document, pair: _TPair, result: types.Diff
+) -> typing.List[_TPair]:
+    """
+    Compare a value of the old document with the value of the new document.
+
+    Args:
+        old: The old JSON document.
+        new: The new JSON document.
+        pair: The JSON pointer and the positions of the value in each document.
+        result: The differences, which the differences of the value are added to.
+
+    Returns:
+        The values within the value that are in both documents and still have to be
+        compared.
+
+    """
+    pointer, old_member, new_member = pair
+    if old.same(old_member, new, new_member):
+        return []
+
+    old_children = old.children(old_member)
+    new_children = new.children(new_member)
+    if old_children is None or old.source[old_member[2]] != new.source[new_member[2]]:
+        result.changed[pointer] = (old.entry(old_member), new.entry(new_member))
+    old_children = old_children or {}
+    new_children = new_children or {}
+
+    pairs: typing.List[_TPair] = []
+    for segment, old_child in old_children.items():
+        new_child = new_children.get(segment)
+        if new_child is None:
+            result.removed.update(
+                old.entries(pointer=f"{pointer}/{segment}", member=old_child)
+            )
+        else:
+            pairs.append((f"{pointer}/{segment}", old_child, new_child))
+    for segment, new_child in new_children.items():
+        if segment not in old_children:
+            result.added.update(
+                new.entries(pointer=f"{pointer}/{segment}", member=new_child)
+            )
+    return pairs
+
+
+def calculate(old_source: str, new_source: str) -> types.Diff:
+    """
+    Calculate the values that changed between two JSON documents.
+
+    The documents are compared from the top level value down. Values with exactly
+    the same source in both documents are skipped together with all the values
+    within them, so only the arrays and objects that differ are split into their
+    values. Arrays and objects that are still arrays and objects are not reported
+    as changed, the values within them are instead.
+
+    Args:
+        old_source: The old JSON document.
+        new_source: The new JSON document.
+
+    Returns:
+        The changed, added and removed JSON pointers with their entries.
+
+    """
+    old, old_root = _document(old_source)
+    new, new_root = _document(new_source)
+    result = types.Diff()
+
+    # The values to compare, the next value in the old document is last
+    pairs: typing.List[_TPair] = [("", old_root, new_root)]
+    while pairs:
+        pairs.extend(
+            reversed(_compare(old=old, new=new, pair=pairs.pop(), result=result))
+        )
+
+    return result
@@ -0,0 +1,96 @@
+"""Units that the line, column and position of a location are counted in."""
+
+import re
+import sys
+import typing
+from json import decoder
+
+from . import constants
+
+CODEPOINT: typing.Final = "codepoint"
+UTF16: typing.Final = "utf16"
+UTF8: typing.Final = "utf8"
+TUnits = typing.Literal["codepoint", "utf16", "utf8"]
+UNITS = {CODEPOINT, UTF16, UTF8}
+
+_ASTRAL = re.compile("[\U00010000-\U0010FFFF]")
+
+
+def _surrogate_pair(match: typing.Match[str]) -> str:
+    """
+    Split a character outside of the basic multilingual plane into surrogates.
+
+    Args:
+        match: The match of the character.
+
+    Returns:
+        The high and low surrogate of the character.
+
+    """
+    code_point = ord(match.group()) - 0x10000
+    return chr(0xD800 + (code_point >> 10)) + chr(0xDC00 + (code_point & 0x3FF))
+
+
+def view(source: str, *, units: TUnits) -> str:
+    """
+    Convert the source so that each character is a single unit.
+
+    The structural characters, whitespace, quotation marks and escapes of JSON are
+    all single units in every encoding and are not changed, which means that the
+    source map can be calculated on the converted source and the locations are then
+    counted in the units.
+
+    Args:
+        source: The JSON document.
+        units: The units to count in.
+
+    Returns:
+        The source with one character per unit.
+
+    """
+    if units == CODEPOINT or source.isascii():
+        return source
+    if units == UTF8:
+        return source.encode("utf-8", "surrogatepass").decode("latin-1")
+    return _ASTRAL.sub(_surrogate_pair, source)
+
+
+def restore(text: str, *, units: TUnits) -> str:
+    """
+    Reverse the conversion of the source to units for part of the source.
+
+    Args:
+        text: Part of the converted source.
+        units: The units the source was converted to.
+
+    Returns:
+        The part of the source before it was converted.
+
+    """
+    if units == CODEPOINT or text.isascii():
+        return text
+    if units == UTF8:
+        return text.encode("latin-1").decode("utf-8", "surrogatepass")
+    return text.encode("utf-16-le", "surrogatepass").decode(
+        "utf-16-le", "surrogatepass"
+    )
+
+
+def decode_key(text: str) -> str:
+    """
+    Decode the escape sequences of the text of a key between the quotation marks.
+
+    The key is interned so that repeated keys share the same string.
+
+    Args:
+        text: The text of the key as it appears in the source.
+
+    Returns:
+        The key.
+
+    """
+    if constants.ESCAPE in text:
+        text = decoder.scanstring(  # type: ignore[attr-defined]
+            f"{text}{constants.QUOTATION_MARK}", 0
+        )[0]
+    return sys.intern(text)
@@ -11,3 +11,7 @@ class InvalidJsonError(BaseError):
 
 class InvalidInputError(BaseError):
     """Raised when input is not a string."""
+
+
+class BudgetExceededError(BaseError):
+    """Raised when calculating the source map uses more resources than allowed."""
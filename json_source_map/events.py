@@ -0,0 +1,87 @@
+"""Report the structure of a JSON document as a stream of events."""
+
+from . import check, encoding, handle, scanner, structural, types
+
+
+class Visitor:
+    """
+    Receive the events of walk for each value and key of a JSON document.
+
+    Override the events that are needed, the others do nothing. The pointer of each
+    event is the JSON pointer of the value, the start is the location of the first
+    character of the value or key and the end is the location just after its last
+    character, the same as the locations of the entries of the source map.
+
+    """
+
+    def start_object(self, *, pointer: str, start: types.Location) -> None:
+        """Handle the start of an object."""
+
+    def end_object(self, *, pointer: str, end: types.Location) -> None:
+        """Handle the end of an object."""
+
+    def start_array(self, *, pointer: str, start: types.Location) -> None:
+        """Handle the start of an array."""
+
+    def end_array(self, *, pointer: str, end: types.Location) -> None:
+        """Handle the end of an array."""
+
+    def key(self, *, key: str, start: types.Location, end: types.Location) -> None:
+        """Handle the key of an object member, which is decoded but not escaped."""
+
+    def scalar(
+        self,
+        *,
+        pointer: str,
+        kind: types.TKind,
+        start: types.Location,
+        end: types.Location,
+    ) -> None:
+        """Handle a string, number, boolean or null."""
+
+
+def walk(
+    source: str,
+    visitor: Visitor,
+    *,
+    units: encoding.TUnits = encoding.CODEPOINT,
+) -> None:
+    """
+    Walk through a JSON document and report each value and key to the visitor.
+
+    The events are reported in document order without creating any entries or
+    source map, which means that the visitor can build its own structure directly.
+    The document is checked while it is walked, so the events before the error are
+    reported when it is not valid.
+
+    Args:
+        source: The JSON document.
+        visitor: The visitor to report the events to.
+        units: The units to count the column and position in, see calculate.
+
+    """
+    check.valid_string(source=source)
+    check.valid_units(units=units)
+    source = encoding.view(source, units=units)
+
+    state = scanner.State(units=units)
+    for event in scanner.scan_events(structural.tokens(source), state):
+        if event.kind == scanner.START_OBJECT:
+            visitor.start_object(pointer=event.pointer, start=event.start)
+        elif event.kind == scanner.END_OBJECT:
+            visitor.end_object(pointer=event.pointer, end=event.end)
+        elif event.kind == scanner.START_ARRAY:
+            visitor.start_array(pointer=event.pointer, start=event.start)
+        elif event.kind == scanner.END_ARRAY:
+            visitor.end_array(pointer=event.pointer, end=event.end)
+        elif event.kind == scanner.NAME:
+            visitor.key(key=event.pointer, start=event.start, end=event.end)
+        else:
+            visitor.scalar(
+                pointer=event.pointer,
+                kind=handle.PRIMITIVE_KINDS.get(
+                    source[event.start.position], types.NUMBER
+                ),
+                start=event.start,
+                end=event.end,
+            )
@@ -0,0 +1,190 @@
+"""Export the JSON source map to other formats."""
+
+import json
+import typing
+
+from . import lazy, structural, types
+
+# The locations of an entry in the order of the fields of to_numpy
+LOCATIONS = ("value_start", "value_end", "key_start", "key_end")
+# The fields of each row of to_numpy
+FIELDS = tuple(
+    f"{location}_{part}"
+    for location in LOCATIONS
+    for part in ("line", "column", "position")
+)
+# The line, column and position of a key that is not included
+NO_LOCATION = (-1, -1, -1)
+
+_LOCATION = '{{"line":{},"column":{},"pos":{}}}'
+_VALUE = '"value":' + _LOCATION + ',"valueEnd":' + _LOCATION
+_KEY = '"key":' + _LOCATION + ',"keyEnd":' + _LOCATION + ","
+
+
+def iter_pointers(source_map: types.TSourceMap) -> typing.Iterator[str]:
+    """
+    Stream the source map in the format of the Node json-source-map pointers.
+
+    The locations are written directly into the output without building the
+    intermediate dictionaries returned by Entry.to_dict.
+
+    Args:
+        source_map: The source map to export.
+
+    Returns:
+        Chunks of the JSON document which, once joined, are the pointers.
+
+    """
+    separator = "{"
+    for pointer, entry in source_map.items():
+        value_start = entry.value_start
+        value_end = entry.value_end
+        key_start = entry.key_start
+        key_end = entry.key_end
+        key = (
+            _KEY.format(
+                key_start.line,
+                key_start.column,
+                key_start.position,
+                key_end.line,
+                key_end.column,
+                key_end.position,
+            )
+            if key_start is not None and key_end is not None
+            else ""
+        )
+        yield (
+            f"{separator}{json.dumps(pointer)}:{{{key}"
+            + _VALUE.format(
+                value_start.line,
+                value_start.column,
+                value_start.position,
+                value_end.line,
+                value_end.column,
+                value_end.position,
+            )
+            + "}"
+        )
+        separator = ","
+
+    yield "{}" if separator == "{" else "}"
+
+
+def dumps_pointers(source_map: types.TSourceMap) -> str:
+    """
+    Serialize the source map in the format of the Node json-source-map pointers.
+
+    Args:
+        source_map: The source map to export.
+
+    Returns:
+        The JSON document with the pointers.
+
+    """
+    return "".join(iter_pointers(source_map))
+
+
+def dump_pointers(source_map: types.TSourceMap, file: typing.TextIO) -> None:
+    """
+    Write the source map in the format of the Node json-source-map pointers.
+
+    Args:
+        source_map: The source map to export.
+        file: The file to write the JSON document with the pointers to.
+
+    """
+    file.writelines(iter_pointers(source_map))
+
+
+def iter_fields(entries: typing.Iterable[types.Entry]) -> typing.Iterator[int]:
+    """
+    Stream the fields of each entry in the order of FIELDS.
+
+    Args:
+        entries: The entries of the source map.
+
+    Returns:
+        The line, column and position of each location of each entry.
+
+    """
+    for entry in entries:
+        for location in (
+            entry.value_start,
+            entry.value_end,
+            entry.key_start,
+            entry.key_end,
+        ):
+            if location is None:
+                yield from NO_LOCATION
+            else:
+                yield location.line
+                yield location.column
+                yield location.position
+
+
+def _lazy_fields(source_map: lazy.LazySourceMap, *, numpy: typing.Any) -> typing.Any:
+    """
+    Calculate the fields of each row of to_numpy from the positions of the values.
+
+    No entries are created, the lines and columns of all the positions are
+    calculated together from the line index of the source map.
+
+    Args:
+        source_map: The lazy source map.
+        numpy: The NumPy module.
+
+    Returns:
+        The array with a row for each JSON pointer and a column for each field.
+
+    """
+    rows = numpy.fromiter(source_map.rows.values(), dtype=numpy.int64)
+    positions = numpy.frombuffer(source_map.positions, dtype=numpy.int64).reshape(
+        -1, structural.ROW_SIZE
+    )[rows]
+    newlines = numpy.frombuffer(source_map.line_index.newlines, dtype=numpy.int64)
+    lines = numpy.searchsorted(newlines, positions, side="left")
+    # The position of the new line before each position, -1 on the first line
+    columns = positions - numpy.concatenate(([-1], newlines))[lines] - 1
+    missing = positions == structural.NO_KEY
+    lines[missing] = NO_LOCATION[0]
+    columns[missing] = NO_LOCATION[1]
+    return numpy.stack((lines, columns, positions), axis=-1).reshape(-1, len(FIELDS))
+
+
+def to_numpy(
+    source_map: typing.Mapping[str, types.Entry]
+) -> typing.Tuple[typing.Any, typing.List[str]]:
+    """
+    Export the source map as a NumPy structured array with a row for each entry.
+
+    The fields of each row are the line, column and position of the value start,
+    value end, key start and key end, see FIELDS, where the fields of a key that
+    is not included are -1. The lines and columns of a source map returned by
+    calculate_lazy are calculated directly from its positions without creating
+    any entries.
+
+    Requires NumPy to be installed.
+
+    Args:
+        source_map: The source map to export.
+
+    Returns:
+        The structured array and the JSON pointer of each row.
+
+    """
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    if isinstance(source_map, lazy.LazySourceMap):
+        fields = _lazy_fields(source_map, numpy=numpy)
+    else:
+        fields = numpy.fromiter(
+            iter_fields(source_map.values()),
+            dtype=numpy.int64,
+            count=len(source_map) * len(FIELDS),
+        ).reshape(-1, len(FIELDS))
+
+    dtype = numpy.dtype([(field, numpy.int64) for field in FIELDS])
+    return (
+        numpy.ascontiguousarray(fields).view(dtype).reshape(-1),
+        list(source_map),
+    )
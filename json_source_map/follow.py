@@ -0,0 +1,198 @@
+"""Calculate the source maps of the records appended to a JSON Lines file."""
+
+import dataclasses
+import json
+import os
+import time
+import typing
+
+from . import check, encoding, errors, handle, types
+
+_NEW_LINE = b"\n"
+# The maximum number of bytes read at once
+_CHUNK_SIZE = 1 << 20
+
+
+@dataclasses.dataclass
+class Position:
+    """
+    Where to continue reading a JSON Lines file from.
+
+    Attrs:
+        offset: The byte offset just after the last complete line.
+        line: The number of complete lines before the offset.
+        index: The number of records before the offset.
+        inode: The inode of the file, used to detect that it has been rotated.
+
+    """
+
+    offset: int = 0
+    line: int = 0
+    index: int = 0
+    inode: typing.Optional[int] = None
+
+
+@dataclasses.dataclass
+class Record:
+    """
+    The source map of a record of a JSON Lines file.
+
+    The line of each location is the line in the file, the column and position are
+    counted from the start of the record.
+
+    Attrs:
+        index: The index of the record in the file, blank lines are not counted.
+        line: The line of the record in the file.
+        offset: The byte offset of the start of the record in the file.
+        source_map: The source map of the record, empty if the record is not valid.
+        position: Where to continue reading after the record.
+        error: Why the record is not valid JSON, None if it is valid.
+
+    """
+
+    index: int
+    line: int
+    offset: int
+    source_map: types.TSourceMap
+    position: Position
+    error: typing.Optional[str] = None
+
+
+def _source_map(
+    line_bytes: bytes, *, line: int, units: encoding.TUnits
+) -> types.TSourceMap:
+    """
+    Calculate the source map of a record.
+
+    Args:
+        line_bytes: The UTF-8 record.
+        line: The line of the record in the file.
+        units: The units to count the column and position in.
+
+    Returns:
+        The source map of the record.
+
+    """
+    try:
+        text = line_bytes.decode("utf-8")
+        json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise errors.InvalidInputError(
+            f"JSON is not valid, record on line {line}"
+        ) from error
+
+    return dict(
+        typing.cast(
+            types.TSourceMapEntries,
+            handle.value(
+                source=encoding.view(text, units=units),
+                current_location=types.Location(line, 0, 0),
+                options=types.Options(units=units),
+            ),
+        )
+    )
+
+
+def _rotated(path: str, *, inode: int, offset: int) -> bool:
+    """
+    Check whether the file at the path has been replaced or truncated.
+
+    Args:
+        path: The path of the file.
+        inode: The inode of the file being read.
+        offset: The byte offset read up to.
+
+    Returns:
+        Whether reading should start again from the start of the file at the path.
+
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        # Wait for the new file to be created
+        return False
+    return stat.st_ino != inode or stat.st_size < offset
+
+
+def follow(
+    path: str,
+    *,
+    position: typing.Optional[Position] = None,
+    units: encoding.TUnits = encoding.CODEPOINT,
+    poll_interval: float = 1.0,
+    wait: bool = True,
+) -> typing.Iterator[Record]:
+    """
+    Calculate the source map of each record of a JSON Lines file as it is appended.
+
+    Only complete lines are read, a partial line at the end of the file is read
+    once its new line is appended. When the file is replaced, for example by log
+    rotation, or truncated, the rest of the old file is read and reading starts
+    again from the start of the new file. A record that is not valid JSON is
+    returned with the error and an empty source map so that reading continues
+    after it.
+
+    Args:
+        path: The path of the JSON Lines file.
+        position: Where to continue reading from, such as the position of the last
+            record returned, by default the start of the file. The position is
+            ignored if the file has since been replaced or truncated.
+        units: The units to count the column and position in, see calculate.
+        poll_interval: The seconds to wait before checking the file for new lines.
+        wait: Whether to wait for new lines at the end of the file or to stop.
+
+    Returns:
+        The source map of each record with where to continue reading from.
+
+    """
+    check.valid_units(units=units)
+    if position is None:
+        position = Position()
+
+    while True:
+        with open(path, "rb") as file:
+            inode = os.fstat(file.fileno()).st_ino
+            if position.inode not in {None, inode} or _rotated(
+                path, inode=inode, offset=position.offset
+            ):
+                position = Position()
+            position = dataclasses.replace(position, inode=inode)
+            file.seek(position.offset)
+
+            partial = b""
+            while True:
+                chunk = file.read(_CHUNK_SIZE)
+                lines = (partial + chunk).split(_NEW_LINE)
+                partial = lines.pop()
+                for line_bytes in lines:
+                    offset = position.offset
+                    position = dataclasses.replace(
+                        position,
+                        offset=offset + len(line_bytes) + len(_NEW_LINE),
+                        line=position.line + 1,
+                    )
+                    if not line_bytes.strip():
+                        continue
+                    position = dataclasses.replace(position, index=position.index + 1)
+                    record = Record(
+                        index=position.index - 1,
+                        line=position.line - 1,
+                        offset=offset,
+                        source_map={},
+                        position=position,
+                    )
+                    try:
+                        record.source_map = _source_map(
+                            line_bytes, line=record.line, units=units
+                        )
+                    except errors.InvalidInputError as error:
+                        record.error = str(error)
+                    yield record
+
+                if chunk:
+                    continue
+                if _rotated(path, inode=inode, offset=position.offset + len(partial)):
+                    break
+                if not wait:
+                    return
+                time.sleep(poll_interval)
@@ -1,44 +1,366 @@
 """Calculate the JSON source map."""
 
+import dataclasses
+import hashlib
+import re
+import sys
+import typing
 from json import decoder
 
-from . import advance, check, constants, errors, types
+from . import advance, check, constants, encoding, errors, tree, types
 
+# Matches strings and the start and end of arrays and objects
+_BRACKET = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+# The kinds of primitive values by their first character, any other is a number
+PRIMITIVE_KINDS: typing.Dict[str, types.TKind] = {
+    constants.QUOTATION_MARK: types.STRING,
+    "t": types.BOOLEAN,
+    "f": types.BOOLEAN,
+    "n": types.NULL,
+}
 
-def value(*, source: str, current_location: types.Location) -> types.TSourceMapEntries:
+
+def content_hash(*parts: str) -> str:
+    """
+    Calculate the content hash of a value.
+
+    Args:
+        parts: The source of a primitive value or the parts that make up an array
+            or object including the content hashes of the values within it.
+
+    Returns:
+        The hexadecimal digest of the parts.
+
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _root(options: types.Options) -> types.TKey:
+    """
+    Get the JSON pointer, or path, of the value the source map is calculated for.
+
+    Args:
+        options: The options for calculating the source map.
+
+    Returns:
+        The empty JSON pointer or path.
+
+    """
+    return () if options.key_style == types.TUPLE else ""
+
+
+def _prefixed(
+    *,
+    segment: typing.Union[str, int],
+    entries: types.TKeyedEntries,
+    options: types.Options,
+) -> typing.Iterator[typing.Tuple[types.TKey, types.Entry]]:
+    """
+    Prefix the JSON pointers, or paths, of entries with the key or array index.
+
+    Args:
+        segment: The key or array index of the value within its parent.
+        entries: The entries of the value.
+        options: The options for calculating the source map.
+
+    Returns:
+        The entries relative to the parent of the value.
+
+    """
+    if options.key_style == types.TUPLE:
+        return (
+            ((segment,) + typing.cast(types.TPath, key), entry)
+            for key, entry in entries
+        )
+    return ((f"/{segment}{key}", entry) for key, entry in entries)
+
+
+def _exceeded(*, budget: types.Budget, limit: str, location: types.Location) -> None:
+    """
+    Raise an error that a limit has been reached unless truncating.
+
+    Args:
+        budget: The budget the limit is part of.
+        limit: The description of the limit.
+        location: The location in the source where the limit has been reached.
+
+    """
+    if not budget.truncate:
+        raise errors.BudgetExceededError(f"{limit} exceeded, {location=}")
+
+
+def _skip(*, source: str, current_location: types.Location) -> None:
+    """
+    Advance to the end of the array or object the location is within.
+
+    No entries are calculated for the values that are skipped.
+
+    Args:
+        source: The JSON document.
+        current_location: The current location in the source which is advanced to
+            the end of the array or object.
+
+    """
+    # The document has been checked, which means that the array or object ends
+    matches = _BRACKET.finditer(source, current_location.position)
+    depth = 0
+    while True:
+        match = next(matches)
+        character = source[match.start()]
+        if character in {constants.BEGIN_ARRAY, constants.BEGIN_OBJECT}:
+            depth += 1
+        elif character in {constants.END_ARRAY, constants.END_OBJECT}:
+            if depth == 0:
+                break
+            depth -= 1
+    end = match.start()
+
+    lines = source.count(constants.RETURN, current_location.position, end)
+    if lines:
+        current_location.line += lines
+        current_location.column = (
+            end - source.rfind(constants.RETURN, current_location.position, end) - 1
+        )
+    else:
+        current_location.column += end - current_location.position
+    current_location.position = end
+
+
+def _stopped(
+    *, source: str, current_location: types.Location, budget: types.Budget
+) -> bool:
+    """
+    Check whether the budget has run out before the next value of an array or object.
+
+    If it has run out and truncating, advance to the end of the array or object.
+
+    Args:
+        source: The JSON document.
+        current_location: The location of the next value.
+        budget: The budget of the calculation.
+
+    Returns:
+        Whether the rest of the array or object has been skipped.
+
+    """
+    limit = budget.exceeded()
+    if limit is None:
+        return False
+    _exceeded(budget=budget, limit=limit, location=current_location)
+    _skip(source=source, current_location=current_location)
+    return True
+
+
+def _truncated(
+    *,
+    source: str,
+    current_location: types.Location,
+    options: types.Options,
+) -> types.TKeyedEntries:
+    """
+    Calculate the entry of an array or object without the values within it.
+
+    Args:
+        source: The JSON document.
+        current_location: The location of the start of the array or object.
+        options: The options for calculating the source map.
+
+    Returns:
+        The truncated entry of the array or object.
+
+    """
+    value_start = types.Location(
+        current_location.line, current_location.column, current_location.position
+    )
+    kind: types.TKind = (
+        types.ARRAY
+        if source[current_location.position] == constants.BEGIN_ARRAY
+        else types.OBJECT
+    )
+    current_location.column += 1
+    current_location.position += 1
+    _skip(source=source, current_location=current_location)
+    current_location.column += 1
+    current_location.position += 1
+    value_end = types.Location(
+        current_location.line, current_location.column, current_location.position
+    )
+    return [
+        (
+            _root(options),
+            types.Entry(
+                value_start=value_start,
+                value_end=value_end,
+                truncated=True,
+                kind=kind if options.kinds else None,
+            ),
+        )
+    ]
+
+
+def value(
+    *,
+    source: str,
+    current_location: types.Location,
+    options: types.Options = types.Options(),
+    member: bool = False,
+) -> types.TKeyedEntries:
     """
     Calculate the source map of any value.
 
     Args:
         source: The JSON document.
         current_location: The current location in the source.
+        options: The options for calculating the source map.
+        member: Whether the value is the value of an object member, which means
+            that its entry has the locations of the key.
 
     Returns:
-        A list of JSON pointers and source map entries.
+        A list of JSON pointers, or paths, and source map entries.
 
     """
     advance.to_next_non_whitespace(source=source, current_location=current_location)
     check.not_end(source=source, current_location=current_location)
 
+    budget = options.budget
+    if budget is not None:
+        budget.charge(key=member, hashes=options.hashes)
+        if (
+            source[current_location.position]
+            in {constants.BEGIN_ARRAY, constants.BEGIN_OBJECT}
+            and budget.too_deep()
+        ):
+            _exceeded(
+                budget=budget,
+                limit=f"max_depth of {budget.max_depth}",
+                location=current_location,
+            )
+            return _truncated(
+                source=source, current_location=current_location, options=options
+            )
+
     if source[current_location.position] == constants.BEGIN_ARRAY:
-        return array(source=source, current_location=current_location)
+        return array(
+            source=source,
+            current_location=current_location,
+            options=options,
+        )
     if source[current_location.position] == constants.BEGIN_OBJECT:
-        return object_(source=source, current_location=current_location)
-    return primitive(source=source, current_location=current_location)
+        return object_(
+            source=source,
+            current_location=current_location,
+            options=options,
+        )
+    return primitive(source=source, current_location=current_location, options=options)
+
+
+def _child(
+    *,
+    segment: typing.Union[str, int],
+    source: str,
+    current_location: types.Location,
+    options: types.Options,
+    member: bool,
+) -> typing.Iterator[typing.Tuple[types.TKey, types.Entry]]:
+    """
+    Calculate the source map of a value within an array or object.
+
+    Args:
+        segment: The key or array index of the value within its parent.
+        source: The JSON document.
+        current_location: The current location in the source.
+        options: The options for calculating the source map.
+        member: Whether the value is the value of an object member.
+
+    Returns:
+        The entries relative to the parent of the value.
+
+    """
+    budget = options.budget
+    length = len(str(segment)) + 1
+    if budget is not None:
+        budget.pointer_length += length
+    entries = value(
+        source=source,
+        current_location=current_location,
+        options=options,
+        member=member,
+    )
+    if budget is not None:
+        budget.pointer_length -= length
+    return _prefixed(segment=segment, entries=entries, options=options)
+
+
+def _key(
+    *, source: str, current_location: types.Location, options: types.Options
+) -> typing.Tuple[types.Location, types.Location, str, typing.Union[str, int]]:
+    """
+    Locate the key of an object member and advance past the name separator.
+
+    Args:
+        source: The JSON document.
+        current_location: The location of the start of the key.
+        options: The options for calculating the source map.
+
+    Returns:
+        The start and end locations of the key, its text without the quotation
+        marks and its segment for the JSON pointer, or path, of the value.
+
+    """
+    key_start = types.Location(
+        line=current_location.line,
+        column=current_location.column,
+        position=current_location.position,
+    )
+    value(source=source, current_location=current_location)
+    check.not_end(source=source, current_location=current_location)
+    key_end = types.Location(
+        line=current_location.line,
+        column=current_location.column,
+        position=current_location.position,
+    )
+
+    advance.to_next_non_whitespace(source=source, current_location=current_location)
+    check.not_end(source=source, current_location=current_location)
+    if source[current_location.position] != constants.NAME_SEPARATOR:
+        raise errors.InvalidJsonError(
+            f"expected name separator but got {source[current_location.position]}, "
+            f"{current_location=}"
+        )
+    current_location.column += 1
+    current_location.position += 1
+    check.not_end(source=source, current_location=current_location)
+    key_text = encoding.restore(
+        source[key_start.position + 1 : key_end.position - 1], units=options.units
+    )
+    key = encoding.decode_key(key_text)
+    return (
+        key_start,
+        key_end,
+        key_text,
+        key if options.key_style == types.TUPLE else sys.intern(tree.escape(key)),
+    )
 
 
 def object_(
-    *, source: str, current_location: types.Location
-) -> types.TSourceMapEntries:
+    *,
+    source: str,
+    current_location: types.Location,
+    options: types.Options = types.Options(),
+) -> types.TKeyedEntries:
     """
     Calculate the source map of an object value.
 
     Args:
         source: The JSON document.
         current_location: The current location in the source.
+        options: The options for calculating the source map.
 
     Returns:
-        A list of JSON pointers and source map entries.
+        A list of JSON pointers, or paths, and source map entries.
 
     """
     advance.to_next_non_whitespace(source=source, current_location=current_location)
@@ -55,8 +377,15 @@ def object_(
 
     current_location.column += 1
     current_location.position += 1
-
-    entries: types.TSourceMapEntries = []
+    budget = options.budget
+    if budget is not None:
+        budget.depth += 1
+
+    entries: types.TKeyedEntries = []
+    # The keys and content hashes of the members
+    hash_parts: typing.List[str] = [constants.BEGIN_OBJECT]
+    member_count = 0
+    truncated = False
     while current_location.position < len(source):
         advance.to_next_non_whitespace(source=source, current_location=current_location)
         # Check for object end
@@ -79,73 +408,91 @@ def object_(
                 f"invalid character {source[current_location.position]}, "
                 f"{current_location=}"
             )
+        if budget is not None and _stopped(
+            source=source, current_location=current_location, budget=budget
+        ):
+            truncated = True
+            break
 
         # Must have a key
-        key_start = types.Location(
-            line=current_location.line,
-            column=current_location.column,
-            position=current_location.position,
+        key_start, key_end, key_text, segment = _key(
+            source=source, current_location=current_location, options=options
         )
-        value(source=source, current_location=current_location)
-        check.not_end(source=source, current_location=current_location)
-        key_end = types.Location(
-            line=current_location.line,
-            column=current_location.column,
-            position=current_location.position,
-        )
-        key_value = source[key_start.position + 1 : key_end.position - 1]
 
         # Handle value
-        advance.to_next_non_whitespace(source=source, current_location=current_location)
-        check.not_end(source=source, current_location=current_location)
-        if source[current_location.position] != constants.NAME_SEPARATOR:
-            raise errors.InvalidJsonError(
-                f"expected name separator but got {source[current_location.position]}, "
-                f"{current_location=}"
-            )
-        current_location.column += 1
-        current_location.position += 1
-        check.not_end(source=source, current_location=current_location)
-        value_entries = iter(value(source=source, current_location=current_location))
+        value_entries = _child(
+            segment=segment,
+            source=source,
+            current_location=current_location,
+            options=options,
+            member=True,
+        )
         value_entry = next(value_entries)
 
         # Write pointers
         entries.append(
             (
-                f"/{key_value}",
-                types.Entry(
-                    value_start=value_entry[1].value_start,
-                    value_end=value_entry[1].value_end,
-                    key_start=key_start,
-                    key_end=key_end,
+                value_entry[0],
+                dataclasses.replace(
+                    value_entry[1], key_start=key_start, key_end=key_end
                 ),
             )
         )
-        entries.extend(
-            (f"/{key_value}{pointer}", entry) for pointer, entry in value_entries
-        )
+        member_count += 1
+        truncated = truncated or value_entry[1].truncated
+        if options.hashes:
+            hash_parts.append(
+                f"{constants.QUOTATION_MARK}{key_text}{constants.QUOTATION_MARK}"
+            )
+            hash_parts.append(typing.cast(str, value_entry[1].content_hash))
+        entries.extend(value_entries)
 
     # Must be at the object end location
     check.not_end(source=source, current_location=current_location)
     current_location.column += 1
     current_location.position += 1
-    value_end = types.Location(
-        current_location.line, current_location.column, current_location.position
-    )
-
-    return [("", types.Entry(value_start=value_start, value_end=value_end))] + entries
+    if budget is not None:
+        budget.depth -= 1
+
+    return [
+        (
+            _root(options),
+            types.Entry(
+                value_start=value_start,
+                value_end=types.Location(
+                    current_location.line,
+                    current_location.column,
+                    current_location.position,
+                ),
+                content_hash=(
+                    content_hash(*hash_parts)
+                    if options.hashes and not truncated
+                    else None
+                ),
+                truncated=truncated,
+                kind=types.OBJECT if options.kinds else None,
+                child_count=member_count if options.kinds and not truncated else None,
+            ),
+        )
+    ] + entries
 
 
-def array(*, source: str, current_location: types.Location) -> types.TSourceMapEntries:
+def array(
+    *,
+    source: str,
+    current_location: types.Location,
+    options: types.Options = types.Options(),
+) -> types.TKeyedEntries:
     """
     Calculate the source map of an array value.
 
     Args:
         source: The JSON document.
         current_location: The current location in the source.
+        options: The options for calculating the source map.
 
     Returns:
-        A list of JSON pointers and source map entries.
+        A list of JSON pointers, or paths, and source map entries.
 
     """
     advance.to_next_non_whitespace(source=source, current_location=current_location)
@@ -162,9 +509,15 @@ def array(*, source: str, current_location: types.Location) -> types.TSourceMapE
 
     current_location.column += 1
     current_location.position += 1
+    budget = options.budget
+    if budget is not None:
+        budget.depth += 1
 
     array_index = 0
-    entries: types.TSourceMapEntries = []
+    entries: types.TKeyedEntries = []
+    # The content hashes of the items
+    hash_parts: typing.List[str] = [constants.BEGIN_ARRAY]
+    truncated = False
     while current_location.position < len(source):
         advance.to_next_non_whitespace(source=source, current_location=current_location)
         # Check for array end
@@ -185,12 +538,26 @@ def array(*, source: str, current_location: types.Location) -> types.TSourceMapE
                 f"invalid character {source[current_location.position]}, "
                 f"{current_location=}"
             )
+        if budget is not None and _stopped(
+            source=source, current_location=current_location, budget=budget
+        ):
+            truncated = True
+            break
 
         # Must have a value
-        value_entries = value(source=source, current_location=current_location)
-        entries.extend(
-            (f"/{array_index}{pointer}", entry) for pointer, entry in value_entries
+        value_entries = _child(
+            segment=array_index,
+            source=source,
+            current_location=current_location,
+            options=options,
+            member=False,
         )
+        value_entry = next(value_entries)
+        entries.append(value_entry)
+        truncated = truncated or value_entry[1].truncated
+        if options.hashes:
+            hash_parts.append(typing.cast(str, value_entry[1].content_hash))
+        entries.extend(value_entries)
         array_index += 1
 
     # Must be at the array end location
@@ -200,22 +567,44 @@ def array(*, source: str, current_location: types.Location) -> types.TSourceMapE
     value_end = types.Location(
         current_location.line, current_location.column, current_location.position
     )
-
-    return [("", types.Entry(value_start=value_start, value_end=value_end))] + entries
+    if budget is not None:
+        budget.depth -= 1
+
+    return [
+        (
+            _root(options),
+            types.Entry(
+                value_start=value_start,
+                value_end=value_end,
+                content_hash=(
+                    content_hash(*hash_parts)
+                    if options.hashes and not truncated
+                    else None
+                ),
+                truncated=truncated,
+                kind=types.ARRAY if options.kinds else None,
+                child_count=array_index if options.kinds and not truncated else None,
+            ),
+        )
+    ] + entries
 
 
 def primitive(
-    *, source: str, current_location: types.Location
-) -> types.TSourceMapEntries:
+    *,
+    source: str,
+    current_location: types.Location,
+    options: types.Options = types.Options(),
+) -> types.TKeyedEntries:
     """
     Calculate the source map of a primitive type.
 
     Args:
         source: The JSON document.
         current_location: The current location in the source.
+        options: The options for calculating the source map.
 
     Returns:
-        A list of JSON pointers and source map entries.
+        A list of JSON pointers, or paths, and source map entries.
 
     """
     advance.to_next_non_whitespace(source=source, current_location=current_location)
@@ -241,22 +630,44 @@ def primitive(
         current_location.column += end_position - current_location.position
         current_location.position = end_position
 
-        value_end = types.Location(
-            current_location.line, current_location.column, current_location.position
-        )
-        return [("", types.Entry(value_start=value_start, value_end=value_end))]
-
-    # Advance to the next control character, whitespace or end of source
-    while (
-        current_location.position < len(source)
-        and source[current_location.position] not in constants.CONTROL_CHARACTER
-        and source[current_location.position] not in constants.WHITESPACE
-    ):
-        current_location.column += 1
-        current_location.position += 1
+    else:
+        # Advance to the next control character, whitespace or end of document
+        end = len(source) if options.end is None else options.end
+        while (
+            current_location.position < end
+            and source[current_location.position] not in constants.CONTROL_CHARACTER
+            and source[current_location.position] not in constants.WHITESPACE
+        ):
+            current_location.column += 1
+            current_location.position += 1
 
     value_end = types.Location(
         current_location.line, current_location.column, current_location.position
     )
 
-    return [("", types.Entry(value_start=value_start, value_end=value_end))]
+    value_hash = (
+        content_hash(
+            encoding.restore(
+                source[value_start.position : value_end.position],
+                units=options.units,
+            )
+        )
+        if options.hashes
+        else None
+    )
+
+    return [
+        (
+            _root(options),
+            types.Entry(
+                value_start=value_start,
+                value_end=value_end,
+                content_hash=value_hash,
+                kind=(
+                    PRIMITIVE_KINDS.get(source[value_start.position], types.NUMBER)
+                    if options.kinds
+                    else None
+                ),
+            ),
+        )
+    ]
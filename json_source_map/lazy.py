@@ -0,0 +1,186 @@
+"""JSON source map that only creates entries when they are accessed."""
+
+import array
+import typing
+
+from . import check, encoding, line_index, structural, types
+
+
+class LazyEntry(types.Entry):
+    """
+    Source map entry that calculates its locations when they are first accessed.
+
+    The line and column of each location are calculated from the line index shared
+    by all the entries of the source map.
+
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(
+        self,
+        *,
+        positions: array.array,
+        row: int,
+        shared_line_index: line_index.LineIndex,
+    ) -> None:
+        """Construct."""
+        self._positions = positions
+        self._offset = row * structural.ROW_SIZE
+        self._line_index = shared_line_index
+        self._locations: typing.List[typing.Optional[types.Location]] = [
+            None
+        ] * structural.ROW_SIZE
+
+    def _location(self, index: int) -> typing.Optional[types.Location]:
+        """
+        Retrieve a location, calculating it on first access.
+
+        Args:
+            index: The index of the location within the row of the entry.
+
+        Returns:
+            The location or None if the position is not set.
+
+        """
+        location = self._locations[index]
+        if location is None:
+            position = self._positions[self._offset + index]
+            if position == structural.NO_KEY:
+                return None
+            location = self._line_index.to_location(position)
+            self._locations[index] = location
+        return location
+
+    @property
+    def value_start(self) -> types.Location:  # type: ignore[override]
+        """The start location of the value."""
+        return typing.cast(types.Location, self._location(0))
+
+    @property
+    def value_end(self) -> types.Location:  # type: ignore[override]
+        """The end location of the value."""
+        return typing.cast(types.Location, self._location(1))
+
+    @property
+    def key_start(self) -> typing.Optional[types.Location]:  # type: ignore[override]
+        """The start location of the key if the value is directly within an object."""
+        return self._location(2)
+
+    @property
+    def key_end(self) -> typing.Optional[types.Location]:  # type: ignore[override]
+        """The end location of the key if the value is directly within an object."""
+        return self._location(3)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with any entry by the locations."""
+        if not isinstance(other, types.Entry):
+            return NotImplemented
+        return (
+            self.value_start,
+            self.value_end,
+            self.key_start,
+            self.key_end,
+            self.content_hash,
+            self.truncated,
+            self.kind,
+            self.child_count,
+        ) == (
+            other.value_start,
+            other.value_end,
+            other.key_start,
+            other.key_end,
+            other.content_hash,
+            other.truncated,
+            other.kind,
+            other.child_count,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class LazySourceMap(typing.Mapping[str, types.Entry]):
+    """
+    JSON source map that stores the positions of each value in a flat array.
+
+    The entries are created, and cached, when they are first accessed.
+
+    Attrs:
+        rows: The row of the positions of each JSON pointer.
+        positions: The value start, value end, key start and key end position of
+            each row.
+        line_index: The index used to calculate the line and column of positions.
+
+    """
+
+    __slots__ = ("rows", "positions", "line_index", "_entries")
+
+    def __init__(
+        self,
+        *,
+        rows: typing.Dict[str, int],
+        positions: array.array,
+        shared_line_index: line_index.LineIndex,
+    ) -> None:
+        """Construct."""
+        self.rows = rows
+        self.positions = positions
+        self.line_index = shared_line_index
+        self._entries: typing.Dict[int, LazyEntry] = {}
+
+    def __getitem__(self, pointer: str) -> types.Entry:
+        """Retrieve the entry of a JSON pointer, creating it on first access."""
+        row = self.rows[pointer]
+        entry = self._entries.get(row)
+        if entry is None:
+            # Keep the entry of whichever thread creates it first
+            entry = self._entries.setdefault(
+                row,
+                LazyEntry(
+                    positions=self.positions, row=row, shared_line_index=self.line_index
+                ),
+            )
+        return entry
+
+    def __iter__(self) -> typing.Iterator[str]:
+        """Iterate over the JSON pointers."""
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self.rows)
+
+    def __contains__(self, pointer: object) -> bool:
+        """Check whether the JSON pointer is in the source map."""
+        return pointer in self.rows
+
+
+def calculate(
+    source: str, *, units: encoding.TUnits = encoding.CODEPOINT
+) -> LazySourceMap:
+    """
+    Calculate the source map for a JSON document that creates entries on access.
+
+    Only the positions of each value are stored. The line and column of each
+    location is calculated the first time an entry is accessed which is faster and
+    uses less memory when only some entries are used.
+
+    Args:
+        source: The JSON document.
+        units: The units to count the column and position in, see calculate.
+
+    Returns:
+        The source map.
+
+    """
+    check.valid_input(source=source)
+    check.valid_units(units=units)
+
+    view = encoding.view(source, units=units)
+    rows, positions = structural.offsets(
+        source=view, structural_index=structural.index(view), units=units
+    )
+    return LazySourceMap(
+        rows=rows,
+        positions=positions,
+        shared_line_index=line_index.LineIndex.from_source(view),
+    )
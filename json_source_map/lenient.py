@@ -0,0 +1,223 @@
+"""Calculate the JSON source map of a document that might not be valid JSON."""
+
+import dataclasses
+import re
+import typing
+
+from . import check, constants, encoding, scanner, structural, types
+
+# Matches strings, which might not be closed at the end of the line, structural
+# characters, new lines and the other primitive values
+_TOKEN = re.compile(
+    r'"[^"\\\n]*(?:\\[^\n]?[^"\\\n]*)*"?|[\[\]{},:\n]|[^ \t\n\r"\[\]{},:]+'
+)
+_BEGIN = frozenset({constants.BEGIN_ARRAY, constants.BEGIN_OBJECT})
+
+
+@dataclasses.dataclass
+class _Container:
+    """
+    An array or object that has started but not yet ended.
+
+    Attrs:
+        pointer: The JSON pointer of the container, None if it could not be located
+            in which case the values within it are not included either.
+        entry: The entry of the container.
+        is_object: Whether the container is an object or an array.
+        next_index: The array index of the next item of an array.
+
+    """
+
+    pointer: typing.Optional[str]
+    entry: types.Entry
+    is_object: bool
+    next_index: int = 0
+
+
+def _close_message(container: _Container) -> str:
+    """Create the message for a container that is not closed."""
+    if container.is_object:
+        return f"expected {constants.END_OBJECT} to close the object"
+    return f"expected {constants.END_ARRAY} to close the array"
+
+
+def calculate(  # pylint: disable=too-many-branches,too-many-locals,too-many-statements
+    source: str, *, units: encoding.TUnits = encoding.CODEPOINT
+) -> types.PartialSourceMap:
+    """
+    Calculate the source map for a JSON document that might not be valid JSON.
+
+    The document is scanned once without checking that it is valid first. Each
+    part that is not valid is recorded as an error and skipped or, where something
+    is missing, the scan continues as if it was there. Values that are not valid
+    and the values within arrays and objects with keys that are not valid are not
+    included in the source map. Arrays and objects that are not closed end where
+    the value that contains them ends or at the end of the document.
+
+    The result for a valid document is the same as the result of calculate.
+
+    Args:
+        source: The JSON document, which might not be valid JSON.
+        units: The units to count the column and position in, see calculate.
+
+    Returns:
+        The source map of the valid parts of the document and the errors.
+
+    """
+    check.valid_string(source=source)
+    check.valid_units(units=units)
+    source = encoding.view(source, units=units)
+    result = types.PartialSourceMap()
+    line = 0
+    line_start = 0
+
+    def location(position: int) -> types.Location:
+        """Calculate the location of a position on the current line."""
+        return types.Location(line, position - line_start, position)
+
+    def error(start: types.Location, end: types.Location, message: str) -> None:
+        """Record a part of the document that is not valid."""
+        result.errors.append(types.ErrorSpan(start=start, end=end, message=message))
+
+    containers: typing.List[_Container] = []
+    # The segment and locations of the key of the next value, the segment is None
+    # if the key is not valid
+    key: typing.Optional[
+        typing.Tuple[typing.Optional[str], types.Location, types.Location]
+    ] = None
+    expected = scanner.VALUE
+
+    for match in _TOKEN.finditer(source):
+        start, end = match.span()
+        if source[start] == constants.RETURN:
+            line += 1
+            line_start = end
+            continue
+        character = source[start]
+        if expected == scanner.DONE:
+            error(
+                location(start),
+                location(len(source)),
+                "unexpected characters after the JSON document",
+            )
+            break
+
+        if character == constants.VALUE_SEPARATOR:
+            if expected == scanner.SEPARATOR_OR_END:
+                expected = scanner.KEY if containers[-1].is_object else scanner.VALUE
+            elif expected == scanner.VALUE and containers and containers[-1].is_object:
+                error(location(start), location(start), "expected a value")
+                key = None
+                expected = scanner.KEY
+            else:
+                error(location(start), location(end), f"unexpected {character}")
+            continue
+        if character == constants.NAME_SEPARATOR:
+            if expected == scanner.NAME_SEPARATOR:
+                expected = scanner.VALUE
+            else:
+                error(location(start), location(end), f"unexpected {character}")
+            continue
+
+        if character in structural.END:
+            is_object = character == constants.END_OBJECT
+            index = len(containers) - 1
+            while index >= 0 and containers[index].is_object != is_object:
+                index -= 1
+            if index < 0:
+                error(location(start), location(end), f"unexpected {character}")
+                continue
+
+            if index == len(containers) - 1:
+                if expected in {scanner.NAME_SEPARATOR, scanner.VALUE} and is_object:
+                    error(location(start), location(start), "expected a value")
+                elif expected in {scanner.KEY, scanner.VALUE}:
+                    error(location(start), location(start), "unexpected trailing ,")
+            while len(containers) > index + 1:
+                container = containers.pop()
+                container.entry.value_end = location(start)
+                error(
+                    container.entry.value_start,
+                    location(start),
+                    _close_message(container),
+                )
+            containers.pop().entry.value_end = location(end)
+            key = None
+            expected = scanner.SEPARATOR_OR_END if containers else scanner.DONE
+            continue
+
+        # Must be a key or a value
+        if expected == scanner.NAME_SEPARATOR:
+            message = f"expected {constants.NAME_SEPARATOR}"
+            error(location(start), location(start), message)
+            expected = scanner.VALUE
+        elif expected == scanner.SEPARATOR_OR_END:
+            message = f"expected {constants.VALUE_SEPARATOR}"
+            error(location(start), location(start), message)
+            expected = scanner.KEY if containers[-1].is_object else scanner.VALUE
+        if expected in {scanner.KEY, scanner.KEY_OR_END}:
+            if character not in _BEGIN:
+                # Anything other than an array or object is taken as the key
+                segment = None
+                if character != constants.QUOTATION_MARK:
+                    error(location(start), location(end), "expected a key")
+                elif scanner.STRING.fullmatch(source, start, end) is None:
+                    error(location(start), location(end), "the key is not valid")
+                else:
+                    segment = structural.segment(
+                        source[start + 1 : end - 1], units=units
+                    )
+                key = (segment, location(start), location(end))
+                expected = scanner.NAME_SEPARATOR
+                continue
+            error(location(start), location(start), "expected a key")
+            key = None
+
+        if not containers:
+            pointer: typing.Optional[str] = ""
+        elif containers[-1].pointer is None:
+            pointer = None
+        elif containers[-1].is_object:
+            pointer = (
+                f"{containers[-1].pointer}/{key[0]}"
+                if key is not None and key[0] is not None
+                else None
+            )
+        else:
+            pointer = f"{containers[-1].pointer}/{containers[-1].next_index}"
+        if containers and not containers[-1].is_object:
+            containers[-1].next_index += 1
+
+        entry = types.Entry(value_start=location(start), value_end=location(end))
+        if containers and containers[-1].is_object and key is not None:
+            entry.key_start = key[1]
+            entry.key_end = key[2]
+        key = None
+
+        if character in _BEGIN:
+            is_object = character == constants.BEGIN_OBJECT
+            containers.append(
+                _Container(pointer=pointer, entry=entry, is_object=is_object)
+            )
+            expected = scanner.KEY_OR_END if is_object else scanner.VALUE_OR_END
+        else:
+            if (
+                scanner.STRING
+                if character == constants.QUOTATION_MARK
+                else scanner.LITERAL
+            ).fullmatch(source, start, end) is None:
+                error(location(start), location(end), "the value is not valid")
+                pointer = None
+            expected = scanner.SEPARATOR_OR_END if containers else scanner.DONE
+        if pointer is not None:
+            result.source_map[pointer] = entry
+
+    end_location = location(len(source))
+    while containers:
+        container = containers.pop()
+        container.entry.value_end = end_location
+        error(container.entry.value_start, end_location, _close_message(container))
+    if not result.source_map and expected == scanner.VALUE:
+        error(end_location, end_location, "expected a value")
+    result.errors.sort(key=lambda span: span.start.position)
+    return result
@@ -0,0 +1,127 @@
+"""Convert positions in the source to line and column."""
+
+import array
+import bisect
+import typing
+
+from . import constants, types
+
+
+def import_numpy() -> typing.Any:
+    """
+    Import NumPy, which is optional and only imported when it is used.
+
+    Returns:
+        The NumPy module or None if it is not installed.
+
+    """
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+class LineIndex:
+    """
+    The positions of the new line characters of a JSON document.
+
+    Attrs:
+        newlines: The position of each new line character in ascending order.
+
+    """
+
+    __slots__ = ("newlines",)
+
+    def __init__(self, newlines: array.array) -> None:
+        """Construct."""
+        self.newlines = newlines
+
+    @classmethod
+    def from_source(cls, source: str) -> "LineIndex":
+        """
+        Build the index of the new line characters of the source.
+
+        Args:
+            source: The JSON document.
+
+        Returns:
+            The line index.
+
+        """
+        newlines = array.array("q")
+        position = source.find(constants.RETURN)
+        while position != -1:
+            newlines.append(position)
+            position = source.find(constants.RETURN, position + 1)
+        return cls(newlines)
+
+    def to_location(self, position: int) -> types.Location:
+        """
+        Calculate the location of a position.
+
+        Args:
+            position: The position in the source.
+
+        Returns:
+            The line, column and position.
+
+        """
+        line = bisect.bisect_left(self.newlines, position)
+        column = position - self.newlines[line - 1] - 1 if line else position
+        return types.Location(line, column, position)
+
+    def to_locations(
+        self, positions: typing.Iterable[int]
+    ) -> typing.List[types.Location]:
+        """
+        Calculate the locations of many positions at once.
+
+        The lines of all the positions are found together using NumPy if it is
+        installed and otherwise using a binary search for each position.
+
+        Args:
+            positions: The positions in the source in any order.
+
+        Returns:
+            The line, column and position of each position.
+
+        """
+        numpy = import_numpy()
+        if numpy is not None:
+            return self._to_locations_numpy(positions, numpy=numpy)
+
+        newlines = self.newlines
+        locations: typing.List[types.Location] = []
+        for position in positions:
+            line = bisect.bisect_left(newlines, position)
+            column = position - newlines[line - 1] - 1 if line else position
+            locations.append(types.Location(line, column, position))
+        return locations
+
+    def _to_locations_numpy(
+        self, positions: typing.Iterable[int], *, numpy: typing.Any
+    ) -> typing.List[types.Location]:
+        """
+        Calculate the locations of many positions at once using NumPy.
+
+        Args:
+            positions: The positions in the source in any order.
+            numpy: The NumPy module.
+
+        Returns:
+            The line, column and position of each position.
+
+        """
+        newlines = numpy.frombuffer(self.newlines, dtype=numpy.int64)
+        position_array = numpy.fromiter(positions, dtype=numpy.int64)
+        lines = numpy.searchsorted(newlines, position_array, side="left")
+        # The position of the new line before each position, -1 on the first line
+        previous = numpy.concatenate(([-1], newlines))[lines]
+        columns = position_array - previous - 1
+        return [
+            types.Location(line, column, position)
+            for line, column, position in zip(
+                lines.tolist(), columns.tolist(), position_array.tolist()
+            )
+        ]
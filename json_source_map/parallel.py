@@ -0,0 +1,475 @@
+"""Calculate JSON source maps across multiple processes or threads."""
+
+import concurrent.futures
+import functools
+import json
+import os
+import re
+import sys
+import typing
+
+from . import check, constants, encoding, errors, handle, scanner, tree, types
+
+# Matches strings and structural characters, skipping everything else
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{},:]')
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Chunks per worker so that uneven members are spread across the workers
+_CHUNKS_PER_WORKER = 4
+
+# The key start, key end, value start and value end positions of a member
+TMember = typing.Tuple[typing.Optional[int], typing.Optional[int], int, int]
+# The key start and key end locations of a member, None for array items
+TKey = typing.Optional[typing.Tuple[types.Location, types.Location]]
+
+
+def strip(*, source: str, start: int, end: int) -> typing.Tuple[int, int]:
+    """
+    Move the start and end of a range inwards past any whitespace.
+
+    Args:
+        source: The JSON document.
+        start: The start position of the range.
+        end: The end position of the range.
+
+    Returns:
+        The start and end positions without the surrounding whitespace.
+
+    """
+    while start < end and source[start] in constants.WHITESPACE:
+        start += 1
+    while end > start and source[end - 1] in constants.WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def _check_whitespace(*, source: str, start: int, end: int) -> None:
+    """
+    Check that there are only whitespace characters in a range.
+
+    Args:
+        source: The JSON document.
+        start: The start position of the range.
+        end: The end position of the range.
+
+    """
+    if _WHITESPACE.fullmatch(source, start, end) is None:
+        raise errors.InvalidInputError(
+            f"JSON is not valid, unexpected characters at {start}"
+        )
+
+
+def members(  # pylint: disable=too-many-branches
+    *, source: str, start: int
+) -> typing.Tuple[typing.List[TMember], int]:
+    """
+    Find the members of the top level array or object.
+
+    Only the structure of the top level container and its keys are checked, the
+    values of the members are not checked.
+
+    Args:
+        source: The JSON document.
+        start: The position of the start of the top level container.
+
+    Returns:
+        The key and value positions of the members and the position just after the
+        end of the container.
+
+    """
+    is_object = source[start] == constants.BEGIN_OBJECT
+    close = constants.END_OBJECT if is_object else constants.END_ARRAY
+    found: typing.List[TMember] = []
+
+    depth = 0
+    key: typing.Optional[typing.Tuple[int, int]] = None
+    # Whether the value of the member has started, always true for arrays
+    in_value = not is_object
+    # The end of the last top level token
+    last = start + 1
+    for match in _TOKEN.finditer(source, start + 1):
+        character = source[match.start()]
+        if depth > 0:
+            if character in {constants.BEGIN_ARRAY, constants.BEGIN_OBJECT}:
+                depth += 1
+            elif character in {constants.END_ARRAY, constants.END_OBJECT}:
+                depth -= 1
+            continue
+
+        if not in_value:
+            # Expecting the key, the name separator or the end of an empty object
+            if character == constants.QUOTATION_MARK and key is None:
+                _check_whitespace(source=source, start=last, end=match.start())
+                if scanner.STRING.fullmatch(source, match.start(), match.end()) is None:
+                    raise errors.InvalidInputError(
+                        f"JSON is not valid, the key at {match.start()} is not valid"
+                    )
+                key = (match.start(), match.end())
+            elif character == constants.NAME_SEPARATOR and key is not None:
+                _check_whitespace(source=source, start=last, end=match.start())
+                in_value = True
+            elif character == close and key is None and not found:
+                _check_whitespace(source=source, start=last, end=match.start())
+                return found, match.end()
+            else:
+                raise errors.InvalidInputError(
+                    f"JSON is not valid, unexpected {character} at {match.start()}"
+                )
+            last = match.end()
+            continue
+
+        if character in {constants.BEGIN_ARRAY, constants.BEGIN_OBJECT}:
+            depth += 1
+        elif character in {constants.VALUE_SEPARATOR, close}:
+            value_start, value_end = strip(source=source, start=last, end=match.start())
+            if character == close and not is_object and not found:
+                if value_start == value_end:
+                    return found, match.end()
+            found.append(
+                (
+                    key[0] if key is not None else None,
+                    key[1] if key is not None else None,
+                    value_start,
+                    value_end,
+                )
+            )
+            if character == close:
+                return found, match.end()
+            key = None
+            in_value = not is_object
+            last = match.end()
+        elif character in {
+            constants.END_ARRAY,
+            constants.END_OBJECT,
+            constants.NAME_SEPARATOR,
+        }:
+            raise errors.InvalidInputError(
+                f"JSON is not valid, unexpected {character} at {match.start()}"
+            )
+
+    raise errors.InvalidInputError("JSON is not valid, the document ended unexpectedly")
+
+
+class _Locator:  # pylint: disable=too-few-public-methods
+    """Calculate the location of increasing positions in the source."""
+
+    def __init__(self, source: str) -> None:
+        """Construct."""
+        self._source = source
+        self._line = 0
+        self._line_start = 0
+        self._position = 0
+
+    def location(self, position: int) -> types.Location:
+        """
+        Calculate the location of a position.
+
+        Args:
+            position: The position which is not before any previous position.
+
+        Returns:
+            The location of the position.
+
+        """
+        self._line += self._source.count(constants.RETURN, self._position, position)
+        newline = self._source.rfind(constants.RETURN, self._position, position)
+        if newline != -1:
+            self._line_start = newline + 1
+        self._position = position
+        return types.Location(self._line, position - self._line_start, position)
+
+
+def free_threaded() -> bool:
+    """Check whether the global interpreter lock is disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    # Only defined from Python 3.13, where it is callable
+    return (
+        is_gil_enabled is not None
+        and not is_gil_enabled()  # pylint: disable=not-callable
+    )
+
+
+def _pool(
+    *, workers: typing.Optional[int], threads: typing.Optional[bool]
+) -> concurrent.futures.Executor:
+    """
+    Create the pool to calculate the source maps in.
+
+    Args:
+        workers: The number of workers, defaults to the number of CPUs.
+        threads: Whether to use threads or processes, by default threads if the
+            global interpreter lock is disabled.
+
+    Returns:
+        The thread or process pool.
+
+    """
+    if threads is None:
+        threads = free_threaded()
+    if threads:
+        return concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+
+def _chunksize(*, count: int, workers: typing.Optional[int]) -> int:
+    """
+    Calculate the number of items to send to a worker at once.
+
+    Args:
+        count: The number of items.
+        workers: The number of workers, defaults to the number of CPUs.
+
+    Returns:
+        The number of items per chunk.
+
+    """
+    workers = workers if workers is not None else os.cpu_count() or 1
+    return max(1, count // (workers * _CHUNKS_PER_WORKER))
+
+
+def _scan(source: str, start: types.Location) -> types.TSourceMapEntries:
+    """
+    Calculate the source map of a member of the top level container.
+
+    Args:
+        source: The JSON document of the member.
+        start: The location of the member in the whole document.
+
+    Returns:
+        The JSON pointers and source map entries relative to the member.
+
+    """
+    try:
+        json.loads(source)
+    except json.JSONDecodeError as error:
+        raise errors.InvalidInputError(
+            f"JSON is not valid, member at {start.position}"
+        ) from error
+
+    # The line and column are tracked from the start of the member, only the
+    # position is relative to the member
+    entries = typing.cast(
+        types.TSourceMapEntries,
+        handle.value(
+            source=source,
+            current_location=types.Location(start.line, start.column, 0),
+        ),
+    )
+    for _, entry in entries:
+        entry.value_start.position += start.position
+        entry.value_end.position += start.position
+        if entry.key_start is not None and entry.key_end is not None:
+            entry.key_start.position += start.position
+            entry.key_end.position += start.position
+    return entries
+
+
+def _locate(
+    *, source: str, start: int, end: int, found: typing.List[TMember]
+) -> typing.Tuple[
+    types.Entry, typing.List[TKey], typing.List[str], typing.List[types.Location]
+]:
+    """
+    Calculate the locations of the top level container and its members.
+
+    Args:
+        source: The JSON document.
+        start: The position of the start of the top level container.
+        end: The position just after the end of the top level container.
+        found: The key and value positions of the members.
+
+    Returns:
+        The entry of the top level container, the locations of the key of each
+        member, the JSON document of each member and its start location.
+
+    """
+    locator = _Locator(source)
+    root_start = locator.location(start)
+    keys: typing.List[TKey] = []
+    values: typing.List[str] = []
+    value_starts: typing.List[types.Location] = []
+    for key_start, key_end, value_start, value_end in found:
+        keys.append(
+            (locator.location(key_start), locator.location(key_end))
+            if key_start is not None and key_end is not None
+            else None
+        )
+        values.append(source[value_start:value_end])
+        value_starts.append(locator.location(value_start))
+    root = types.Entry(value_start=root_start, value_end=locator.location(end))
+    return root, keys, values, value_starts
+
+
+def _merge(
+    *,
+    source: str,
+    root: types.Entry,
+    keys: typing.List[TKey],
+    results: typing.List[types.TSourceMapEntries],
+) -> types.TSourceMap:
+    """
+    Combine the entries of the members of the top level container.
+
+    Args:
+        source: The JSON document.
+        root: The entry of the top level container.
+        keys: The locations of the key of each member, None for array items.
+        results: The entries of each member relative to the member.
+
+    Returns:
+        The source map.
+
+    """
+    source_map: types.TSourceMap = {"": root}
+    for index, (key, entries) in enumerate(zip(keys, results)):
+        if key is None:
+            prefix = f"/{index}"
+            source_map.update(
+                (f"{prefix}{pointer}", entry) for pointer, entry in entries
+            )
+            continue
+
+        key_start, key_end = key
+        name = encoding.decode_key(
+            source[key_start.position + 1 : key_end.position - 1]
+        )
+        prefix = f"/{tree.escape(name)}"
+        iterator = iter(entries)
+        _, value_entry = next(iterator)
+        source_map[prefix] = types.Entry(
+            value_start=value_entry.value_start,
+            value_end=value_entry.value_end,
+            key_start=key_start,
+            key_end=key_end,
+        )
+        source_map.update((f"{prefix}{pointer}", entry) for pointer, entry in iterator)
+    return source_map
+
+
+def calculate(
+    source: str,
+    *,
+    processes: typing.Optional[int] = None,
+    threads: typing.Optional[bool] = None,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> types.TSourceMap:
+    """
+    Calculate the source map for a JSON document across multiple processes.
+
+    The members of the top level array or object are found first and then the
+    source map of each member is calculated in parallel. Documents where the top
+    level value is not an array or object are calculated in the current process.
+
+    Args:
+        source: The JSON document.
+        processes: The number of processes, or threads, to use, defaults to the
+            number of CPUs.
+        threads: Whether to use a thread pool instead of a process pool, which
+            avoids copying the members and their entries between processes. By
+            default threads are used if the global interpreter lock is disabled,
+            such as on a free-threaded build of Python 3.13 or later.
+        executor: The executor to submit the members to, by default a pool is
+            created for the call.
+
+    Returns:
+        The source map.
+
+    """
+    if not isinstance(source, str):
+        raise errors.InvalidInputError(f"source must be a string, got {type(source)}")
+    start, _ = strip(source=source, start=0, end=len(source))
+    if start == len(source) or source[start] not in {
+        constants.BEGIN_ARRAY,
+        constants.BEGIN_OBJECT,
+    }:
+        check.valid_input(source=source)
+        return dict(
+            typing.cast(
+                types.TSourceMapEntries,
+                handle.value(source=source, current_location=types.Location(0, 0, 0)),
+            )
+        )
+
+    found, end = members(source=source, start=start)
+    _check_whitespace(source=source, start=end, end=len(source))
+
+    root, keys, values, value_starts = _locate(
+        source=source, start=start, end=end, found=found
+    )
+
+    chunksize = _chunksize(count=len(found), workers=processes)
+    if executor is None:
+        with _pool(workers=processes, threads=threads) as pool:
+            results = list(pool.map(_scan, values, value_starts, chunksize=chunksize))
+    else:
+        results = list(executor.map(_scan, values, value_starts, chunksize=chunksize))
+
+    return _merge(
+        source=source,
+        root=root,
+        keys=keys,
+        results=results,
+    )
+
+
+def _calculate(source: str, *, units: encoding.TUnits) -> types.TSourceMap:
+    """
+    Calculate the source map of one of the documents of calculate_many.
+
+    Args:
+        source: The JSON document.
+        units: The units to count the column and position in.
+
+    Returns:
+        The source map.
+
+    """
+    check.valid_input(source=source)
+    return dict(
+        typing.cast(
+            types.TSourceMapEntries,
+            handle.value(
+                source=encoding.view(source, units=units),
+                current_location=types.Location(0, 0, 0),
+                options=types.Options(units=units),
+            ),
+        )
+    )
+
+
+def calculate_many(
+    sources: typing.Iterable[str],
+    *,
+    units: encoding.TUnits = encoding.CODEPOINT,
+    processes: typing.Optional[int] = None,
+    threads: typing.Optional[bool] = None,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> typing.List[types.TSourceMap]:
+    """
+    Calculate the source maps for many JSON documents in parallel.
+
+    Each calculation only uses its own state, which means that the documents can
+    be calculated in threads as well as in processes.
+
+    Args:
+        sources: The JSON documents.
+        units: The units to count the column and position in, see calculate.
+        processes: The number of processes, or threads, to use, defaults to the
+            number of CPUs.
+        threads: Whether to use a thread pool instead of a process pool, which
+            avoids copying the documents and source maps between processes. By
+            default threads are used if the global interpreter lock is disabled.
+        executor: The executor to submit the documents to, by default a pool is
+            created for the call.
+
+    Returns:
+        The source map of each document in the same order as the documents.
+
+    """
+    check.valid_units(units=units)
+    sources = list(sources)
+    calculate_one = functools.partial(_calculate, units=units)
+    chunksize = _chunksize(count=len(sources), workers=processes)
+    if executor is None:
+        with _pool(workers=processes, threads=threads) as pool:
+            return list(pool.map(calculate_one, sources, chunksize=chunksize))
+    return list(executor.map(calculate_one, sources, chunksize=chunksize))
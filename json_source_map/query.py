@@ -0,0 +1,149 @@
+"""Look up entries in the JSON source map."""
+
+import fnmatch
+import typing
+
+from . import errors, tree, types
+
+# Matches any number of segments in a query
+ANY_SEGMENTS = "**"
+# Matches any single segment in a query
+ANY_SEGMENT = "*"
+_GLOB_CHARACTERS = frozenset("*?[")
+
+
+def to_pointer(path: typing.Iterable[typing.Union[str, int]]) -> str:
+    """
+    Convert a path of keys and array indexes to a JSON pointer.
+
+    Args:
+        path: The keys and array indexes to a value.
+
+    Returns:
+        The JSON pointer to the value.
+
+    """
+    return "".join(
+        f"{tree.POINTER_SEPARATOR}{tree.escape(str(segment))}" for segment in path
+    )
+
+
+def lookup_paths(
+    source_map: typing.Union[types.TSourceMap, types.TPathSourceMap],
+    paths: typing.Iterable[typing.Iterable[typing.Union[str, int]]],
+) -> typing.List[typing.Optional[types.Entry]]:
+    """
+    Look up the entries for many paths, such as those reported by validators.
+
+    Args:
+        source_map: The source map keyed by JSON pointers or by paths.
+        paths: The sequences of keys and array indexes to look up.
+
+    Returns:
+        The entry for each path or None if the path is not in the source map.
+
+    """
+    if not source_map:
+        return [None for _ in paths]
+    if isinstance(next(iter(source_map)), str):
+        pointer_source_map = typing.cast(types.TSourceMap, source_map)
+        return [pointer_source_map.get(to_pointer(path)) for path in paths]
+    path_source_map = typing.cast(types.TPathSourceMap, source_map)
+    return [path_source_map.get(tuple(path)) for path in paths]
+
+
+def _matching(node: tree.Node, segment: str) -> typing.Iterator[tree.Node]:
+    """
+    Find the children of a node that match a segment of a query.
+
+    Args:
+        node: The node.
+        segment: The unescaped segment of the query.
+
+    Returns:
+        The matching children.
+
+    """
+    if segment == ANY_SEGMENT:
+        return iter(node.children.values())
+    if _GLOB_CHARACTERS.isdisjoint(segment):
+        child = node.children.get(segment)
+        return iter(()) if child is None else iter((child,))
+    return (
+        child
+        for key, child in node.children.items()
+        if fnmatch.fnmatchcase(key, segment)
+    )
+
+
+def query(
+    source_map: typing.Union[types.TSourceMap, tree.Node], pattern: str
+) -> types.TSourceMap:
+    """
+    Find the entries with a JSON pointer that matches a pattern.
+
+    Each segment of the pattern is matched against the key or array index of a
+    value. * matches any single segment, ** matches any number of segments and
+    segments with the glob characters *, ? and [ are matched as in fnmatch. Other
+    segments are looked up directly, escaped as in a JSON pointer.
+
+    The pattern is matched against the tree of the source map, see calculate_tree,
+    so that only the values along matching segments are visited. Building the tree
+    visits every entry, pass the tree, rather than the source map, to run many
+    queries against the same document.
+
+    Args:
+        source_map: The source map, in document order, or its tree.
+        pattern: The JSON pointer pattern, such as /paths/*/get.
+
+    Returns:
+        The matching JSON pointers and entries in document order.
+
+    """
+    if pattern and not pattern.startswith(tree.POINTER_SEPARATOR):
+        raise errors.InvalidInputError(
+            f"pattern must be empty or start with {tree.POINTER_SEPARATOR}, "
+            f"got {pattern}"
+        )
+    root = (
+        source_map
+        if isinstance(source_map, tree.Node)
+        else tree.from_entries(source_map.items())
+    )
+    segments = [
+        tree.unescape(segment) for segment in pattern.split(tree.POINTER_SEPARATOR)[1:]
+    ]
+
+    matches: types.TSourceMap = {}
+    # The nodes with their pointer and the number of segments of the pattern they
+    # have matched
+    stack: typing.List[typing.Tuple[tree.Node, str, int]] = [(root, "", 0)]
+    seen: typing.Set[typing.Tuple[str, int]] = set()
+    while stack:
+        node, pointer, matched = stack.pop()
+        if (pointer, matched) in seen:
+            continue
+        seen.add((pointer, matched))
+
+        if matched == len(segments):
+            matches[pointer] = node.entry
+            continue
+        segment = segments[matched]
+        if segment == ANY_SEGMENTS:
+            # Match no more segments or consume a segment of the value
+            stack.append((node, pointer, matched + 1))
+            children: typing.Iterable[tree.Node] = node.children.values()
+            next_matched = matched
+        else:
+            children = _matching(node, segment)
+            next_matched = matched + 1
+        stack.extend(
+            (
+                child,
+                f"{pointer}{tree.POINTER_SEPARATOR}{tree.escape(child.segment)}",
+                next_matched,
+            )
+            for child in children
+        )
+
+    return dict(sorted(matches.items(), key=lambda item: item[1].value_start.position))
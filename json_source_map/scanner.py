@@ -0,0 +1,601 @@
+"""Calculate the JSON source map in steps that can be paused and resumed."""
+
+import dataclasses
+import re
+import sys
+import typing
+
+from . import check, constants, encoding, errors, structural, tree, types
+
+# Matches valid strings and the other primitive values, each part of a string can
+# only be matched in one way so that strings that are not closed fail quickly
+STRING = re.compile(
+    r'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+)
+LITERAL = re.compile(
+    r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null"
+    r"|NaN|-?Infinity"
+)
+
+# What is expected next
+VALUE = 0
+VALUE_OR_END = 1
+KEY = 2
+KEY_OR_END = 3
+NAME_SEPARATOR = 4
+SEPARATOR_OR_END = 5
+DONE = 6
+
+# What the scan found
+START_OBJECT = "start_object"
+END_OBJECT = "end_object"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+NAME = "name"
+SCALAR = "scalar"
+
+
+@dataclasses.dataclass
+class Container:
+    """
+    An array or object that has started but not yet ended.
+
+    Attrs:
+        pointer: The JSON pointer of the container.
+        is_object: Whether the container is an object or an array.
+        value_start: The start location of the container.
+        key_start: The start location of the key of the container, if any.
+        key_end: The end location of the key of the container, if any.
+        next_index: The array index of the next item of an array.
+
+    """
+
+    pointer: str
+    is_object: bool
+    value_start: types.Location
+    key_start: typing.Optional[types.Location] = None
+    key_end: typing.Optional[types.Location] = None
+    next_index: int = 0
+
+
+@dataclasses.dataclass
+class State:  # pylint: disable=too-many-instance-attributes
+    """
+    The state of a scan between two tokens of the source.
+
+    Attrs:
+        units: The units the column and position are counted in.
+        position: The position of the next character to scan.
+        line: The line of the next character to scan.
+        column: The column of the next character to scan.
+        containers: The arrays and objects that have started but not yet ended from
+            the outermost to the innermost.
+        expected: What is expected next, one of VALUE, VALUE_OR_END, KEY,
+            KEY_OR_END, NAME_SEPARATOR, SEPARATOR_OR_END or DONE.
+        key_segment: The escaped key of the next value, if any.
+        key_start: The start location of the key of the next value, if any.
+        key_end: The end location of the key of the next value, if any.
+
+    """
+
+    units: encoding.TUnits = encoding.CODEPOINT
+    position: int = 0
+    line: int = 0
+    column: int = 0
+    containers: typing.List[Container] = dataclasses.field(default_factory=list)
+    expected: int = VALUE
+    key_segment: typing.Optional[str] = None
+    key_start: typing.Optional[types.Location] = None
+    key_end: typing.Optional[types.Location] = None
+
+
+def _location(
+    value: typing.Optional[typing.Dict[str, int]]
+) -> typing.Optional[types.Location]:
+    """Convert the dictionary of a location created by Checkpoint.to_dict."""
+    if value is None:
+        return None
+    return types.Location(
+        line=value["line"], column=value["column"], position=value["position"]
+    )
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    """
+    The state of the scanner between two tokens of the source.
+
+    Attrs:
+        length: The length of the source to check that it is resumed on the same
+            source.
+        state: The state of the scan.
+
+    """
+
+    length: int
+    state: State = dataclasses.field(default_factory=State)
+
+    @property
+    def done(self) -> bool:
+        """Whether the whole source has been scanned."""
+        return self.state.expected == DONE
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """Convert to a dictionary that can be serialized as JSON."""
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, value: typing.Dict[str, typing.Any]) -> "Checkpoint":
+        """
+        Convert from a dictionary created by to_dict.
+
+        Args:
+            value: The dictionary.
+
+        Returns:
+            The checkpoint.
+
+        """
+        state = value["state"]
+        return cls(
+            length=value["length"],
+            state=State(
+                units=state["units"],
+                position=state["position"],
+                line=state["line"],
+                column=state["column"],
+                containers=[
+                    Container(
+                        pointer=container["pointer"],
+                        is_object=container["is_object"],
+                        value_start=typing.cast(
+                            types.Location, _location(container["value_start"])
+                        ),
+                        key_start=_location(container["key_start"]),
+                        key_end=_location(container["key_end"]),
+                        next_index=container["next_index"],
+                    )
+                    for container in state["containers"]
+                ],
+                expected=state["expected"],
+                key_segment=state["key_segment"],
+                key_start=_location(state["key_start"]),
+                key_end=_location(state["key_end"]),
+            ),
+        )
+
+
+def _copy(checkpoint: Checkpoint) -> Checkpoint:
+    """Copy the checkpoint so that the scan does not change the original."""
+    return Checkpoint(
+        length=checkpoint.length,
+        state=dataclasses.replace(
+            checkpoint.state,
+            containers=[
+                dataclasses.replace(container)
+                for container in checkpoint.state.containers
+            ],
+        ),
+    )
+
+
+class Event(typing.NamedTuple):
+    """
+    A value, key or end of an array or object found by scan_events.
+
+    Attrs:
+        kind: What was found, one of START_OBJECT, END_OBJECT, START_ARRAY,
+            END_ARRAY, NAME or SCALAR.
+        pointer: The JSON pointer of the value or, for NAME, the decoded key.
+        start: The start location of the value or key.
+        end: The end location of the value or key, for START_OBJECT and
+            START_ARRAY the location just after the opening character.
+        key_start: The start location of the key of the value, if any.
+        key_end: The end location of the key of the value, if any.
+
+    """
+
+    kind: str
+    pointer: str
+    start: types.Location
+    end: types.Location
+    key_start: typing.Optional[types.Location] = None
+    key_end: typing.Optional[types.Location] = None
+
+
+def unexpected(token: str, position: int) -> errors.InvalidInputError:
+    """Create the error for an unexpected token."""
+    return errors.InvalidInputError(
+        f"JSON is not valid, unexpected {token[:20]} at {position}"
+    )
+
+
+def _end(token: str, start: types.Location, end: types.Location, state: State) -> Event:
+    """
+    Close the innermost array or object.
+
+    Args:
+        token: The closing character.
+        start: The start location of the token.
+        end: The end location of the token.
+        state: The state of the scan, which is updated.
+
+    Returns:
+        The event for the end of the array or object.
+
+    """
+    containers = state.containers
+    is_object = token == constants.END_OBJECT
+    if (
+        not containers
+        or containers[-1].is_object != is_object
+        or state.expected
+        not in {SEPARATOR_OR_END, KEY_OR_END if is_object else VALUE_OR_END}
+    ):
+        raise unexpected(token, start.position)
+    container = containers.pop()
+    state.expected = SEPARATOR_OR_END if containers else DONE
+    return Event(
+        kind=END_OBJECT if is_object else END_ARRAY,
+        pointer=container.pointer,
+        start=container.value_start,
+        end=end,
+        key_start=container.key_start,
+        key_end=container.key_end,
+    )
+
+
+def _name(
+    token: str, start: types.Location, end: types.Location, state: State
+) -> Event:
+    """
+    Record the key of the next object member.
+
+    Args:
+        token: The key including the quotation marks.
+        start: The start location of the key.
+        end: The end location of the key.
+        state: The state of the scan, which is updated.
+
+    Returns:
+        The event for the key.
+
+    """
+    if STRING.fullmatch(token) is None:
+        raise unexpected(token, start.position)
+    key = encoding.decode_key(encoding.restore(token[1:-1], units=state.units))
+    state.key_segment = sys.intern(tree.escape(key))
+    state.key_start = start
+    state.key_end = end
+    state.expected = NAME_SEPARATOR
+    return Event(kind=NAME, pointer=key, start=start, end=end)
+
+
+def _value(
+    token: str, start: types.Location, end: types.Location, state: State
+) -> Event:
+    """
+    Locate a value and start it if it is an array or object.
+
+    Args:
+        token: The value or the opening character of an array or object.
+        start: The start location of the token.
+        end: The end location of the token.
+        state: The state of the scan, which is updated.
+
+    Returns:
+        The event for the value or the start of the array or object.
+
+    """
+    containers = state.containers
+    if not containers:
+        pointer = ""
+    elif containers[-1].is_object:
+        pointer = f"{containers[-1].pointer}/{state.key_segment}"
+    else:
+        pointer = f"{containers[-1].pointer}/{containers[-1].next_index}"
+        containers[-1].next_index += 1
+    key_start, key_end = state.key_start, state.key_end
+    state.key_segment = state.key_start = state.key_end = None
+
+    character = token[0]
+    if character in {constants.BEGIN_ARRAY, constants.BEGIN_OBJECT}:
+        is_object = character == constants.BEGIN_OBJECT
+        containers.append(
+            Container(
+                pointer=pointer,
+                is_object=is_object,
+                value_start=start,
+                key_start=key_start,
+                key_end=key_end,
+            )
+        )
+        state.expected = KEY_OR_END if is_object else VALUE_OR_END
+        kind = START_OBJECT if is_object else START_ARRAY
+    else:
+        pattern = STRING if character == constants.QUOTATION_MARK else LITERAL
+        if pattern.fullmatch(token) is None:
+            raise unexpected(token, start.position)
+        state.expected = SEPARATOR_OR_END if containers else DONE
+        kind = SCALAR
+    return Event(
+        kind=kind,
+        pointer=pointer,
+        start=start,
+        end=end,
+        key_start=key_start,
+        key_end=key_end,
+    )
+
+
+def scan_events(
+    tokens: typing.Iterable[typing.Tuple[int, str]], state: State
+) -> typing.Iterator[Event]:
+    """
+    Check the tokens of a JSON document and report the values and keys they form.
+
+    The state is updated before each event is returned, which means that the scan
+    can be stopped after any event and resumed from the state with the tokens that
+    follow it.
+
+    Args:
+        tokens: The position and text of each token from the position of the state,
+            see structural.tokens.
+        state: The state of the scan, which is updated.
+
+    Returns:
+        The events in document order.
+
+    """
+    line_start = state.position - state.column
+    for start, token in tokens:
+        end = start + len(token)
+        state.position = end
+        character = token[0]
+        if character == constants.RETURN:
+            state.line += 1
+            state.column = 0
+            line_start = end
+            continue
+        state.column = end - line_start
+
+        if character == constants.VALUE_SEPARATOR:
+            if state.expected != SEPARATOR_OR_END:
+                raise unexpected(token, start)
+            state.expected = KEY if state.containers[-1].is_object else VALUE
+            continue
+        if character == constants.NAME_SEPARATOR:
+            if state.expected != NAME_SEPARATOR:
+                raise unexpected(token, start)
+            state.expected = VALUE
+            continue
+
+        start_location = types.Location(state.line, start - line_start, start)
+        end_location = types.Location(state.line, state.column, end)
+        if character in structural.END:
+            yield _end(token, start_location, end_location, state)
+        elif state.expected in {KEY, KEY_OR_END}:
+            yield _name(token, start_location, end_location, state)
+        elif state.expected in {VALUE, VALUE_OR_END}:
+            yield _value(token, start_location, end_location, state)
+        else:
+            raise unexpected(token, start)
+
+    if state.expected != DONE:
+        raise errors.InvalidInputError(
+            "JSON is not valid, the document ended unexpectedly"
+        )
+
+
+def scan_depths(  # pylint: disable=too-many-branches
+    tokens: typing.Iterable[typing.Tuple[int, str]]
+) -> typing.Iterator[typing.Tuple[int, int]]:
+    """
+    Check the tokens of a JSON document without locating the values and keys.
+
+    Only whether each array or object that has started is an object is kept, which
+    means that a document is checked in memory proportional to how deeply it is
+    nested and without recursion.
+
+    Args:
+        tokens: The position and text of each token, see structural.tokens.
+
+    Returns:
+        The position just after each token and the number of arrays and objects it
+        is within.
+
+    """
+    # Whether each array or object that has started but not yet ended is an object
+    containers: typing.List[bool] = []
+    expected = VALUE
+    for start, token in tokens:
+        character = token[0]
+        if character == constants.RETURN:
+            continue
+
+        if character == constants.VALUE_SEPARATOR:
+            if expected != SEPARATOR_OR_END:
+                raise unexpected(token, start)
+            expected = KEY if containers[-1] else VALUE
+        elif character == constants.NAME_SEPARATOR:
+            if expected != NAME_SEPARATOR:
+                raise unexpected(token, start)
+            expected = VALUE
+        elif character in structural.END:
+            is_object = character == constants.END_OBJECT
+            if (
+                not containers
+                or containers[-1] != is_object
+                or expected
+                not in {SEPARATOR_OR_END, KEY_OR_END if is_object else VALUE_OR_END}
+            ):
+                raise unexpected(token, start)
+            containers.pop()
+            expected = SEPARATOR_OR_END if containers else DONE
+        elif expected in {KEY, KEY_OR_END}:
+            if STRING.fullmatch(token) is None:
+                raise unexpected(token, start)
+            expected = NAME_SEPARATOR
+        elif expected not in {VALUE, VALUE_OR_END}:
+            raise unexpected(token, start)
+        elif character in {constants.BEGIN_ARRAY, constants.BEGIN_OBJECT}:
+            is_object = character == constants.BEGIN_OBJECT
+            containers.append(is_object)
+            expected = KEY_OR_END if is_object else VALUE_OR_END
+        else:
+            pattern = STRING if character == constants.QUOTATION_MARK else LITERAL
+            if pattern.fullmatch(token) is None:
+                raise unexpected(token, start)
+            expected = SEPARATOR_OR_END if containers else DONE
+        yield start + len(token), len(containers)
+
+    if expected != DONE:
+        raise errors.InvalidInputError(
+            "JSON is not valid, the document ended unexpectedly"
+        )
+
+
+def scan_entries(
+    tokens: typing.Iterable[typing.Tuple[int, str]], state: State
+) -> typing.Iterator[typing.Tuple[str, types.Entry]]:
+    """
+    Check the tokens of a JSON document and report the source map entries.
+
+    The entry of an array or object is returned when it starts and its end is
+    updated when it ends, which means that the entries can be consumed while the
+    document is scanned.
+
+    Args:
+        tokens: The position and text of each token from the position of the state,
+            see structural.tokens.
+        state: The state of the scan, which is updated.
+
+    Returns:
+        The JSON pointers and source map entries in document order.
+
+    """
+    # The entries of the arrays and objects that have started but not yet ended
+    containers: typing.List[types.Entry] = []
+    for event in scan_events(tokens, state):
+        if event.kind in {END_ARRAY, END_OBJECT}:
+            containers.pop().value_end = event.end
+        elif event.kind != NAME:
+            entry = types.Entry(
+                value_start=event.start,
+                value_end=event.end,
+                key_start=event.key_start,
+                key_end=event.key_end,
+            )
+            if event.kind != SCALAR:
+                containers.append(entry)
+            yield event.pointer, entry
+
+
+class Scanner:
+    """
+    Calculate the source map in steps with a checkpoint between each step.
+
+    The entries of primitive values are returned when the value is scanned and the
+    entries of arrays and objects when they end. Use to_source_map to combine the
+    entries of all the steps into a source map in document order.
+
+    """
+
+    def __init__(
+        self,
+        source: str,
+        *,
+        units: encoding.TUnits = encoding.CODEPOINT,
+        checkpoint: typing.Optional[Checkpoint] = None,
+    ) -> None:
+        """
+        Construct.
+
+        Args:
+            source: The JSON document, which is checked to be valid JSON if the
+                scan is not resumed from a checkpoint and otherwise checked token by
+                token as it is scanned.
+            units: The units to count the column and position in, see calculate.
+            checkpoint: The checkpoint to resume the scan from, by default the scan
+                starts at the beginning of the source.
+
+        """
+        if checkpoint is None:
+            check.valid_input(source=source)
+            check.valid_units(units=units)
+            checkpoint = Checkpoint(length=len(source), state=State(units=units))
+        elif checkpoint.length != len(source):
+            raise errors.InvalidInputError(
+                f"the checkpoint is for a source of length {checkpoint.length}, "
+                f"got {len(source)}"
+            )
+        self._source = encoding.view(source, units=checkpoint.state.units)
+        self._checkpoint = _copy(checkpoint)
+
+    @property
+    def done(self) -> bool:
+        """Whether the whole source has been scanned."""
+        return self._checkpoint.done
+
+    def checkpoint(self) -> Checkpoint:
+        """
+        Save the state of the scan.
+
+        Returns:
+            The checkpoint that the scan can be resumed from.
+
+        """
+        return _copy(self._checkpoint)
+
+    def scan(
+        self, *, max_entries: typing.Optional[int] = None
+    ) -> types.TSourceMapEntries:
+        """
+        Continue the scan until the source ends or enough entries are calculated.
+
+        Args:
+            max_entries: The number of entries after which the scan is paused, by
+                default the whole source is scanned.
+
+        Returns:
+            The JSON pointers and source map entries calculated by this step.
+
+        """
+        state = self._checkpoint.state
+        entries: types.TSourceMapEntries = []
+        if state.expected == DONE:
+            return entries
+
+        tokens = structural.tokens(self._source, state.position)
+        for event in scan_events(tokens, state):
+            if event.kind in {START_ARRAY, START_OBJECT, NAME}:
+                continue
+            entries.append(
+                (
+                    event.pointer,
+                    types.Entry(
+                        value_start=event.start,
+                        value_end=event.end,
+                        key_start=event.key_start,
+                        key_end=event.key_end,
+                    ),
+                )
+            )
+            if max_entries is not None and len(entries) >= max_entries:
+                break
+
+        return entries
+
+
+def to_source_map(entries: types.TSourceMapEntries) -> types.TSourceMap:
+    """
+    Combine the entries returned by the steps of a scan into a source map.
+
+    Args:
+        entries: The entries of all the steps of the scan.
+
+    Returns:
+        The source map in document order, the same as calculate.
+
+    """
+    return dict(sorted(entries, key=lambda item: item[1].value_start.position))
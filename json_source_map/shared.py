@@ -0,0 +1,214 @@
+"""Share a JSON source map between processes without copying it."""
+
+import array
+import struct
+import sys
+import typing
+from multiprocessing import shared_memory
+
+from . import errors, export, types
+
+# The number of entries and the number of bytes of the JSON pointers
+_HEADER_SIZE = 2
+_ITEM_SIZE = struct.calcsize("q")
+
+
+class SharedSourceMap(typing.Mapping[str, types.Entry]):
+    """
+    JSON source map stored in shared memory that is read without copying.
+
+    The memory holds a header with the number of entries and the number of bytes
+    of the JSON pointers followed by the fields of each entry in the order of
+    export.FIELDS, the end of the UTF-8 JSON pointer of each entry, the entries
+    ordered by JSON pointer and the JSON pointers. Entries are looked up with a
+    binary search over the JSON pointers and created when they are accessed.
+
+    """
+
+    __slots__ = ("_memory", "_count", "_fields", "_ends", "_order", "_pointers")
+
+    def __init__(self, memory: shared_memory.SharedMemory) -> None:
+        """
+        Construct.
+
+        Args:
+            memory: The shared memory written by publish.
+
+        """
+        self._memory = memory
+        numbers = memory.buf[: _HEADER_SIZE * _ITEM_SIZE].cast("q")
+        self._count = count = numbers[0]
+        pointers_size = numbers[1]
+        numbers.release()
+
+        fields_end = _HEADER_SIZE + count * len(export.FIELDS)
+        ends_end = fields_end + count
+        order_end = ends_end + count
+        self._fields = memory.buf[: order_end * _ITEM_SIZE].cast("q")
+        self._ends = self._fields[fields_end:ends_end]
+        self._order = self._fields[ends_end:order_end]
+        self._pointers = memory.buf[
+            order_end * _ITEM_SIZE : order_end * _ITEM_SIZE + pointers_size
+        ]
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory that other processes attach to."""
+        return self._memory.name
+
+    def _pointer(self, row: int) -> bytes:
+        """Read the UTF-8 JSON pointer of a row."""
+        start = self._ends[row - 1] if row > 0 else 0
+        return bytes(self._pointers[start : self._ends[row]])
+
+    def _find(self, pointer: object) -> typing.Optional[int]:
+        """
+        Find the row of a JSON pointer.
+
+        Args:
+            pointer: The JSON pointer.
+
+        Returns:
+            The row or None if the JSON pointer is not in the source map.
+
+        """
+        if not isinstance(pointer, str):
+            return None
+        encoded = pointer.encode("utf-8", "surrogatepass")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._pointer(self._order[middle]) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._pointer(self._order[low]) == encoded:
+            return self._order[low]
+        return None
+
+    def _location(self, index: int) -> typing.Optional[types.Location]:
+        """Read the location starting at an index of the fields."""
+        position = self._fields[index + 2]
+        if position == export.NO_LOCATION[2]:
+            return None
+        return types.Location(self._fields[index], self._fields[index + 1], position)
+
+    def __getitem__(self, pointer: str) -> types.Entry:
+        """Retrieve a copy of the entry of a JSON pointer."""
+        row = self._find(pointer)
+        if row is None:
+            raise KeyError(pointer)
+        index = _HEADER_SIZE + row * len(export.FIELDS)
+        return types.Entry(
+            value_start=typing.cast(types.Location, self._location(index)),
+            value_end=typing.cast(types.Location, self._location(index + 3)),
+            key_start=self._location(index + 6),
+            key_end=self._location(index + 9),
+        )
+
+    def __iter__(self) -> typing.Iterator[str]:
+        """Iterate over the JSON pointers in the order of the source map."""
+        for row in range(self._count):
+            yield self._pointer(row).decode("utf-8", "surrogatepass")
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return self._count
+
+    def __contains__(self, pointer: object) -> bool:
+        """Check whether the JSON pointer is in the source map."""
+        return self._find(pointer) is not None
+
+    def close(self) -> None:
+        """
+        Stop using the shared memory in this process.
+
+        The source map is also closed when it is garbage collected, closing it
+        explicitly releases the shared memory as soon as it is no longer used.
+
+        """
+        for view in (self._order, self._ends, self._fields, self._pointers):
+            view.release()
+        self._memory.close()
+
+    def __del__(self) -> None:
+        """Close the source map if it was not closed, which releases the views."""
+        self.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory once every process has closed it."""
+        self._memory.unlink()
+
+    def __enter__(self) -> "SharedSourceMap":
+        """Use the source map until the end of the block."""
+        return self
+
+    def __exit__(self, *_: typing.Any) -> None:
+        """Close the source map."""
+        self.close()
+
+
+def publish(
+    source_map: typing.Mapping[str, types.Entry], *, name: typing.Optional[str] = None
+) -> SharedSourceMap:
+    """
+    Copy a source map into new shared memory that other processes can attach to.
+
+    The process that publishes the source map is responsible for calling unlink
+    once the source map is no longer needed.
+
+    Args:
+        source_map: The source map to share.
+        name: The name of the shared memory, by default a unique name is chosen.
+
+    Returns:
+        The shared source map.
+
+    """
+    pointers = [pointer.encode("utf-8", "surrogatepass") for pointer in source_map]
+    ends = array.array("q")
+    end = 0
+    for pointer in pointers:
+        end += len(pointer)
+        ends.append(end)
+    numbers = array.array("q", (len(pointers), end))
+    numbers.extend(export.iter_fields(source_map.values()))
+    numbers.extend(ends)
+    numbers.extend(sorted(range(len(pointers)), key=pointers.__getitem__))
+    data = numbers.tobytes()
+
+    memory = shared_memory.SharedMemory(name=name, create=True, size=len(data) + end)
+    memory.buf[: len(data)] = data
+    memory.buf[len(data) : len(data) + end] = b"".join(pointers)
+    return SharedSourceMap(memory)
+
+
+def attach(name: str) -> SharedSourceMap:
+    """
+    Attach to a source map published by another process.
+
+    Before Python 3.13, the resource tracker of a process that attaches removes the
+    shared memory when the process ends unless the process shares the resource
+    tracker of the process that published it, such as a process forked from it.
+
+    Args:
+        name: The name of the shared source map.
+
+    Returns:
+        The shared source map.
+
+    """
+    try:
+        if sys.version_info >= (3, 13):
+            # The resource tracker can be skipped from Python 3.13
+            # pylint: disable-next=unexpected-keyword-arg
+            memory = shared_memory.SharedMemory(  # pragma: no cover
+                name=name, track=False
+            )
+        else:
+            memory = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError as error:
+        raise errors.InvalidInputError(
+            f"no shared source map with the name {name}"
+        ) from error
+    return SharedSourceMap(memory)
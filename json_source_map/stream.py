@@ -0,0 +1,243 @@
+"""Calculate the JSON source map of a file or stream without reading it at once."""
+
+import gzip
+import importlib
+import io
+import re
+import typing
+
+from . import check, constants, encoding, errors, scanner, types
+
+GZIP = "gzip"
+ZSTD = "zstd"
+TCompression = typing.Literal["gzip", "zstd"]
+# The first bytes of each kind of compressed file
+_MAGIC = {b"\x1f\x8b": GZIP, b"\x28\xb5\x2f\xfd": ZSTD}
+_MAGIC_SIZE = max(len(magic) for magic in _MAGIC)
+# The maximum number of characters decoded at once
+_CHUNK_SIZE = 1 << 20
+
+# Matches strings, which might be cut off at the end of a chunk, structural
+# characters, new lines and the other primitive values
+_TOKEN = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*(?P<end>\\|")?|[\[\]{},:\n]|[^ \t\n\r"\[\]{},:]+'
+)
+# Matches the rest of a string or other primitive value that continues from the
+# previous chunk, the string ends at the quotation mark or is cut off again
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*(?P<end>\\|")?')
+_PRIMITIVE_REST = re.compile(r'[^ \t\n\r"\[\]{},:]*')
+_STRUCTURAL = frozenset("[]{},:\n")
+# The kinds of events of the end of an array or object
+_END = frozenset({scanner.END_ARRAY, scanner.END_OBJECT})
+
+
+def _cut_off(match: typing.Match[str]) -> bool:
+    """Check whether a token at the end of a chunk might continue in the next."""
+    token = match.group()
+    if token[0] == constants.QUOTATION_MARK:
+        return match.group("end") != constants.QUOTATION_MARK
+    return token[0] not in _STRUCTURAL
+
+
+def _rest(
+    chunk: str, *, is_string: bool, escaped: bool
+) -> typing.Tuple[int, bool, bool]:
+    """
+    Find the end of a token that continues from the previous chunk.
+
+    Args:
+        chunk: The next chunk of the JSON document, which is not empty.
+        is_string: Whether the token is a string.
+        escaped: Whether the first character of the chunk is escaped.
+
+    Returns:
+        The position just after the part of the token in the chunk, whether the
+        token continues in the next chunk and whether the first character of the
+        next chunk is escaped.
+
+    """
+    if escaped and chunk[0] == constants.RETURN:
+        # A new line character can not be escaped, so the string ends before it
+        return 0, False, False
+    pattern = _STRING_REST if is_string else _PRIMITIVE_REST
+    match = typing.cast(typing.Match[str], pattern.match(chunk, int(escaped)))
+    end = match.group("end") if is_string else None
+    cut_off = match.end() == len(chunk) and end != constants.QUOTATION_MARK
+    return match.end(), cut_off, cut_off and end == constants.ESCAPE
+
+
+def _tokens(chunks: typing.Iterable[str]) -> typing.Iterator[typing.Tuple[int, str]]:
+    """
+    Split the chunks of a JSON document into tokens.
+
+    A token at the end of a chunk might continue in the next chunk, which means
+    that its parts are kept and only the rest of the token is scanned in the next
+    chunk, so that tokens longer than a chunk are scanned once.
+
+    Args:
+        chunks: The consecutive parts of the JSON document, which are not empty.
+
+    Returns:
+        The position and text of each token.
+
+    """
+    # The parts of the token that continues in the next chunk and its position
+    parts: typing.List[str] = []
+    start = 0
+    # Whether the first character of the next chunk is escaped within a string
+    escaped = False
+    # The position of the start of the chunk in the document
+    offset = 0
+    for chunk in chunks:
+        position = 0
+        if parts:
+            position, cut_off, escaped = _rest(
+                chunk,
+                is_string=parts[0][0] == constants.QUOTATION_MARK,
+                escaped=escaped,
+            )
+            parts.append(chunk[:position])
+            if not cut_off:
+                yield start, "".join(parts)
+                parts = []
+
+        if not parts:
+            for match in _TOKEN.finditer(chunk, position):
+                if match.end() == len(chunk) and _cut_off(match):
+                    parts = [match.group()]
+                    start = offset + match.start()
+                    escaped = match.group("end") == constants.ESCAPE
+                    break
+                yield offset + match.start(), match.group()
+        offset += len(chunk)
+
+    if parts:
+        yield start, "".join(parts)
+
+
+def _source_map(
+    chunks: typing.Iterable[str], *, units: encoding.TUnits
+) -> types.TSourceMap:
+    """
+    Calculate the source map from the chunks of a JSON document.
+
+    Args:
+        chunks: The consecutive parts of the JSON document, converted to units.
+        units: The units the chunks have been converted to, used to restore keys.
+
+    Returns:
+        The source map.
+
+    """
+    result: types.TSourceMap = {}
+    for event in scanner.scan_events(_tokens(chunks), scanner.State(units=units)):
+        if event.kind in _END:
+            result[event.pointer].value_end = event.end
+        elif event.kind != scanner.NAME:
+            result[event.pointer] = types.Entry(
+                value_start=event.start,
+                value_end=event.end,
+                key_start=event.key_start,
+                key_end=event.key_end,
+            )
+    return result
+
+
+def calculate_stream(
+    file: typing.BinaryIO,
+    *,
+    units: encoding.TUnits = encoding.CODEPOINT,
+    chunk_size: int = _CHUNK_SIZE,
+) -> types.TSourceMap:
+    """
+    Calculate the source map for a UTF-8 JSON document read from a binary stream.
+
+    The stream is decoded and scanned in chunks and only the source map is kept,
+    which means that the whole document is never held in memory. The stream can
+    be a decompressing stream such as gzip.GzipFile, the locations are then in
+    the decompressed document.
+
+    Args:
+        file: The stream to read the JSON document from.
+        units: The units to count the column and position in, see calculate.
+        chunk_size: The maximum number of characters decoded at once.
+
+    Returns:
+        The source map, the same as the result of calculate for the document.
+
+    """
+    check.valid_units(units=units)
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    try:
+        chunks = iter(lambda: text.read(chunk_size), "")
+        return _source_map(
+            (encoding.view(chunk, units=units) for chunk in chunks), units=units
+        )
+    except UnicodeDecodeError as error:
+        raise errors.InvalidInputError("the file is not valid UTF-8") from error
+    finally:
+        text.detach()
+
+
+def _open(path: str, *, compression: typing.Optional[str]) -> typing.BinaryIO:
+    """
+    Open a file, decompressing it if it is compressed.
+
+    Args:
+        path: The path to the file.
+        compression: How the file is compressed, by default detected from the
+            first bytes of the file.
+
+    Returns:
+        The stream of the decompressed file.
+
+    """
+    if compression is None:
+        with open(path, "rb") as file:
+            start = file.read(_MAGIC_SIZE)
+        compression = next(
+            (kind for magic, kind in _MAGIC.items() if start.startswith(magic)), None
+        )
+
+    if compression is None:
+        return open(path, "rb")
+    if compression == GZIP:
+        return typing.cast(typing.BinaryIO, gzip.open(path, "rb"))
+    if compression == ZSTD:
+        try:
+            zstd = importlib.import_module("compression.zstd")
+        except ImportError as error:
+            raise errors.InvalidInputError(
+                "zstd compressed files require Python 3.14 or later"
+            ) from error
+        return typing.cast(typing.BinaryIO, zstd.open(path, "rb"))
+    raise errors.InvalidInputError(
+        f"compression must be one of {GZIP} or {ZSTD}, got {compression}"
+    )
+
+
+def calculate_file(
+    path: str,
+    *,
+    units: encoding.TUnits = encoding.CODEPOINT,
+    compression: typing.Optional[TCompression] = None,
+) -> types.TSourceMap:
+    """
+    Calculate the source map for a UTF-8 JSON file that might be compressed.
+
+    The file is decompressed and scanned in chunks, see calculate_stream, and the
+    locations are in the decompressed document.
+
+    Args:
+        path: The path to the file.
+        units: The units to count the column and position in, see calculate.
+        compression: How the file is compressed, either "gzip" or "zstd", where
+            zstd requires Python 3.14 or later. By default gzip and zstd files are
+            detected from their first bytes and other files are not decompressed.
+
+    Returns:
+        The source map.
+
+    """
+    with _open(path, compression=compression) as file:
+        return calculate_stream(file, units=units)
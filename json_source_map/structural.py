@@ -0,0 +1,435 @@
+"""Calculate the JSON source map from an index of the structure of the document."""
+
+import array
+import re
+import sys
+import typing
+
+from . import check, constants, encoding, line_index, tree, types
+
+# Matches strings, structural characters, new lines and the other primitive values
+TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{},:\n]|[^ \t\n\r"\[\]{},:]+')
+# The number of characters classified at once when NumPy is installed
+_BLOCK = 1 << 14
+# Matches the characters that can not be within a primitive value
+_DELIMITER = re.compile(r'[ \t\n\r"\[\]{},:]')
+# The kind of each character, characters outside of ASCII share the last kind
+_WHITESPACE, _STRUCTURAL, _PRIMITIVE = range(3)
+_KINDS = bytes(
+    _WHITESPACE
+    if chr(code) in constants.WHITESPACE and chr(code) != "\n"
+    else _STRUCTURAL
+    if chr(code) in "[]{},:\n"
+    else _PRIMITIVE
+    for code in range(129)
+)
+SEPARATOR = frozenset({constants.VALUE_SEPARATOR, constants.NAME_SEPARATOR})
+END = frozenset({constants.END_ARRAY, constants.END_OBJECT})
+
+
+class StructuralIndex:  # pylint: disable=too-few-public-methods
+    """
+    The positions of the tokens of a JSON document.
+
+    Attrs:
+        starts: The start position of each string, structural character, new line
+            and other primitive value in the document.
+        ends: The position just after the end of each token.
+
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, *, starts: array.array, ends: array.array) -> None:
+        """Construct."""
+        self.starts = starts
+        self.ends = ends
+
+
+def tokens(
+    source: str, position: int = 0, end: typing.Optional[int] = None
+) -> typing.Iterator[typing.Tuple[int, str]]:
+    """
+    Split a JSON document into tokens.
+
+    Args:
+        source: The JSON document.
+        position: The position to start from.
+        end: The position to stop at, by default the end of the source.
+
+    Returns:
+        The position and text of each token.
+
+    """
+    for match in TOKEN.finditer(source, position, len(source) if end is None else end):
+        yield match.start(), match.group()
+
+
+def segment(text: str, *, units: encoding.TUnits) -> str:
+    """
+    Convert the text of a key to the segment of a JSON pointer.
+
+    Args:
+        text: The text of the key between the quotation marks.
+        units: The units the source has been converted to.
+
+    Returns:
+        The decoded and escaped key.
+
+    """
+    key = encoding.decode_key(encoding.restore(text, units=units))
+    return sys.intern(tree.escape(key))
+
+
+def _quotes(codes: typing.Any, *, numpy: typing.Any) -> typing.Any:
+    """
+    Find the quotation marks of a block that are not escaped.
+
+    A quotation mark is escaped when it follows an odd number of backslashes.
+
+    Args:
+        codes: The code of each character of the block.
+        numpy: The NumPy module.
+
+    Returns:
+        The positions of the quotation marks.
+
+    """
+    quotes = numpy.flatnonzero(codes == ord(constants.QUOTATION_MARK))
+    backslashes = numpy.flatnonzero(codes == ord("\\"))
+    if len(backslashes) == 0:
+        return quotes
+
+    # The index of the first backslash of the run each backslash belongs to
+    run_starts = numpy.arange(len(backslashes))
+    run_starts[1:][numpy.diff(backslashes) == 1] = 0
+    run_starts = numpy.maximum.accumulate(run_starts)
+    before = numpy.minimum(
+        numpy.searchsorted(backslashes, quotes - 1), len(backslashes) - 1
+    )
+    escaped = (backslashes[before] == quotes - 1) & (
+        (before - run_starts[before]) % 2 == 0
+    )
+    return quotes[~escaped]
+
+
+def _block(
+    codes: typing.Any, quotes: typing.Any, *, inside: bool, numpy: typing.Any
+) -> typing.Tuple[typing.Any, typing.Any, typing.Optional[int]]:
+    """
+    Find the tokens of a block of a valid JSON document.
+
+    Args:
+        codes: The code of each character of the block.
+        quotes: The positions of the quotation marks that are not escaped.
+        inside: Whether the block starts within a string.
+        numpy: The NumPy module.
+
+    Returns:
+        The sorted start and end of each token in the block, where a string that
+        started before the block starts at 0, and the start of the string that is
+        still open at the end of the block, if any.
+
+    """
+    string_starts = quotes[int(inside) :: 2]
+    string_ends = quotes[1 - int(inside) :: 2] + 1
+    if inside:
+        string_starts = numpy.concatenate(([0], string_starts))
+    open_start = (
+        int(string_starts[-1]) if len(string_starts) > len(string_ends) else None
+    )
+
+    changes = numpy.zeros(len(codes) + 1, dtype=numpy.int8)
+    changes[string_starts] = 1
+    changes[string_ends] -= 1
+    outside = numpy.cumsum(changes[:-1], dtype=numpy.int8) == 0
+
+    classes = numpy.frombuffer(_KINDS, dtype=numpy.uint8)[codes] * outside
+    single = numpy.flatnonzero(classes == _STRUCTURAL)
+    edges = numpy.flatnonzero(
+        numpy.diff((classes == _PRIMITIVE).astype(numpy.int8), prepend=0, append=0)
+    )
+
+    starts = numpy.concatenate((string_starts[: len(string_ends)], single, edges[0::2]))
+    ends = numpy.concatenate((string_ends, single + 1, edges[1::2]))
+    order = numpy.argsort(starts, kind="stable")
+    return starts[order], ends[order], open_start
+
+
+def _index_numpy(source: str, *, numpy: typing.Any) -> StructuralIndex:
+    """
+    Build the structural index of a valid JSON document using NumPy.
+
+    The document is classified in blocks to bound the memory, carrying any string
+    that is open at the end of a block over to the next block.
+
+    Args:
+        source: The JSON document.
+        numpy: The NumPy module.
+
+    Returns:
+        The index of the tokens.
+
+    """
+    starts, ends = array.array("q"), array.array("q")
+    string_start: typing.Optional[int] = None
+    offset = 0
+    while offset < len(source):
+        # Blocks end after a character that can not be within a primitive value,
+        # so never after a backslash that escapes the next character
+        match = _DELIMITER.search(source, offset + _BLOCK - 1)
+        block_end = len(source) if match is None else match.end()
+
+        # Characters outside of ASCII can only be within strings of a valid document
+        codes = numpy.minimum(
+            numpy.frombuffer(
+                source[offset:block_end].encode("utf-32-le", "surrogatepass"),
+                numpy.uint32,
+            ),
+            len(_KINDS) - 1,
+        ).astype(numpy.uint8)
+        block_starts, block_ends, open_start = _block(
+            codes,
+            _quotes(codes, numpy=numpy),
+            inside=string_start is not None,
+            numpy=numpy,
+        )
+
+        block_starts += offset
+        if string_start is not None and open_start != 0:
+            block_starts[0] = string_start
+        if open_start is None:
+            string_start = None
+        elif open_start != 0 or string_start is None:
+            string_start = offset + open_start
+
+        starts.frombytes(block_starts.astype(numpy.int64).tobytes())
+        ends.frombytes((block_ends + offset).astype(numpy.int64).tobytes())
+        offset = block_end
+    return StructuralIndex(starts=starts, ends=ends)
+
+
+def index(source: str) -> StructuralIndex:
+    """
+    Build the structural index of a JSON document.
+
+    When NumPy is installed the characters of a valid document are classified at
+    once, otherwise by the regular expression engine so that each token, rather
+    than each character, is visited in Python.
+
+    Args:
+        source: The JSON document, which has to be valid to use NumPy.
+
+    Returns:
+        The index of the tokens.
+
+    """
+    numpy = line_index.import_numpy()
+    if numpy is not None:
+        return _index_numpy(source, numpy=numpy)
+
+    spans = [match.span() for match in TOKEN.finditer(source)]
+    return StructuralIndex(
+        starts=array.array("q", (start for start, _ in spans)),
+        ends=array.array("q", (end for _, end in spans)),
+    )
+
+
+def source_map(  # pylint: disable=too-many-locals
+    *,
+    source: str,
+    structural_index: StructuralIndex,
+    units: encoding.TUnits = encoding.CODEPOINT,
+) -> types.TSourceMap:
+    """
+    Calculate the source map from the structural index.
+
+    Assume that the source is valid JSON.
+
+    Args:
+        source: The JSON document.
+        structural_index: The index of the source.
+        units: The units the source has been converted to, used to restore keys.
+
+    Returns:
+        The source map.
+
+    """
+    result: types.TSourceMap = {}
+    line = 0
+    line_start = 0
+
+    # The pointer, entry and whether it is an object for each open container and
+    # the next array index or the key of the next object member
+    containers: typing.List[typing.Tuple[str, types.Entry, bool]] = []
+    array_indexes: typing.List[int] = []
+    key: typing.Optional[typing.Tuple[str, types.Location, types.Location]] = None
+    expect_key = False
+
+    for start, end in zip(structural_index.starts, structural_index.ends):
+        character = source[start]
+        if character == constants.RETURN:
+            line += 1
+            line_start = end
+            continue
+        if character in SEPARATOR:
+            expect_key = character == constants.VALUE_SEPARATOR and bool(
+                containers and containers[-1][2]
+            )
+            continue
+        if character in END:
+            _, entry, is_object = containers.pop()
+            if not is_object:
+                array_indexes.pop()
+            entry.value_end = types.Location(line, end - line_start, end)
+            expect_key = False
+            continue
+        if expect_key:
+            key = (
+                segment(source[start + 1 : end - 1], units=units),
+                types.Location(line, start - line_start, start),
+                types.Location(line, end - line_start, end),
+            )
+            expect_key = False
+            continue
+
+        # Must be a value
+        entry = types.Entry(
+            value_start=types.Location(line, start - line_start, start),
+            value_end=types.Location(line, end - line_start, end),
+        )
+        if not containers:
+            pointer = ""
+        elif key is not None:
+            pointer = f"{containers[-1][0]}/{key[0]}"
+            entry.key_start = key[1]
+            entry.key_end = key[2]
+            key = None
+        else:
+            pointer = f"{containers[-1][0]}/{array_indexes[-1]}"
+            array_indexes[-1] += 1
+        result[pointer] = entry
+
+        if character == constants.BEGIN_OBJECT:
+            containers.append((pointer, entry, True))
+            expect_key = True
+        elif character == constants.BEGIN_ARRAY:
+            containers.append((pointer, entry, False))
+            array_indexes.append(0)
+
+    return result
+
+
+# The number of positions stored for each entry by offsets
+ROW_SIZE = 4
+# The position stored for the key of entries that are not directly within an object
+NO_KEY = -1
+
+
+def offsets(
+    *,
+    source: str,
+    structural_index: StructuralIndex,
+    units: encoding.TUnits = encoding.CODEPOINT,
+) -> typing.Tuple[typing.Dict[str, int], array.array]:
+    """
+    Calculate the positions of each value from the structural index.
+
+    No line or column is calculated and no Location or Entry is created, each
+    entry is stored as a row of the value start, value end, key start and key end
+    positions where the key positions are NO_KEY if the value is not directly
+    within an object.
+
+    Assume that the source is valid JSON.
+
+    Args:
+        source: The JSON document.
+        structural_index: The index of the source.
+        units: The units the source has been converted to, used to restore keys.
+
+    Returns:
+        The row of each JSON pointer and the rows of positions.
+
+    """
+    rows: typing.Dict[str, int] = {}
+    positions = array.array("q")
+
+    # The pointer and row of each open container and whether it is an object
+    containers: typing.List[typing.Tuple[str, int, bool]] = []
+    array_indexes: typing.List[int] = []
+    key: typing.Optional[typing.Tuple[str, int, int]] = None
+    expect_key = False
+
+    for start, end in zip(structural_index.starts, structural_index.ends):
+        character = source[start]
+        if character == constants.RETURN:
+            continue
+        if character in SEPARATOR:
+            expect_key = character == constants.VALUE_SEPARATOR and bool(
+                containers and containers[-1][2]
+            )
+            continue
+        if character in END:
+            _, row, is_object = containers.pop()
+            if not is_object:
+                array_indexes.pop()
+            positions[row * ROW_SIZE + 1] = end
+            expect_key = False
+            continue
+        if expect_key:
+            key = (
+                segment(source[start + 1 : end - 1], units=units),
+                start,
+                end,
+            )
+            expect_key = False
+            continue
+
+        # Must be a value
+        row = len(positions) // ROW_SIZE
+        if not containers:
+            pointer = ""
+            positions.extend((start, end, NO_KEY, NO_KEY))
+        elif key is not None:
+            pointer = f"{containers[-1][0]}/{key[0]}"
+            positions.extend((start, end, key[1], key[2]))
+            key = None
+        else:
+            pointer = f"{containers[-1][0]}/{array_indexes[-1]}"
+            positions.extend((start, end, NO_KEY, NO_KEY))
+            array_indexes[-1] += 1
+        rows[pointer] = row
+
+        if character == constants.BEGIN_OBJECT:
+            containers.append((pointer, row, True))
+            expect_key = True
+        elif character == constants.BEGIN_ARRAY:
+            containers.append((pointer, row, False))
+            array_indexes.append(0)
+
+    return rows, positions
+
+
+def calculate(
+    source: str, *, units: encoding.TUnits = encoding.CODEPOINT
+) -> types.TSourceMap:
+    """
+    Calculate the source map for a JSON document using the structural index.
+
+    The result is the same as the result of calculate. The document is first
+    split into tokens in bulk, after which only the tokens are visited instead of
+    every character.
+
+    Args:
+        source: The JSON document.
+        units: The units to count the column and position in, see calculate.
+
+    Returns:
+        The source map.
+
+    """
+    check.valid_input(source=source)
+    check.valid_units(units=units)
+
+    view = encoding.view(source, units=units)
+    return source_map(source=view, structural_index=index(view), units=units)
@@ -0,0 +1,276 @@
+"""Tree representation of the JSON source map sharing pointer prefixes."""
+
+import sys
+import typing
+
+from . import types
+
+POINTER_SEPARATOR = "/"
+
+
+def escape(segment: str) -> str:
+    """
+    Escape a segment for use in a JSON pointer as defined by RFC 6901.
+
+    Args:
+        segment: The unescaped segment.
+
+    Returns:
+        The segment with ~ replaced by ~0 and / replaced by ~1.
+
+    """
+    if "~" not in segment and "/" not in segment:
+        return segment
+    return segment.replace("~", "~0").replace("/", "~1")
+
+
+def unescape(segment: str) -> str:
+    """
+    Unescape a segment of a JSON pointer.
+
+    Args:
+        segment: The escaped segment.
+
+    Returns:
+        The segment with ~1 replaced by / and ~0 replaced by ~.
+
+    """
+    if "~" not in segment:
+        return segment
+    return segment.replace("~1", "/").replace("~0", "~")
+
+
+class Node(typing.Mapping[str, types.Entry]):
+    """
+    A value in the JSON document linked to its parent and children.
+
+    The node is a mapping from JSON pointers, relative to the node, to the source
+    map entries of the node and all its descendants. The full pointer of a node is
+    only calculated when it is requested. Values without values within them are
+    stored as their entries and their nodes are created when they are accessed.
+
+    Attrs:
+        segment: The unescaped key or array index of the value within its parent.
+        parent: The node of the parent value.
+        entry: The source map entry of the value.
+
+    """
+
+    __slots__ = ("segment", "parent", "entry", "_children")
+
+    def __init__(
+        self,
+        *,
+        segment: str,
+        parent: typing.Optional["Node"],
+        entry: types.Entry,
+    ) -> None:
+        """Construct."""
+        self.segment = segment
+        self.parent = parent
+        self.entry = entry
+        # The nodes or, for values without values within them, the entries of the
+        # children by their segment, None until the first child is added
+        self._children: typing.Optional[
+            typing.Dict[str, typing.Union["Node", types.Entry]]
+        ] = None
+
+    @property
+    def children(self) -> typing.Mapping[str, "Node"]:
+        """The nodes of the values within the value by their segment."""
+        return _Children(self)
+
+    def child(self, segment: str) -> "Node":
+        """
+        Retrieve the node of a value within the value.
+
+        Args:
+            segment: The unescaped key or array index of the value.
+
+        Returns:
+            The node of the value.
+
+        """
+        if self._children is None:
+            raise KeyError(segment)
+        child = self._children[segment]
+        if isinstance(child, Node):
+            return child
+        return Node(segment=segment, parent=self, entry=child)
+
+    def _add(self, segment: str, entry: types.Entry) -> None:
+        """Add a value within the value, replacing the entry of a duplicate key."""
+        if self._children is None:
+            self._children = {}
+        child = self._children.get(segment)
+        if isinstance(child, Node):
+            child.entry = entry
+        else:
+            self._children[segment] = entry
+
+    def _branch(self, segment: str) -> "Node":
+        """Retrieve the node of a value within the value to add values within it."""
+        if self._children is None:
+            raise KeyError(segment)
+        child = self._children[segment]
+        if not isinstance(child, Node):
+            child = Node(segment=segment, parent=self, entry=child)
+            self._children[segment] = child
+        return child
+
+    @property
+    def pointer(self) -> str:
+        """The JSON pointer of the node from the root of the tree."""
+        segments: typing.List[str] = []
+        node: typing.Optional[Node] = self
+        while node is not None and node.parent is not None:
+            segments.append(escape(node.segment))
+            node = node.parent
+        return "".join(
+            f"{POINTER_SEPARATOR}{segment}" for segment in reversed(segments)
+        )
+
+    def node(self, pointer: str) -> "Node":
+        """
+        Retrieve the node at a JSON pointer relative to this node.
+
+        Args:
+            pointer: The JSON pointer.
+
+        Returns:
+            The node at the pointer.
+
+        """
+        if not pointer:
+            return self
+        if not pointer.startswith(POINTER_SEPARATOR):
+            raise KeyError(pointer)
+
+        node = self
+        for segment in pointer[1:].split(POINTER_SEPARATOR):
+            try:
+                node = node.child(unescape(segment))
+            except KeyError as error:
+                raise KeyError(pointer) from error
+        return node
+
+    def walk(self) -> typing.Iterator[typing.Tuple[str, "Node"]]:
+        """
+        Iterate over the node and all its descendants in document order.
+
+        Returns:
+            The JSON pointers relative to this node and the nodes.
+
+        """
+        stack: typing.List[typing.Tuple[str, Node]] = [("", self)]
+        while stack:
+            pointer, node = stack.pop()
+            yield pointer, node
+            children = node._children
+            if children is not None:
+                stack.extend(
+                    (
+                        f"{pointer}{POINTER_SEPARATOR}{escape(segment)}",
+                        node.child(segment),
+                    )
+                    for segment in reversed(children)
+                )
+
+    def __getitem__(self, pointer: str) -> types.Entry:
+        """Retrieve the entry at a JSON pointer relative to this node."""
+        return self.node(pointer).entry
+
+    def __iter__(self) -> typing.Iterator[str]:
+        """Iterate over the JSON pointers relative to this node."""
+        return (pointer for pointer, _ in self.walk())
+
+    def __len__(self) -> int:
+        """Count the values in the subtree of this node."""
+        count = 0
+        stack: typing.List[Node] = [self]
+        while stack:
+            node = stack.pop()
+            count += 1
+            if node._children is not None:
+                for child in node._children.values():
+                    if isinstance(child, Node):
+                        stack.append(child)
+                    else:
+                        count += 1
+        return count
+
+    def __repr__(self) -> str:
+        """Represent the node."""
+        return f"Node(pointer={self.pointer!r}, entry={self.entry!r})"
+
+
+class _Children(typing.Mapping[str, Node]):
+    """The nodes of the values within a value by their segment."""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node: Node) -> None:
+        """Construct."""
+        self._node = node
+
+    def __getitem__(self, segment: str) -> Node:
+        """Retrieve the node of a value."""
+        return self._node.child(segment)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        """Iterate over the segments in document order."""
+        return iter(self._node._children or ())
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return len(self._node._children or ())
+
+
+def from_entries(entries: typing.Iterable[typing.Tuple[str, types.Entry]]) -> Node:
+    """
+    Build the tree from the source map entries.
+
+    The entries are consumed one at a time, which means that they can be generated
+    while the document is scanned. Each parent has to come before its children,
+    the entries are quickest to add in document order. An entry for a JSON pointer
+    that has already been added replaces it, the same as for the source map.
+
+    Args:
+        entries: The JSON pointers and source map entries.
+
+    Returns:
+        The root node of the tree.
+
+    """
+    # pylint: disable=protected-access
+    iterator = iter(entries)
+    _, root_entry = next(iterator)
+    root = Node(segment="", parent=None, entry=root_entry)
+
+    # The pointers and nodes from the root to the parent of the last added value
+    stack: typing.List[typing.Tuple[str, Node]] = [("", root)]
+    # The pointer and segment of the last added value
+    last = ("", "")
+    for pointer, entry in iterator:
+        parent_pointer, _, segment = pointer.rpartition(POINTER_SEPARATOR)
+        if parent_pointer == last[0] and stack[-1][0] != parent_pointer:
+            # The last added value is the parent
+            stack.append((parent_pointer, stack[-1][1]._branch(last[1])))
+        while stack and stack[-1][0] != parent_pointer:
+            stack.pop()
+        if not stack:
+            # Not in document order, such as the values after a duplicate key
+            stack.append((parent_pointer, _branch(root, parent_pointer)))
+        segment = sys.intern(unescape(segment))
+        stack[-1][1]._add(segment, entry)
+        last = (pointer, segment)
+
+    return root
+
+
+def _branch(root: Node, pointer: str) -> Node:
+    """Retrieve the node at a JSON pointer to add values within it."""
+    node = root
+    for segment in pointer.split(POINTER_SEPARATOR)[1:]:
+        node = node._branch(unescape(segment))  # pylint: disable=protected-access
+    return node
@@ -1,8 +1,50 @@
 """Types for calculating the JSON source map."""
 
 import dataclasses
+import time
 import typing
 
+from . import encoding
+
+POINTER: typing.Final = "pointer"
+TUPLE: typing.Final = "tuple"
+TKeyStyle = typing.Literal["pointer", "tuple"]
+KEY_STYLES = {POINTER, TUPLE}
+
+OBJECT: typing.Final = "object"
+ARRAY: typing.Final = "array"
+STRING: typing.Final = "string"
+NUMBER: typing.Final = "number"
+BOOLEAN: typing.Final = "boolean"
+NULL: typing.Final = "null"
+TKind = typing.Literal["object", "array", "string", "number", "boolean", "null"]
+
+
+@dataclasses.dataclass(frozen=True)
+class Options:
+    """
+    The options for calculating the source map.
+
+    Attrs:
+        units: The units the source has been converted to.
+        hashes: Whether to calculate the content hash of each value.
+        kinds: Whether to record the kind of each value and the number of values
+            within each array and object.
+        key_style: Whether the source map is keyed by JSON pointers or by tuples of
+            the keys and array indexes to each value.
+        end: The position just after the end of the JSON document within the
+            source, by default the end of the source.
+        budget: The limits on the resources used to calculate the source map.
+
+    """
+
+    units: encoding.TUnits = encoding.CODEPOINT
+    hashes: bool = False
+    kinds: bool = False
+    key_style: TKeyStyle = POINTER
+    end: typing.Optional[int] = None
+    budget: typing.Optional["Budget"] = None
+
 
 class TLocationDict(
     typing.TypedDict
@@ -57,7 +99,7 @@ class TEntryDict(TEntryDictBase, total=False):  # pylint: disable=too-few-public
 
 
 @dataclasses.dataclass
-class Entry:
+class Entry:  # pylint: disable=too-many-instance-attributes
     """
     The start and end location for a value in the source.
 
@@ -68,6 +110,14 @@ class Entry:
             object.
         keyEnd: The end location of the key included if the item is directly with an
             object.
+        content_hash: The hash of the source of the value, for arrays and objects
+            calculated from the hashes of the values within them, included if
+            requested.
+        truncated: Whether some of the values within an array or object are not
+            included because a budget ran out.
+        kind: The kind of the value, included if requested.
+        child_count: The number of values within an array or object, included if
+            requested unless truncated.
 
     """
 
@@ -75,6 +125,10 @@ class Entry:
     value_end: Location
     key_start: typing.Optional[Location] = None
     key_end: typing.Optional[Location] = None
+    content_hash: typing.Optional[str] = None
+    truncated: bool = False
+    kind: typing.Optional[TKind] = None
+    child_count: typing.Optional[int] = None
 
     def to_dict(self) -> TEntryDict:
         """Convert to dictionary."""
@@ -89,5 +143,165 @@ class Entry:
         return value
 
 
+class Budget:  # pylint: disable=too-many-instance-attributes
+    """
+    The limits on the resources used to calculate the source map.
+
+    The budget also keeps track of the resources used so far, which means that a
+    budget is only used for a single calculation.
+
+    Attrs:
+        max_entries: The maximum number of entries.
+        max_depth: The maximum number of arrays and objects a value is nested in,
+            including itself.
+        max_memory: The maximum bytes used by the entries, estimated from the
+            size of an entry, the length of its JSON pointer and whether it has
+            the locations of a key and a content hash.
+        deadline: The time.monotonic time by which the calculation must end.
+        truncate: Whether to truncate arrays and objects when the budget runs out
+            or to raise BudgetExceededError.
+        entries: The number of entries so far.
+        memory: The estimated bytes used by the entries so far.
+        depth: The number of arrays and objects the current value is within.
+        pointer_length: The length of the JSON pointer of the current value.
+
+    """
+
+    __slots__ = (
+        "max_entries",
+        "max_depth",
+        "max_memory",
+        "deadline",
+        "truncate",
+        "entries",
+        "memory",
+        "depth",
+        "pointer_length",
+    )
+
+    # The bytes used by an entry with its value locations, the JSON pointer
+    # without its characters and its item of the source map, the locations of a
+    # key and a content hash and by an array or object while the document is
+    # checked, measured using tracemalloc on Python 3.11 and rounded up
+    ENTRY_BYTES = 450
+    KEY_BYTES = 200
+    HASH_BYTES = 100
+    CONTAINER_BYTES = 10
+
+    def __init__(
+        self,
+        *,
+        max_entries: typing.Optional[int] = None,
+        max_depth: typing.Optional[int] = None,
+        max_seconds: typing.Optional[float] = None,
+        max_memory: typing.Optional[int] = None,
+        truncate: bool = False,
+    ) -> None:
+        """Construct, starting the time limit."""
+        self.max_entries = max_entries
+        self.max_depth = max_depth
+        self.max_memory = max_memory
+        self.deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        self.truncate = truncate
+        self.entries = 0
+        self.memory = 0
+        self.depth = 0
+        self.pointer_length = 0
+
+    def charge(self, *, key: bool, hashes: bool) -> None:
+        """
+        Record that an entry is added for the current value.
+
+        Args:
+            key: Whether the entry has the locations of a key.
+            hashes: Whether the entry has a content hash.
+
+        """
+        self.entries += 1
+        self.memory += self.ENTRY_BYTES + self.pointer_length
+        if key:
+            self.memory += self.KEY_BYTES
+        if hashes:
+            self.memory += self.HASH_BYTES
+
+    def exceeded(self) -> typing.Optional[str]:
+        """
+        Check whether any more entries can be added.
+
+        Returns:
+            The description of the limit that has been reached, if any.
+
+        """
+        if self.max_entries is not None and self.entries >= self.max_entries:
+            return f"max_entries of {self.max_entries}"
+        if self.max_memory is not None and self.memory >= self.max_memory:
+            return f"max_memory of {self.max_memory} bytes"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "max_seconds"
+        return None
+
+    def too_deep(self) -> bool:
+        """Check whether an array or object can not be added at the current depth."""
+        return self.max_depth is not None and self.depth >= self.max_depth
+
+
 TSourceMapEntries = typing.List[typing.Tuple[str, Entry]]
 TSourceMap = typing.Dict[str, Entry]
+TPath = typing.Tuple[typing.Union[str, int], ...]
+TPathSourceMap = typing.Dict[TPath, Entry]
+TKey = typing.Union[str, TPath]  # pylint: disable=invalid-name
+TKeyedEntries = typing.List[typing.Tuple[TKey, Entry]]
+
+
+@dataclasses.dataclass
+class Diff:
+    """
+    The differences between the source maps of two JSON documents.
+
+    Attrs:
+        changed: The old and new entries of values at the same JSON pointer that
+            are different, not including arrays and objects that are still arrays
+            and objects.
+        added: The entries of the values only in the new document.
+        removed: The entries of the values only in the old document.
+
+    """
+
+    changed: typing.Dict[str, typing.Tuple[Entry, Entry]] = dataclasses.field(
+        default_factory=dict
+    )
+    added: TSourceMap = dataclasses.field(default_factory=dict)
+    removed: TSourceMap = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class ErrorSpan:
+    """
+    A part of a JSON document that is not valid.
+
+    Attrs:
+        start: The start location of the part.
+        end: The end location of the part, the same as start if something is
+            missing.
+        message: What is wrong with the part.
+
+    """
+
+    start: Location
+    end: Location
+    message: str
+
+
+@dataclasses.dataclass
+class PartialSourceMap:
+    """
+    The source map of the valid parts of a JSON document that might not be valid.
+
+    Attrs:
+        source_map: The entries of the values that could be located.
+        errors: The parts of the document that are not valid in document order.
+
+    """
+
+    source_map: TSourceMap = dataclasses.field(default_factory=dict)
+    errors: typing.List[ErrorSpan] = dataclasses.field(default_factory=list)
@@ -0,0 +1,141 @@
+"""Find the entries of the JSON source map that overlap a range of lines."""
+
+import array
+import bisect
+import typing
+
+from . import types
+
+# The index stored for a value without a parent or a line without an open value
+_NONE = -1
+
+
+class ViewportIndex:
+    """
+    The entries of a source map indexed by the lines they start on.
+
+    The arrays and objects of a JSON document are nested within each other, which
+    means that the values that start before a line and end on or after it are the
+    deepest such value and the arrays and objects that it is within.
+
+    Attrs:
+        pointers: The JSON pointers of the entries ordered by value start.
+        entries: The entries ordered by value start.
+        start_lines: The line each entry starts on.
+        parents: The index of the array or object each entry is directly within.
+        open_values: The index of the deepest entry that starts before each line
+            and ends on or after it.
+
+    """
+
+    __slots__ = ("pointers", "entries", "start_lines", "parents", "open_values")
+
+    def __init__(
+        self,
+        *,
+        pointers: typing.List[str],
+        entries: typing.List[types.Entry],
+        start_lines: array.array,
+        parents: array.array,
+        open_values: array.array,
+    ) -> None:
+        """Construct."""
+        self.pointers = pointers
+        self.entries = entries
+        self.start_lines = start_lines
+        self.parents = parents
+        self.open_values = open_values
+
+    @classmethod
+    def from_source_map(
+        cls, source_map: typing.Mapping[str, types.Entry]
+    ) -> "ViewportIndex":
+        """
+        Build the index of a source map.
+
+        Args:
+            source_map: The source map.
+
+        Returns:
+            The viewport index.
+
+        """
+        items = sorted(
+            source_map.items(), key=lambda item: item[1].value_start.position
+        )
+        entries = [entry for _, entry in items]
+        parents = array.array("q")
+        open_values = array.array("q")
+
+        # The values that the current value is within and the values that are open
+        # on the current line, both from the outermost to the innermost
+        ancestors: typing.List[int] = []
+        open_stack: typing.List[int] = []
+        for index, entry in enumerate(entries):
+            start = entry.value_start
+            while ancestors and entries[ancestors[-1]].value_end.position <= (
+                start.position
+            ):
+                ancestors.pop()
+            parents.append(ancestors[-1] if ancestors else _NONE)
+            ancestors.append(index)
+
+            # Record the open values of the lines up to the line of the value
+            while len(open_values) <= start.line:
+                line = len(open_values)
+                while open_stack and entries[open_stack[-1]].value_end.line < line:
+                    open_stack.pop()
+                open_values.append(open_stack[-1] if open_stack else _NONE)
+            while (
+                open_stack
+                and entries[open_stack[-1]].value_end.position <= start.position
+            ):
+                open_stack.pop()
+            open_stack.append(index)
+
+        last_line = max((entry.value_end.line for entry in entries), default=0)
+        while len(open_values) <= last_line:
+            line = len(open_values)
+            while open_stack and entries[open_stack[-1]].value_end.line < line:
+                open_stack.pop()
+            open_values.append(open_stack[-1] if open_stack else _NONE)
+
+        return cls(
+            pointers=[pointer for pointer, _ in items],
+            entries=entries,
+            start_lines=array.array("q", (entry.value_start.line for entry in entries)),
+            parents=parents,
+            open_values=open_values,
+        )
+
+    def entries_in_lines(self, first: int, last: int) -> types.TSourceMap:
+        """
+        Find the entries that overlap a range of lines.
+
+        Takes time proportional to the logarithm of the number of entries and the
+        number of entries that are found.
+
+        Args:
+            first: The first line of the range.
+            last: The last line of the range, which is included.
+
+        Returns:
+            The JSON pointers and entries that start, end or are on any line of the
+            range ordered by value start.
+
+        """
+        if first > last:
+            return {}
+        first = max(first, 0)
+
+        # The values that start before the range and end within or after it
+        enclosing: typing.List[int] = []
+        index = self.open_values[first] if first < len(self.open_values) else _NONE
+        while index != _NONE:
+            enclosing.append(index)
+            index = self.parents[index]
+
+        start = bisect.bisect_left(self.start_lines, first)
+        end = bisect.bisect_right(self.start_lines, last)
+        indexes = [*reversed(enclosing), *range(start, end)]
+        return {self.pointers[index]: self.entries[index] for index in indexes}
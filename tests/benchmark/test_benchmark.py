@@ -0,0 +1,64 @@
+"""Wall time of calculating source maps in a thread pool and in a process pool."""
+
+import concurrent.futures
+import json
+import time
+
+import pytest
+
+from json_source_map import calculate, calculate_many, calculate_parallel, parallel
+
+WORKERS = 4
+DOCUMENTS = [
+    json.dumps(
+        [
+            {"id": index, "name": f"name {index}", "tags": ["a", "b"], "score": 1.5}
+            for index in range(100)
+        ],
+        indent=2,
+    )
+    for _ in range(16)
+]
+DOCUMENT = json.dumps(
+    {f"key {index}": [index, {"nested": "é"}] for index in range(5000)}, indent=2
+)
+FUNCTIONS = {
+    "calculate_many": lambda executor: calculate_many(DOCUMENTS, executor=executor),
+    "calculate_parallel": lambda executor: calculate_parallel(
+        DOCUMENT, executor=executor
+    ),
+}
+EXPECTED = {
+    "calculate_many": lambda: [calculate(document) for document in DOCUMENTS],
+    "calculate_parallel": lambda: calculate(DOCUMENT),
+}
+
+
+def _seconds(function, executor):
+    """Time a call of the function after a warm up call that starts the workers."""
+    function(executor)
+    start = time.perf_counter()
+    result = function(executor)
+    return time.perf_counter() - start, result
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("function", FUNCTIONS)
+def test_benchmark(function, record_property):
+    """
+    GIVEN function to calculate source maps in parallel
+    WHEN the function is called with a thread pool and with a process pool
+    THEN the wall time of each is recorded and the results are the same.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        thread_seconds, thread_result = _seconds(FUNCTIONS[function], executor)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=WORKERS) as executor:
+        process_seconds, process_result = _seconds(FUNCTIONS[function], executor)
+
+    record_property("free_threaded", parallel.free_threaded())
+    record_property("thread_seconds", round(thread_seconds, 3))
+    record_property("process_seconds", round(process_seconds, 3))
+    record_property("thread_speedup", round(process_seconds / thread_seconds, 2))
+    expected_result = EXPECTED[function]()
+    assert thread_result == expected_result
+    assert process_result == expected_result
@@ -7,7 +7,7 @@ import subprocess
 import hypothesis
 from hypothesis import strategies
 
-from json_source_map import calculate
+from json_source_map import calculate, calculate_indexed, dumps_pointers
 
 json_strategy = strategies.recursive(
     strategies.none()
@@ -41,3 +41,35 @@ def test_calculate(source):
     )
     expected_source_map = json.loads(process.stdout)
     assert returned_source_map == expected_source_map
+
+
+@hypothesis.given(json_strategy)
+def test_dumps_pointers(source):
+    """
+    GIVEN source
+    WHEN dumps_pointers is called with the source map of the source
+    THEN the same output as the reference implementation is returned.
+    """
+    source_str = json.dumps(source)
+
+    returned_pointers = dumps_pointers(calculate(source_str))
+
+    # Also calculate using reference implementation in Node
+    process = subprocess.run(
+        ["node", "index.js", source_str], capture_output=True, check=True
+    )
+    assert returned_pointers == process.stdout.decode().strip()
+
+
+@hypothesis.given(json_strategy, strategies.integers(min_value=0, max_value=4))
+def test_calculate_indexed(source, indent):
+    """
+    GIVEN source and indent
+    WHEN calculate_indexed is called with the source
+    THEN the same source map as calculate is returned.
+    """
+    source_str = json.dumps(source, indent=indent)
+
+    returned_source_map = calculate_indexed(source_str)
+
+    assert returned_source_map == calculate(source_str)
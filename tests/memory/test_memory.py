@@ -0,0 +1,165 @@
+"""Memory footprint of the source map for representative documents."""
+
+import concurrent.futures
+import functools
+import gc
+import json
+import multiprocessing
+import sys
+import tracemalloc
+
+import pytest
+
+from json_source_map import calculate, calculate_indexed, calculate_lazy, calculate_tree
+
+CORPORA = {
+    "records": json.dumps(
+        [
+            {
+                "id": index,
+                "name": f"name {index}",
+                "tags": ["a", "b"],
+                "active": True,
+                "score": index * 1.5,
+            }
+            for index in range(1000)
+        ],
+        indent=2,
+    ),
+    "nested": json.dumps(
+        functools.reduce(
+            lambda child, index: {"child": child, "index": index}, range(200), None
+        )
+    ),
+    "wide": json.dumps({f"key {index}": index for index in range(2000)}),
+    "strings": json.dumps(["x" * 1000 for _ in range(500)]),
+}
+FUNCTIONS = {
+    "calculate": calculate,
+    "calculate_indexed": calculate_indexed,
+    "calculate_lazy": calculate_lazy,
+    "calculate_tree": calculate_tree,
+}
+
+# The maximum bytes retained by the result and peak bytes allocated during the
+# calculation per entry. Review these before each release, lowering them when the
+# footprint improves, so that any increase is caught. Objects take more memory
+# before Python 3.11, which started storing their attributes inline.
+THRESHOLDS = (
+    {
+        ("records", "calculate"): (800, 900),
+        ("records", "calculate_indexed"): (800, 900),
+        ("records", "calculate_lazy"): (220, 750),
+        ("records", "calculate_tree"): (750, 800),
+        ("nested", "calculate"): (2000, 2700),
+        ("nested", "calculate_indexed"): (2100, 2200),
+        ("nested", "calculate_lazy"): (1250, 1350),
+        ("nested", "calculate_tree"): (1050, 1400),
+        ("wide", "calculate"): (1050, 1100),
+        ("wide", "calculate_indexed"): (1050, 1150),
+        ("wide", "calculate_lazy"): (250, 700),
+        ("wide", "calculate_tree"): (900, 950),
+        ("strings", "calculate"): (700, 1300),
+        ("strings", "calculate_indexed"): (800, 1300),
+        ("strings", "calculate_lazy"): (300, 1300),
+        ("strings", "calculate_tree"): (550, 1300),
+    }
+    if sys.version_info >= (3, 11)
+    else {
+        ("records", "calculate"): (1100, 1200),
+        ("records", "calculate_indexed"): (1000, 1100),
+        ("records", "calculate_lazy"): (300, 750),
+        ("records", "calculate_tree"): (1000, 1050),
+        ("nested", "calculate"): (2350, 3000),
+        ("nested", "calculate_indexed"): (2200, 2300),
+        ("nested", "calculate_lazy"): (1250, 1350),
+        ("nested", "calculate_tree"): (1350, 1600),
+        ("wide", "calculate"): (1300, 1350),
+        ("wide", "calculate_indexed"): (1300, 1350),
+        ("wide", "calculate_lazy"): (600, 700),
+        ("wide", "calculate_tree"): (1200, 1250),
+        ("strings", "calculate"): (850, 1300),
+        ("strings", "calculate_indexed"): (900, 1300),
+        ("strings", "calculate_lazy"): (300, 1300),
+        ("strings", "calculate_tree"): (750, 1300),
+    }
+)
+
+
+def keys(value):
+    """
+    Find the keys of all the objects within a value.
+
+    Args:
+        value: The decoded JSON value.
+
+    Returns:
+        The keys.
+
+    """
+    if isinstance(value, list):
+        for item in value:
+            yield from keys(item)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from keys(item)
+
+
+def measure(corpus, function):
+    """
+    Calculate the source map of a document while tracing allocations.
+
+    Runs in a fresh process so that the allocations do not depend on which tests
+    ran before.
+
+    Args:
+        corpus: The name of the document.
+        function: The name of the function to calculate the source map with.
+
+    Returns:
+        The bytes retained by the source map, the peak bytes allocated during the
+        calculation and the number of entries.
+
+    """
+    source = CORPORA[corpus]
+    # Keep the keys interned so that growing the table of interned strings, which
+    # is shared by the whole process, is not counted
+    interned = [sys.intern(key) for key in keys(json.loads(source))]
+    # Warm up and keep the result so that one off growth, such as of the table of
+    # interned strings, is not counted
+    warm_up = FUNCTIONS[function](source)
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        source_map = FUNCTIONS[function](source)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del warm_up, interned
+    return retained, peak, len(source_map)
+
+
+@pytest.mark.parametrize("function", FUNCTIONS)
+@pytest.mark.parametrize("corpus", CORPORA)
+def test_memory(corpus, function, record_property):
+    """
+    GIVEN document and function to calculate the source map
+    WHEN the function is called with the document in a fresh process while tracing
+        allocations
+    THEN the bytes per entry retained and at the peak are below the thresholds.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        retained, peak, entries = executor.submit(measure, corpus, function).result()
+
+    retained_per_entry = retained / entries
+    peak_per_entry = peak / entries
+    record_property("retained_bytes_per_entry", round(retained_per_entry))
+    record_property("peak_bytes_per_entry", round(peak_per_entry))
+    record_property("peak_bytes", peak)
+    max_retained_per_entry, max_peak_per_entry = THRESHOLDS[(corpus, function)]
+    assert retained_per_entry <= max_retained_per_entry
+    assert peak_per_entry <= max_peak_per_entry
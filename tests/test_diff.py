@@ -0,0 +1,90 @@
+"""Tests for calculating the differences between two JSON documents."""
+
+import pytest
+
+from json_source_map import calculate, diff, errors
+
+DIFF_TESTS = [
+    pytest.param("0", "0", [], [], [], id="same primitive"),
+    pytest.param("0", "1", [""], [], [], id="changed primitive"),
+    pytest.param("[1, 2]", "[1,2]", [], [], [], id="whitespace only"),
+    pytest.param("[1, 2]", "[1, 3]", ["/1"], [], [], id="array item changed"),
+    pytest.param("[1]", "[1, 2]", [], ["/1"], [], id="array item added"),
+    pytest.param("[1, 2]", "[1]", [], [], ["/1"], id="array item removed"),
+    pytest.param(
+        '{"a": {"b": 1}, "c": [2]}',
+        '{"a": {"b": 1}, "c": [3], "d": {"e": null}}',
+        ["/c/0"],
+        ["/d", "/d/e"],
+        [],
+        id="object nested",
+    ),
+    pytest.param(
+        '{"a": {"b": 1}}', "{}", [], [], ["/a", "/a/b"], id="object nested removed"
+    ),
+    pytest.param(
+        '{"a": {"b": 1}}',
+        '{"a": [1]}',
+        ["/a"],
+        ["/a/0"],
+        ["/a/b"],
+        id="object to array",
+    ),
+    pytest.param(
+        '{"a": [1]}', '{"a": "[1]"}', ["/a"], [], ["/a/0"], id="array to string"
+    ),
+    pytest.param(
+        '{"ab": [1], "a": [2]}',
+        '{"ab": [1], "a": [3]}',
+        ["/a/0"],
+        [],
+        [],
+        id="skip only descendants",
+    ),
+    pytest.param(
+        '{\n  "a": 1,\n  "b": {"c": [2]}\n}',
+        '{\n  "a": {"d": [\n    3\n  ]},\n  "b": {"c": [2, 4]}\n}',
+        ["/a"],
+        ["/a/d", "/a/d/0", "/b/c/1"],
+        [],
+        id="nested added on new lines",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "old_source, new_source, expected_changed, expected_added, expected_removed",
+    DIFF_TESTS,
+)
+def test_diff(
+    old_source, new_source, expected_changed, expected_added, expected_removed
+):
+    """
+    GIVEN old and new source and expected changed, added and removed pointers
+    WHEN diff is called with the sources
+    THEN the expected pointers are returned with their entries.
+    """
+    returned_diff = diff(old_source, new_source)
+
+    old_source_map = calculate(old_source)
+    new_source_map = calculate(new_source)
+    assert returned_diff.changed == {
+        pointer: (old_source_map[pointer], new_source_map[pointer])
+        for pointer in expected_changed
+    }
+    assert returned_diff.added == {
+        pointer: new_source_map[pointer] for pointer in expected_added
+    }
+    assert returned_diff.removed == {
+        pointer: old_source_map[pointer] for pointer in expected_removed
+    }
+
+
+def test_diff_invalid():
+    """
+    GIVEN invalid new source
+    WHEN diff is called with the sources
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        diff("0", "invalid")
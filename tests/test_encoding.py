@@ -0,0 +1,31 @@
+"""Tests for the units locations are counted in."""
+
+import pytest
+
+from json_source_map import encoding
+
+VIEW_TESTS = [
+    pytest.param("a", encoding.CODEPOINT, "a", id="codepoint ascii"),
+    pytest.param("é😀", encoding.CODEPOINT, "é😀", id="codepoint non-ascii"),
+    pytest.param("a", encoding.UTF8, "a", id="utf8 ascii"),
+    pytest.param("é", encoding.UTF8, "Ã©", id="utf8 two bytes"),
+    pytest.param("😀", encoding.UTF8, "ð\u009f\u0098\u0080", id="utf8 four bytes"),
+    pytest.param("\ud800", encoding.UTF8, "í \u0080", id="utf8 surrogate"),
+    pytest.param("a", encoding.UTF16, "a", id="utf16 ascii"),
+    pytest.param("é", encoding.UTF16, "é", id="utf16 basic plane"),
+    pytest.param("a😀b", encoding.UTF16, "a\ud83d\ude00b", id="utf16 astral"),
+]
+
+
+@pytest.mark.parametrize("source, units, expected_view", VIEW_TESTS)
+def test_view_restore(source, units, expected_view):
+    """
+    GIVEN source, units and expected view
+    WHEN view and then restore are called with the source and units
+    THEN the expected view and then the source are returned.
+    """
+    returned_view = encoding.view(source, units=units)
+
+    assert returned_view == expected_view
+    assert len(returned_view) == len(expected_view)
+    assert encoding.restore(returned_view, units=units) == source
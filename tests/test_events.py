@@ -0,0 +1,194 @@
+"""Tests for reporting the structure of a JSON document as a stream of events."""
+
+import pytest
+
+from json_source_map import Visitor, calculate, errors, types, walk
+
+
+class _RecordingVisitor(Visitor):
+    """Record the name and arguments of each event."""
+
+    def __init__(self):
+        """Construct."""
+        self.events = []
+
+    def start_object(self, *, pointer, start):
+        """Record the event."""
+        self.events.append(("start_object", pointer, start))
+
+    def end_object(self, *, pointer, end):
+        """Record the event."""
+        self.events.append(("end_object", pointer, end))
+
+    def start_array(self, *, pointer, start):
+        """Record the event."""
+        self.events.append(("start_array", pointer, start))
+
+    def end_array(self, *, pointer, end):
+        """Record the event."""
+        self.events.append(("end_array", pointer, end))
+
+    def key(self, *, key, start, end):
+        """Record the event."""
+        self.events.append(("key", key, start, end))
+
+    def scalar(self, *, pointer, kind, start, end):
+        """Record the event."""
+        self.events.append(("scalar", pointer, kind, start, end))
+
+
+class _SourceMapVisitor(Visitor):
+    """Build the source map from the events."""
+
+    def __init__(self):
+        """Construct."""
+        self.source_map = {}
+        self.key_location = None
+
+    def _add(self, pointer, start, end=None):
+        """Add the entry of a value with the location of its key, if any."""
+        key_start, key_end = self.key_location or (None, None)
+        self.source_map[pointer] = types.Entry(
+            value_start=start, value_end=end, key_start=key_start, key_end=key_end
+        )
+        self.key_location = None
+
+    def start_object(self, *, pointer, start):
+        """Add the entry of the object."""
+        self._add(pointer, start)
+
+    def start_array(self, *, pointer, start):
+        """Add the entry of the array."""
+        self._add(pointer, start)
+
+    def end_object(self, *, pointer, end):
+        """Add the end of the object to its entry."""
+        self.source_map[pointer].value_end = end
+
+    def end_array(self, *, pointer, end):
+        """Add the end of the array to its entry."""
+        self.source_map[pointer].value_end = end
+
+    def key(self, *, key, start, end):
+        """Record the location of the key for the next value."""
+        self.key_location = (start, end)
+
+    def scalar(self, *, pointer, kind, start, end):
+        """Add the entry of the value."""
+        self._add(pointer, start, end)
+
+
+WALK_TESTS = [
+    pytest.param(
+        "null",
+        [("scalar", "", "null", types.Location(0, 0, 0), types.Location(0, 4, 4))],
+        id="primitive",
+    ),
+    pytest.param(
+        "[]",
+        [
+            ("start_array", "", types.Location(0, 0, 0)),
+            ("end_array", "", types.Location(0, 2, 2)),
+        ],
+        id="empty array",
+    ),
+    pytest.param(
+        '[1, "a"]',
+        [
+            ("start_array", "", types.Location(0, 0, 0)),
+            (
+                "scalar",
+                "/0",
+                "number",
+                types.Location(0, 1, 1),
+                types.Location(0, 2, 2),
+            ),
+            (
+                "scalar",
+                "/1",
+                "string",
+                types.Location(0, 4, 4),
+                types.Location(0, 7, 7),
+            ),
+            ("end_array", "", types.Location(0, 8, 8)),
+        ],
+        id="array",
+    ),
+    pytest.param(
+        '{\n "a/b": {"c": true}\n}',
+        [
+            ("start_object", "", types.Location(0, 0, 0)),
+            ("key", "a/b", types.Location(1, 1, 3), types.Location(1, 6, 8)),
+            ("start_object", "/a~1b", types.Location(1, 8, 10)),
+            ("key", "c", types.Location(1, 9, 11), types.Location(1, 12, 14)),
+            (
+                "scalar",
+                "/a~1b/c",
+                "boolean",
+                types.Location(1, 14, 16),
+                types.Location(1, 18, 20),
+            ),
+            ("end_object", "/a~1b", types.Location(1, 19, 21)),
+            ("end_object", "", types.Location(2, 1, 23)),
+        ],
+        id="object",
+    ),
+]
+
+
+@pytest.mark.parametrize("source, expected_events", WALK_TESTS)
+def test_walk(source, expected_events):
+    """
+    GIVEN source and expected events
+    WHEN walk is called with the source and a visitor
+    THEN the expected events are reported to the visitor in document order.
+    """
+    visitor = _RecordingVisitor()
+
+    walk(source, visitor)
+
+    assert visitor.events == expected_events
+
+
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+def test_walk_source_map(units):
+    """
+    GIVEN source and units
+    WHEN walk is called with a visitor that builds the source map
+    THEN the source map is the same as the result of calculate.
+    """
+    source = '{\n  "é😀": [1, {"b\\u00e9": null}, []],\n  "c": {}\n}'
+    visitor = _SourceMapVisitor()
+
+    walk(source, visitor, units=units)
+
+    assert visitor.source_map == calculate(source, units=units)
+
+
+def test_walk_default_visitor():
+    """
+    GIVEN source
+    WHEN walk is called with a visitor that does not override any event
+    THEN no error is raised.
+    """
+    walk('{"a": [1, null]}', Visitor())
+
+
+@pytest.mark.parametrize(
+    "source, units, expected_error",
+    [
+        pytest.param('{"a": }', "codepoint", errors.InvalidInputError, id="invalid"),
+        pytest.param("", "codepoint", errors.InvalidInputError, id="empty"),
+        pytest.param(" \n", "codepoint", errors.InvalidInputError, id="whitespace"),
+        pytest.param(1, "codepoint", errors.InvalidInputError, id="not string"),
+        pytest.param("1", "utf32", errors.InvalidInputError, id="units"),
+    ],
+)
+def test_walk_error(source, units, expected_error):
+    """
+    GIVEN invalid source or units
+    WHEN walk is called with the source and units
+    THEN the expected error is raised.
+    """
+    with pytest.raises(expected_error):
+        walk(source, Visitor(), units=units)
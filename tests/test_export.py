@@ -0,0 +1,128 @@
+"""Tests for exporting the source map to other formats."""
+
+import io
+import json
+
+import pytest
+
+from json_source_map import calculate, calculate_lazy, export, types
+
+POINTERS_TESTS = [
+    pytest.param({}, "{}", id="empty"),
+    pytest.param(
+        {
+            "": types.Entry(
+                value_start=types.Location(0, 0, 0), value_end=types.Location(0, 1, 1)
+            )
+        },
+        '{"":{"value":{"line":0,"column":0,"pos":0},'
+        '"valueEnd":{"line":0,"column":1,"pos":1}}}',
+        id="single",
+    ),
+    pytest.param(
+        {
+            "": types.Entry(
+                value_start=types.Location(0, 0, 0), value_end=types.Location(1, 1, 9)
+            ),
+            '/"key"': types.Entry(
+                value_start=types.Location(0, 7, 7),
+                value_end=types.Location(0, 8, 8),
+                key_start=types.Location(0, 1, 1),
+                key_end=types.Location(0, 6, 6),
+            ),
+        },
+        '{"":{"value":{"line":0,"column":0,"pos":0},'
+        '"valueEnd":{"line":1,"column":1,"pos":9}},'
+        '"/\\"key\\"":{"key":{"line":0,"column":1,"pos":1},'
+        '"keyEnd":{"line":0,"column":6,"pos":6},'
+        '"value":{"line":0,"column":7,"pos":7},'
+        '"valueEnd":{"line":0,"column":8,"pos":8}}}',
+        id="multiple with key",
+    ),
+]
+
+
+@pytest.mark.parametrize("source_map, expected_output", POINTERS_TESTS)
+def test_dumps_pointers(source_map, expected_output):
+    """
+    GIVEN source map and expected output
+    WHEN dumps_pointers is called with the source map
+    THEN the expected output is returned.
+    """
+    returned_output = export.dumps_pointers(source_map)
+
+    assert returned_output == expected_output
+
+
+@pytest.mark.parametrize("source_map, expected_output", POINTERS_TESTS)
+def test_dump_pointers(source_map, expected_output):
+    """
+    GIVEN source map and expected output
+    WHEN dump_pointers is called with the source map and a file
+    THEN the expected output is written to the file.
+    """
+    file = io.StringIO()
+
+    export.dump_pointers(source_map, file)
+
+    assert file.getvalue() == expected_output
+
+
+def test_dumps_pointers_to_dict():
+    """
+    GIVEN source map calculated from a document
+    WHEN dumps_pointers is called with the source map
+    THEN the output is the same as converting each entry to a dictionary.
+    """
+    source_map = calculate('{"foo": [1, {"bar": null}], "baz": "qux"}')
+
+    returned_output = export.dumps_pointers(source_map)
+
+    assert json.loads(returned_output) == {
+        pointer: entry.to_dict() for pointer, entry in source_map.items()
+    }
+
+
+@pytest.mark.parametrize("calculate_function", [calculate, calculate_lazy])
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+def test_to_numpy(calculate_function, units):
+    """
+    GIVEN source map calculated from a document in units
+    WHEN to_numpy is called with the source map
+    THEN a row with the locations of each entry is returned with its JSON pointer.
+    """
+    pytest.importorskip("numpy")
+    source = '{\n  "é😀": [1, {"bar": null}],\n  "baz": "qux"\n}'
+    source_map = calculate_function(source, units=units)
+
+    returned_array, returned_pointers = export.to_numpy(source_map)
+
+    expected_source_map = calculate(source, units=units)
+    assert returned_pointers == list(expected_source_map)
+    assert returned_array.dtype.names == export.FIELDS
+    assert returned_array.shape == (len(expected_source_map),)
+    for row, entry in zip(returned_array, expected_source_map.values()):
+        expected_row = []
+        for location in export.LOCATIONS:
+            value = getattr(entry, location)
+            expected_row.extend(
+                export.NO_LOCATION
+                if value is None
+                else (value.line, value.column, value.position)
+            )
+        assert list(row.tolist()) == expected_row
+
+
+def test_to_numpy_empty():
+    """
+    GIVEN empty source map
+    WHEN to_numpy is called with the source map
+    THEN an empty array and no JSON pointers are returned.
+    """
+    pytest.importorskip("numpy")
+
+    returned_array, returned_pointers = export.to_numpy({})
+
+    assert returned_array.shape == (0,)
+    assert returned_array.dtype.names == export.FIELDS
+    assert not returned_pointers
@@ -0,0 +1,179 @@
+"""Tests for following a JSON Lines file as records are appended."""
+
+import os
+import time
+
+import pytest
+
+from json_source_map import follow, types
+from json_source_map.follow import Position
+
+
+def _records(path, **kwargs):
+    """Read the records of the file without waiting for more."""
+    return list(follow(str(path), wait=False, **kwargs))
+
+
+def test_follow_records(tmp_path):
+    """
+    GIVEN JSON Lines file with blank lines and non ASCII characters
+    WHEN follow is called
+    THEN the source map of each record is returned with its index, line, byte offset
+        and the position after it.
+    """
+    path = tmp_path / "log.jsonl"
+    path.write_bytes('{"a": "é"}\n\n[1]\n'.encode("utf-8"))
+
+    records = _records(path)
+
+    assert [(record.index, record.line, record.offset) for record in records] == [
+        (0, 0, 0),
+        (1, 2, 13),
+    ]
+    assert records[0].source_map["/a"] == types.Entry(
+        value_start=types.Location(0, 6, 6),
+        value_end=types.Location(0, 9, 9),
+        key_start=types.Location(0, 1, 1),
+        key_end=types.Location(0, 4, 4),
+    )
+    assert records[1].source_map["/0"] == types.Entry(
+        value_start=types.Location(2, 1, 1), value_end=types.Location(2, 2, 2)
+    )
+    assert records[1].position == Position(
+        offset=17, line=3, index=2, inode=os.stat(path).st_ino
+    )
+
+
+def test_follow_units(tmp_path):
+    """
+    GIVEN JSON Lines file with non ASCII characters
+    WHEN follow is called with units utf8
+    THEN the positions are counted in bytes from the start of the record.
+    """
+    path = tmp_path / "log.jsonl"
+    path.write_bytes('["é", 1]\n'.encode("utf-8"))
+
+    (record,) = _records(path, units="utf8")
+
+    assert record.source_map["/1"].value_start == types.Location(0, 7, 7)
+
+
+def test_follow_appended(tmp_path):
+    """
+    GIVEN JSON Lines file that ends with a partial line
+    WHEN follow is called, the line is completed and follow is resumed
+    THEN only the records of the new complete lines are returned.
+    """
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"b":')
+
+    (first,) = _records(path)
+    with open(path, "ab") as file:
+        file.write(b' 2}\n{"c": 3}\n')
+    resumed = _records(path, position=first.position)
+
+    assert [record.index for record in resumed] == [1, 2]
+    assert [record.line for record in resumed] == [1, 2]
+    assert [list(record.source_map) for record in resumed] == [["", "/b"], ["", "/c"]]
+
+
+@pytest.mark.parametrize(
+    "rotate",
+    [
+        pytest.param(
+            lambda path: (
+                os.replace(path, f"{path}.1"),
+                path.write_bytes(b'{"new": 1}\n'),
+            ),
+            id="replaced",
+        ),
+        pytest.param(lambda path: path.write_bytes(b'{"new": 1}\n'), id="truncated"),
+    ],
+)
+def test_follow_rotated(tmp_path, rotate):
+    """
+    GIVEN JSON Lines file that has been read and is then replaced or truncated
+    WHEN follow is resumed
+    THEN the records are read from the start of the new file.
+    """
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"old": 1}\n{"old": 2}\n')
+    records = _records(path)
+
+    rotate(path)
+    resumed = _records(path, position=records[-1].position)
+
+    assert [(record.index, record.line, record.offset) for record in resumed] == [
+        (0, 0, 0)
+    ]
+    assert "/new" in resumed[0].source_map
+
+
+def test_follow_invalid(tmp_path):
+    """
+    GIVEN JSON Lines file with records that are not valid JSON or UTF-8
+    WHEN follow is called
+    THEN the records are returned with the error and reading continues after them.
+    """
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"b"\n"\xff"\n[2]\n')
+
+    records = _records(path)
+
+    assert [(record.index, record.line) for record in records] == [
+        (0, 0),
+        (1, 1),
+        (2, 2),
+        (3, 3),
+    ]
+    assert [record.error for record in records] == [
+        None,
+        "JSON is not valid, record on line 1",
+        "JSON is not valid, record on line 2",
+        None,
+    ]
+    assert records[1].source_map == {}
+    assert list(records[3].source_map) == ["", "/0"]
+    assert _records(path, position=records[1].position)[0].index == 2
+
+
+def test_follow_deleted(tmp_path):
+    """
+    GIVEN JSON Lines file that is deleted after it has been read
+    WHEN follow continues without waiting
+    THEN it stops at the end of the deleted file.
+    """
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"a": 1}\n')
+    records = follow(str(path), wait=False)
+    next(records)
+
+    path.unlink()
+
+    assert not list(records)
+
+
+def test_follow_wait(tmp_path, monkeypatch):
+    """
+    GIVEN JSON Lines file that is appended to and then rotated while follow waits
+    WHEN follow is called
+    THEN the appended record and the records of the new file are returned.
+    """
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"a": 1}\n')
+    changes = [
+        lambda: path.write_bytes(b'{"a": 1}\n{"b": 2}\n'),
+        lambda: (os.replace(path, f"{path}.1"), path.write_bytes(b'{"c": 3}\n')),
+    ]
+    sleeps = []
+
+    def sleep(seconds):
+        """Change the file instead of sleeping."""
+        sleeps.append(seconds)
+        changes.pop(0)()
+
+    monkeypatch.setattr(time, "sleep", sleep)
+    records = follow(str(path), poll_interval=0.5)
+
+    assert [list(next(records).source_map)[1] for _ in range(3)] == ["/a", "/b", "/c"]
+    assert sleeps == [0.5, 0.5]
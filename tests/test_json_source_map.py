@@ -2,7 +2,15 @@
 
 import pytest
 
-from json_source_map import calculate, constants, errors, types
+from json_source_map import (
+    calculate,
+    calculate_tree,
+    constants,
+    encoding,
+    errors,
+    handle,
+    types,
+)
 
 CALCULATE_TESTS = [
     pytest.param(
@@ -59,6 +67,52 @@ def test_calculate(source, expected_source_map):
     assert returned_source_map == expected_source_map
 
 
+CALCULATE_UNITS_TESTS = [
+    pytest.param(
+        "codepoint",
+        types.Location(1, 5, 7),
+        types.Location(1, 10, 12),
+        types.Location(1, 12, 14),
+        id="codepoint",
+    ),
+    pytest.param(
+        "utf16",
+        types.Location(1, 6, 8),
+        types.Location(1, 11, 13),
+        types.Location(1, 13, 15),
+        id="utf16",
+    ),
+    pytest.param(
+        "utf8",
+        types.Location(1, 9, 11),
+        types.Location(1, 15, 17),
+        types.Location(1, 17, 19),
+        id="utf8",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "units, expected_key_end, expected_value_end, expected_end",
+    CALCULATE_UNITS_TESTS,
+)
+def test_calculate_units(units, expected_key_end, expected_value_end, expected_end):
+    """
+    GIVEN source with non-ascii characters, units and expected locations
+    WHEN calculate is called with the source and units
+    THEN the columns and positions are counted in the units.
+    """
+    source = '[\n{"é😀": "é"}]'
+
+    returned_source_map = calculate(source, units=units)
+
+    assert list(returned_source_map) == ["", "/0", "/0/é😀"]
+    assert returned_source_map["/0/é😀"].key_start == types.Location(1, 1, 3)
+    assert returned_source_map["/0/é😀"].key_end == expected_key_end
+    assert returned_source_map["/0/é😀"].value_end == expected_value_end
+    assert returned_source_map[""].value_end == expected_end
+
+
 CALCULATE_ERROR_TESTS = [
     pytest.param(True, id="not string"),
     pytest.param("", id="empty string"),
@@ -75,3 +129,426 @@ def test_calculate_source_not_string(source):
     """
     with pytest.raises(errors.InvalidInputError):
         calculate(source)
+
+
+def test_calculate_units_invalid():
+    """
+    GIVEN invalid units
+    WHEN calculate is called with the units
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate("0", units="invalid")
+
+
+def test_calculate_hashes():
+    """
+    GIVEN two versions of a document where one value changed
+    WHEN calculate is called with the sources and hashes
+    THEN only the content hashes of the changed value and its parents change.
+    """
+    old_source = '{"a": [1, "é"], "b": {"c": null}}'
+    new_source = '{"a": [1, "é"],\n "b": {"c": true}}'
+
+    old_source_map = calculate(old_source, hashes=True)
+    new_source_map = calculate(new_source, hashes=True, units="utf8")
+
+    assert old_source_map["/a/0"].content_hash == handle.content_hash("1")
+    assert {
+        pointer
+        for pointer, entry in old_source_map.items()
+        if entry.content_hash != new_source_map[pointer].content_hash
+    } == {"", "/b", "/b/c"}
+    assert all(entry.content_hash is None for entry in calculate(old_source).values())
+
+
+@pytest.mark.parametrize(
+    "source, other_source",
+    [
+        pytest.param("[1, 2]", "[12]", id="array items"),
+        pytest.param('{"a": 1}', "[1]", id="object and array"),
+        pytest.param('{"a": 1}', '{"b": 1}', id="object keys"),
+        pytest.param('"1"', "1", id="string and number"),
+    ],
+)
+def test_calculate_hashes_different(source, other_source):
+    """
+    GIVEN two different sources
+    WHEN calculate is called with the sources and hashes
+    THEN the content hashes of the root values are different.
+    """
+    returned_source_map = calculate(source, hashes=True)
+    other_source_map = calculate(other_source, hashes=True)
+
+    assert returned_source_map[""].content_hash != other_source_map[""].content_hash
+
+
+def test_calculate_key_style_tuple():
+    """
+    GIVEN source with escaped keys
+    WHEN calculate is called with the source and the tuple key style
+    THEN the source map is keyed by the decoded keys and array indexes.
+    """
+    source = '{"a/b": [0, {"\\u00e9\\"": null}], "": true}'
+
+    returned_source_map = calculate(source, key_style="tuple")
+
+    pointer_source_map = calculate(source)
+    assert list(returned_source_map) == [
+        (),
+        ("a/b",),
+        ("a/b", 0),
+        ("a/b", 1),
+        ("a/b", 1, 'é"'),
+        ("",),
+    ]
+    assert list(returned_source_map.values()) == list(pointer_source_map.values())
+
+
+def test_calculate_key_style_invalid():
+    """
+    GIVEN invalid key style
+    WHEN calculate is called with the key style
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate("0", key_style="invalid")
+
+
+def test_calculate_keys_escaped():
+    """
+    GIVEN source with keys that contain escapes and characters that must be
+        escaped in JSON pointers
+    WHEN calculate is called with the source
+    THEN the keys are decoded and escaped as defined by RFC 6901.
+    """
+    source = '{"a/b": {"m~n": 0}, "\\u0041\\"": 1, "~1": 2}'
+
+    returned_source_map = calculate(source)
+
+    assert list(returned_source_map) == ["", "/a~1b", "/a~1b/m~0n", '/A"', "/~01"]
+
+
+def test_calculate_keys_interned():
+    """
+    GIVEN source with an array of records with the same keys
+    WHEN calculate is called with the source and the tuple key style
+    THEN the keys are shared between the records.
+    """
+    source = '[{"key": 0}, {"key": 1}]'
+
+    returned_source_map = calculate(source, key_style="tuple")
+
+    first, second = (path[1] for path in returned_source_map if len(path) == 2)
+    assert first == "key"
+    assert first is second
+
+
+EMBEDDED_SOURCE = 'Intro\n\n```json\n{"a": [1, "é"],\n "b": 2}\n```\nafter 123abc\n'
+EMBEDDED_START = EMBEDDED_SOURCE.index("{")
+EMBEDDED_END = EMBEDDED_SOURCE.index("\n```", EMBEDDED_START)
+
+
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+@pytest.mark.parametrize("pass_base", [False, True])
+def test_calculate_embedded(pass_base, units):
+    """
+    GIVEN text with a JSON document between a start and end
+    WHEN calculate is called with the text, end and the start or its location
+    THEN the source map of the document is returned with locations within the text.
+    """
+    start = len(encoding.view(EMBEDDED_SOURCE[:EMBEDDED_START], units=units))
+    end = start + len(
+        encoding.view(EMBEDDED_SOURCE[EMBEDDED_START:EMBEDDED_END], units=units)
+    )
+    kwargs = {"base": types.Location(3, 0, start)} if pass_base else {"start": start}
+
+    returned_source_map = calculate(EMBEDDED_SOURCE, end=end, units=units, **kwargs)
+
+    expected_source_map = calculate(
+        EMBEDDED_SOURCE[EMBEDDED_START:EMBEDDED_END], units=units
+    )
+    assert list(returned_source_map) == list(expected_source_map)
+    for pointer, entry in expected_source_map.items():
+        for name in ("value_start", "value_end", "key_start", "key_end"):
+            location = getattr(entry, name)
+            if location is None:
+                continue
+            assert getattr(returned_source_map[pointer], name) == types.Location(
+                location.line + 3,
+                location.column,
+                location.position + start,
+            )
+
+
+def test_calculate_embedded_primitive():
+    """
+    GIVEN text with a number directly followed by other text
+    WHEN calculate is called with the start and end of the number
+    THEN the entry of the number ends at the end.
+    """
+    start = EMBEDDED_SOURCE.index("123")
+
+    returned_source_map = calculate(
+        EMBEDDED_SOURCE, start=start, end=start + 3, hashes=True
+    )
+
+    assert returned_source_map == {
+        "": types.Entry(
+            value_start=types.Location(6, 6, start),
+            value_end=types.Location(6, 9, start + 3),
+            content_hash=calculate("123", hashes=True)[""].content_hash,
+        )
+    }
+
+
+def test_calculate_tree_embedded():
+    """
+    GIVEN text with a JSON document between a start and end
+    WHEN calculate_tree is called with the text, start and end
+    THEN the tree has the same contents as the source map of calculate.
+    """
+    returned_tree = calculate_tree(
+        EMBEDDED_SOURCE, start=EMBEDDED_START, end=EMBEDDED_END
+    )
+
+    assert dict(returned_tree) == calculate(
+        EMBEDDED_SOURCE, start=EMBEDDED_START, end=EMBEDDED_END
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"start": 0, "end": EMBEDDED_END}, id="text before"),
+        pytest.param({"start": EMBEDDED_START}, id="text after"),
+        pytest.param({"start": EMBEDDED_START, "end": EMBEDDED_END - 1}, id="cut"),
+        pytest.param({"start": EMBEDDED_END, "end": EMBEDDED_START}, id="reversed"),
+        pytest.param({"start": -1, "end": EMBEDDED_END}, id="negative"),
+        pytest.param({"end": len(EMBEDDED_SOURCE) + 1}, id="beyond"),
+        pytest.param(
+            {"start": EMBEDDED_START, "base": types.Location(3, 0, 0)},
+            id="base different",
+        ),
+    ],
+)
+def test_calculate_embedded_invalid(kwargs):
+    """
+    GIVEN text and bounds that do not contain only a JSON document
+    WHEN calculate is called with the bounds
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate(EMBEDDED_SOURCE, **kwargs)
+
+
+BUDGET_SOURCE = '{"a": [1, 2, [3, 4]], "b": {"c": "]}"},\n "d": 5}'
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected_pointers, expected_truncated",
+    [
+        pytest.param(
+            {"max_entries": 4},
+            ["", "/a", "/a/0", "/a/1"],
+            ["", "/a"],
+            id="max_entries",
+        ),
+        pytest.param(
+            {
+                "max_memory": 3 * (types.Budget.ENTRY_BYTES + types.Budget.HASH_BYTES)
+                + types.Budget.KEY_BYTES
+            },
+            ["", "/a", "/a/0"],
+            ["", "/a"],
+            id="max_memory",
+        ),
+        pytest.param(
+            {"max_depth": 2},
+            ["", "/a", "/a/0", "/a/1", "/a/2", "/b", "/b/c", "/d"],
+            ["", "/a", "/a/2"],
+            id="max_depth",
+        ),
+        pytest.param({"max_depth": 0}, [""], [""], id="max_depth root"),
+        pytest.param({"max_seconds": 0}, [""], [""], id="max_seconds"),
+        pytest.param(
+            {"max_entries": 100, "max_depth": 100, "max_seconds": 100},
+            ["", "/a", "/a/0", "/a/1", "/a/2", "/a/2/0", "/a/2/1", "/b", "/b/c", "/d"],
+            [],
+            id="not exceeded",
+        ),
+    ],
+)
+def test_calculate_budget_truncate(kwargs, expected_pointers, expected_truncated):
+    """
+    GIVEN source and budget
+    WHEN calculate is called with the source, budget and truncate
+    THEN the values after the budget runs out are skipped and the arrays and objects
+        they are within are marked as truncated with their full span.
+    """
+    returned_source_map = calculate(BUDGET_SOURCE, truncate=True, hashes=True, **kwargs)
+
+    expected_source_map = calculate(BUDGET_SOURCE, hashes=True)
+    assert list(returned_source_map) == expected_pointers
+    assert [
+        pointer for pointer, entry in returned_source_map.items() if entry.truncated
+    ] == expected_truncated
+    for pointer, entry in returned_source_map.items():
+        expected_entry = expected_source_map[pointer]
+        assert entry.value_start == expected_entry.value_start
+        assert entry.value_end == expected_entry.value_end
+        assert entry.key_start == expected_entry.key_start
+        assert entry.content_hash == (
+            None if entry.truncated else expected_entry.content_hash
+        )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"max_entries": 4}, id="max_entries"),
+        pytest.param({"max_memory": 0}, id="max_memory"),
+        pytest.param({"max_depth": 2}, id="max_depth"),
+        pytest.param({"max_seconds": 0}, id="max_seconds"),
+    ],
+)
+def test_calculate_budget_raise(kwargs):
+    """
+    GIVEN source and budget that runs out
+    WHEN calculate is called with the source and budget
+    THEN BudgetExceededError is raised.
+    """
+    with pytest.raises(errors.BudgetExceededError):
+        calculate(BUDGET_SOURCE, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "source, kwargs",
+    [
+        pytest.param("[" * 200 + "]" * 200, {"max_memory": 1000}, id="max_memory"),
+        pytest.param("[" + "0, " * 2000 + "0]", {"max_seconds": 0}, id="max_seconds"),
+    ],
+)
+def test_calculate_budget_checking(source, kwargs):
+    """
+    GIVEN source and budget that runs out while checking the source
+    WHEN calculate is called with the source, budget and truncate
+    THEN BudgetExceededError is raised.
+    """
+    with pytest.raises(errors.BudgetExceededError, match="while checking"):
+        calculate(source, truncate=True, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "source, kwargs",
+    [
+        pytest.param("[1,]", {}, id="not valid"),
+        pytest.param("", {}, id="empty"),
+        pytest.param("[1] [2]", {"end": 5}, id="not valid end"),
+    ],
+)
+def test_calculate_budget_invalid(source, kwargs):
+    """
+    GIVEN source that is not valid JSON
+    WHEN calculate is called with the source and max_seconds
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate(source, max_seconds=100, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({}, id="max_depth"),
+        pytest.param({"max_memory": 10**8}, id="max_depth and max_memory"),
+    ],
+)
+def test_calculate_budget_nested(kwargs):
+    """
+    GIVEN source nested deeper than the recursion limit
+    WHEN calculate is called with the source, max_depth, truncate and other limits
+    THEN the values within the arrays nested deeper than max_depth are skipped.
+    """
+    source = "[" * 5000 + "]" * 5000
+
+    returned_source_map = calculate(source, max_depth=2, truncate=True, **kwargs)
+
+    assert list(returned_source_map) == ["", "/0", "/0/0"]
+    assert returned_source_map["/0/0"].truncated
+    assert returned_source_map["/0/0"].value_end.position == len(source) - 2
+
+
+def test_calculate_budget_nested_raise():
+    """
+    GIVEN source nested far deeper than the recursion limit
+    WHEN calculate is called with the source and max_depth
+    THEN BudgetExceededError is raised.
+    """
+    source = "[" * 100000 + "]" * 100000
+
+    with pytest.raises(errors.BudgetExceededError, match="max_depth"):
+        calculate(source, max_depth=10)
+
+
+def test_calculate_budget_embedded():
+    """
+    GIVEN text with an embedded JSON document and budget
+    WHEN calculate is called with the text, start, end and budget
+    THEN the source map is the same as without the budget.
+    """
+    kwargs = {"start": EMBEDDED_START, "end": EMBEDDED_END}
+
+    returned_source_map = calculate(EMBEDDED_SOURCE, max_seconds=100, **kwargs)
+
+    assert returned_source_map == calculate(EMBEDDED_SOURCE, **kwargs)
+
+
+def test_calculate_kinds():
+    """
+    GIVEN source with values of every kind
+    WHEN calculate is called with the source and kinds
+    THEN the kind of each value and the number of values within each array and
+        object are recorded.
+    """
+    source = '{"a": [1, "x", true, false, null, {}], "b": -1.5e3, "c": []}'
+
+    returned_source_map = calculate(source, kinds=True)
+
+    assert {
+        pointer: (entry.kind, entry.child_count)
+        for pointer, entry in returned_source_map.items()
+    } == {
+        "": ("object", 3),
+        "/a": ("array", 6),
+        "/a/0": ("number", None),
+        "/a/1": ("string", None),
+        "/a/2": ("boolean", None),
+        "/a/3": ("boolean", None),
+        "/a/4": ("null", None),
+        "/a/5": ("object", 0),
+        "/b": ("number", None),
+        "/c": ("array", 0),
+    }
+    assert all(entry.kind is None for entry in calculate(source).values())
+
+
+def test_calculate_kinds_truncated():
+    """
+    GIVEN source and budget that runs out
+    WHEN calculate is called with the source, kinds and truncate
+    THEN the kinds are recorded but not the number of values within truncated
+        arrays and objects.
+    """
+    returned_source_map = calculate(
+        "[[1, 2], [3]]", kinds=True, max_depth=1, truncate=True
+    )
+
+    assert {
+        pointer: (entry.kind, entry.child_count, entry.truncated)
+        for pointer, entry in returned_source_map.items()
+    } == {
+        "": ("array", None, True),
+        "/0": ("array", None, True),
+        "/1": ("array", None, True),
+    }
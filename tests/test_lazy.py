@@ -0,0 +1,83 @@
+"""Tests for the source map that creates entries when they are accessed."""
+
+import pytest
+
+from json_source_map import calculate, calculate_lazy, errors, lazy, types
+
+CALCULATE_TESTS = [
+    pytest.param("0", id="primitive"),
+    pytest.param("[]", id="empty array"),
+    pytest.param('[1, {"a": [true, null]}, "b"]', id="array"),
+    pytest.param('{\n  "a": {"b": [1, 2]},\n  "é😀": "é"\n}', id="object"),
+    pytest.param('{"a": [1, {"b": 2}], "a": 3, "c": 4}', id="duplicate key"),
+]
+
+
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+@pytest.mark.parametrize("source", CALCULATE_TESTS)
+def test_calculate(source, units):
+    """
+    GIVEN source and units
+    WHEN calculate_lazy is called with the source and units
+    THEN a source map equal to the result of calculate is returned.
+    """
+    returned_source_map = calculate_lazy(source, units=units)
+
+    expected_source_map = calculate(source, units=units)
+    assert returned_source_map == expected_source_map
+    assert list(returned_source_map) == list(expected_source_map)
+    assert len(returned_source_map) == len(expected_source_map)
+    for pointer, entry in expected_source_map.items():
+        assert pointer in returned_source_map
+        assert returned_source_map[pointer] == entry
+        assert entry == returned_source_map[pointer]
+        assert returned_source_map[pointer].to_dict() == entry.to_dict()
+
+
+def test_entry_cached():
+    """
+    GIVEN lazy source map
+    WHEN an entry and its locations are accessed twice
+    THEN the same objects are returned.
+    """
+    source_map = calculate_lazy('{"a": 1}')
+
+    entry = source_map["/a"]
+
+    assert source_map["/a"] is entry
+    assert entry.value_start is entry.value_start
+    assert entry.key_start is entry.key_start
+    assert isinstance(entry, types.Entry)
+    assert "missing" not in source_map
+    assert source_map[""].key_start is None
+
+
+def test_entry_not_equal():
+    """
+    GIVEN lazy entry
+    WHEN it is compared with a different entry and a different type
+    THEN they are not equal.
+    """
+    entry = calculate_lazy("[1, 2]")["/0"]
+
+    assert entry != calculate("[1, 2]")["/1"]
+    assert entry != "/0"
+    assert isinstance(entry, lazy.LazyEntry)
+
+
+@pytest.mark.parametrize(
+    "source, units",
+    [
+        pytest.param("", "codepoint", id="empty"),
+        pytest.param("[1,]", "codepoint", id="invalid"),
+        pytest.param("0", "invalid", id="invalid units"),
+    ],
+)
+def test_calculate_error(source, units):
+    """
+    GIVEN invalid source or units
+    WHEN calculate_lazy is called with the source and units
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate_lazy(source, units=units)
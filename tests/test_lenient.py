@@ -0,0 +1,193 @@
+"""Tests for calculating the source map of documents that might not be valid."""
+
+import pytest
+
+from json_source_map import calculate, calculate_lenient, errors
+
+CALCULATE_TESTS = [
+    pytest.param("", {}, [(0, 0, "expected a value")], id="empty"),
+    pytest.param(
+        "1 2",
+        {"": (0, 1)},
+        [(2, 3, "unexpected characters after the JSON document")],
+        id="after end",
+    ),
+    pytest.param(
+        "[1, tru, 3]",
+        {"": (0, 11), "/0": (1, 2), "/2": (9, 10)},
+        [(4, 7, "the value is not valid")],
+        id="value not valid",
+    ),
+    pytest.param(
+        '{"a": 1, "b": ',
+        {"": (0, 14), "/a": (6, 7)},
+        [(0, 14, "expected } to close the object")],
+        id="object not closed",
+    ),
+    pytest.param(
+        '{"a": {"b": [1',
+        {"": (0, 14), "/a": (6, 14), "/a/b": (12, 14), "/a/b/0": (13, 14)},
+        [
+            (0, 14, "expected } to close the object"),
+            (6, 14, "expected } to close the object"),
+            (12, 14, "expected ] to close the array"),
+        ],
+        id="nested not closed",
+    ),
+    pytest.param(
+        '[1, {"a": 2]',
+        {"": (0, 12), "/0": (1, 2), "/1": (4, 11), "/1/a": (10, 11)},
+        [(4, 11, "expected } to close the object")],
+        id="closed by container",
+    ),
+    pytest.param(
+        '{"a" 1 "b": [1,]}',
+        {"": (0, 17), "/a": (5, 6), "/b": (12, 16), "/b/0": (13, 14)},
+        [
+            (5, 5, "expected :"),
+            (7, 7, "expected ,"),
+            (15, 15, "unexpected trailing ,"),
+        ],
+        id="missing separators",
+    ),
+    pytest.param(
+        '{"a": , "b": 1}',
+        {"": (0, 15), "/b": (13, 14)},
+        [(6, 6, "expected a value")],
+        id="missing value",
+    ),
+    pytest.param(
+        '{"a": }',
+        {"": (0, 7)},
+        [(6, 6, "expected a value")],
+        id="missing last value",
+    ),
+    pytest.param(
+        "[1,, 2]]",
+        {"": (0, 7), "/0": (1, 2), "/1": (5, 6)},
+        [
+            (3, 4, "unexpected ,"),
+            (7, 8, "unexpected characters after the JSON document"),
+        ],
+        id="unexpected",
+    ),
+    pytest.param(
+        '{1: [2], "x": 3}',
+        {"": (0, 16), "/x": (14, 15)},
+        [(1, 2, "expected a key")],
+        id="key not valid",
+    ),
+    pytest.param(
+        "{[1]: 2}",
+        {"": (0, 8)},
+        [
+            (1, 1, "expected a key"),
+            (4, 5, "unexpected :"),
+            (6, 6, "expected ,"),
+            (6, 7, "expected a key"),
+            (7, 7, "expected a value"),
+        ],
+        id="container as key",
+    ),
+    pytest.param(
+        '{"a": "b\n, "c": 1}',
+        {"": (0, 18), "/c": (16, 17)},
+        [(6, 8, "the value is not valid")],
+        id="string not closed",
+    ),
+    pytest.param(
+        '{"a": "' + "x y," * 8,
+        {"": (0, 39)},
+        [(0, 39, "expected } to close the object"), (6, 39, "the value is not valid")],
+        id="long string not closed",
+    ),
+    pytest.param(
+        '{"a\\x": {"b": 1}, "c": 2}',
+        {"": (0, 25), "/c": (23, 24)},
+        [(1, 6, "the key is not valid")],
+        id="escape not valid",
+    ),
+    pytest.param(
+        "]",
+        {},
+        [(0, 1, "unexpected ]"), (1, 1, "expected a value")],
+        id="close only",
+    ),
+]
+
+
+@pytest.mark.parametrize("source, expected_values, expected_errors", CALCULATE_TESTS)
+def test_calculate(source, expected_values, expected_errors):
+    """
+    GIVEN source that is not valid JSON
+    WHEN calculate_lenient is called with the source
+    THEN the values that could be located and the errors are returned.
+    """
+    returned_result = calculate_lenient(source)
+
+    assert {
+        pointer: (entry.value_start.position, entry.value_end.position)
+        for pointer, entry in returned_result.source_map.items()
+    } == expected_values
+    assert [
+        (error.start.position, error.end.position, error.message)
+        for error in returned_result.errors
+    ] == expected_errors
+
+
+def test_calculate_locations():
+    """
+    GIVEN source that is not valid JSON over multiple lines
+    WHEN calculate_lenient is called with the source
+    THEN the lines and columns of the entries and errors are returned.
+    """
+    returned_result = calculate_lenient('{\n  "a": [1,\n  "b": 2\n')
+
+    entry = returned_result.source_map["/a"]
+    assert (entry.key_start.line, entry.key_start.column) == (1, 2)
+    assert (entry.value_end.line, entry.value_end.column) == (3, 0)
+    assert list(returned_result.source_map) == ["", "/a", "/a/0", "/a/1", "/a/2"]
+    assert [
+        (error.start.line, error.start.column, error.message)
+        for error in returned_result.errors
+    ] == [
+        (0, 0, "expected } to close the object"),
+        (1, 7, "expected ] to close the array"),
+        (2, 5, "unexpected :"),
+        (2, 7, "expected ,"),
+    ]
+
+
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param("0", id="primitive"),
+        pytest.param(' [1, {"a": [true, null]}, "b"] ', id="array"),
+        pytest.param(
+            '{\n  "é😀": [1, {"b\\u00e9": -1.5e3}, []],\n  "c": {}\n}', id="object"
+        ),
+    ],
+)
+def test_calculate_valid(source, units):
+    """
+    GIVEN valid source and units
+    WHEN calculate_lenient is called with the source and units
+    THEN the source map is the same as the result of calculate without errors.
+    """
+    returned_result = calculate_lenient(source, units=units)
+
+    expected_source_map = calculate(source, units=units)
+    assert returned_result.source_map == expected_source_map
+    assert list(returned_result.source_map) == list(expected_source_map)
+    assert not returned_result.errors
+
+
+def test_calculate_error():
+    """
+    GIVEN source that is not a string
+    WHEN calculate_lenient is called with the source
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate_lenient(b"{}")
@@ -0,0 +1,71 @@
+"""Tests for converting positions to line and column."""
+
+import pytest
+
+from json_source_map import line_index, types
+
+SOURCE = "ab\nc\n\nd"
+
+
+@pytest.mark.parametrize(
+    "position, expected_location",
+    [
+        pytest.param(0, types.Location(0, 0, 0), id="start"),
+        pytest.param(2, types.Location(0, 2, 2), id="first new line"),
+        pytest.param(3, types.Location(1, 0, 3), id="after first new line"),
+        pytest.param(5, types.Location(2, 0, 5), id="empty line"),
+        pytest.param(6, types.Location(3, 0, 6), id="last line"),
+        pytest.param(7, types.Location(3, 1, 7), id="end"),
+    ],
+)
+def test_to_location(position, expected_location):
+    """
+    GIVEN source, position and expected location
+    WHEN to_location is called on the line index of the source with the position
+    THEN the expected location is returned.
+    """
+    index = line_index.LineIndex.from_source(SOURCE)
+
+    returned_location = index.to_location(position)
+
+    assert returned_location == expected_location
+    assert list(index.newlines) == [2, 4, 5]
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_to_locations(use_numpy, monkeypatch):
+    """
+    GIVEN source and positions in any order
+    WHEN to_locations is called on the line index of the source with the positions
+        with and without NumPy
+    THEN the location of each position is returned in the same order.
+    """
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(line_index, "import_numpy", lambda: None)
+    index = line_index.LineIndex.from_source(SOURCE)
+    positions = [7, 0, 3, 5, 2, 6, 3]
+
+    returned_locations = index.to_locations(iter(positions))
+
+    assert returned_locations == [index.to_location(position) for position in positions]
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_to_locations_no_new_lines(use_numpy, monkeypatch):
+    """
+    GIVEN source without new lines
+    WHEN to_locations is called on the line index of the source
+    THEN the locations are on the first line.
+    """
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(line_index, "import_numpy", lambda: None)
+    index = line_index.LineIndex.from_source("abc")
+
+    returned_locations = index.to_locations([2, 0])
+
+    assert returned_locations == [types.Location(0, 2, 2), types.Location(0, 0, 0)]
+    assert index.to_locations([]) == []
@@ -0,0 +1,227 @@
+"""Tests for calculating source maps across multiple processes or threads."""
+
+import concurrent.futures
+import json
+
+import pytest
+
+from json_source_map import (
+    calculate,
+    calculate_many,
+    calculate_parallel,
+    errors,
+    parallel,
+)
+
+CALCULATE_TESTS = [
+    pytest.param("0", id="primitive"),
+    pytest.param(' "value" ', id="primitive whitespace"),
+    pytest.param("[]", id="empty array"),
+    pytest.param("{}", id="empty object"),
+    pytest.param("[ ]", id="empty array whitespace"),
+    pytest.param("{ }", id="empty object whitespace"),
+    pytest.param("[0]", id="array single"),
+    pytest.param('{"key": 0}', id="object single"),
+    pytest.param(' [ 1 , "a\\"]" ,\n {"x":\n[1,2]} ] ', id="array multiple"),
+    pytest.param(
+        '{"a": 1, "b" :\n {"c": [true, null]}, "d\\"": "}"}\n', id="object multiple"
+    ),
+    pytest.param('{"a/b": {"m~n": [0]}, "\\u0041": 1}', id="pointer escaped keys"),
+    pytest.param(
+        json.dumps(
+            [{"key": [index, {"nested": "é"}]} for index in range(20)], indent=2
+        ),
+        id="array many",
+    ),
+]
+
+
+@pytest.mark.parametrize("source", CALCULATE_TESTS)
+def test_calculate(source):
+    """
+    GIVEN source
+    WHEN calculate_parallel is called with the source and a thread pool
+    THEN the same source map as calculate is returned.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        returned_source_map = calculate_parallel(source, executor=executor)
+
+    assert returned_source_map == calculate(source)
+    assert list(returned_source_map) == list(calculate(source))
+
+
+def test_calculate_processes():
+    """
+    GIVEN source
+    WHEN calculate_parallel is called with the source and a number of processes
+    THEN the same source map as calculate is returned.
+    """
+    source = json.dumps({f"key {index}": [index, None] for index in range(10)})
+
+    returned_source_map = calculate_parallel(source, processes=2, threads=False)
+
+    assert returned_source_map == calculate(source)
+
+
+def test_calculate_threads():
+    """
+    GIVEN source
+    WHEN calculate_parallel is called with the source using threads
+    THEN the same source map as calculate is returned.
+    """
+    source = json.dumps({f"key {index}": [index, None] for index in range(10)})
+
+    returned_source_map = calculate_parallel(source, processes=2, threads=True)
+
+    assert returned_source_map == calculate(source)
+
+
+@pytest.mark.parametrize("threads", [True, False])
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+def test_calculate_many(units, threads):
+    """
+    GIVEN sources, units and whether to use threads
+    WHEN calculate_many is called with the sources, units and threads
+    THEN the same source map as calculate is returned for each source.
+    """
+    sources = [source.values[0] for source in CALCULATE_TESTS]
+
+    returned_source_maps = calculate_many(
+        iter(sources), units=units, processes=2, threads=threads
+    )
+
+    expected_source_maps = [calculate(source, units=units) for source in sources]
+    assert returned_source_maps == expected_source_maps
+
+
+def test_calculate_many_executor():
+    """
+    GIVEN sources and executor
+    WHEN calculate_many is called with the sources and executor
+    THEN the same source map as calculate is returned for each source.
+    """
+    sources = [source.values[0] for source in CALCULATE_TESTS]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        returned_source_maps = calculate_many(sources, executor=executor)
+
+    assert returned_source_maps == [calculate(source) for source in sources]
+
+
+@pytest.mark.parametrize(
+    "sources, units",
+    [
+        pytest.param(["[]", "[1"], "codepoint", id="invalid source"),
+        pytest.param(["[]"], "utf32", id="invalid units"),
+    ],
+)
+def test_calculate_many_error(sources, units):
+    """
+    GIVEN sources and units where one is not valid
+    WHEN calculate_many is called with the sources and units
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate_many(sources, units=units, threads=True)
+
+
+@pytest.mark.parametrize(
+    "is_gil_enabled, expected_result",
+    [
+        pytest.param(None, False, id="before 3.13"),
+        pytest.param(lambda: True, False, id="gil enabled"),
+        pytest.param(lambda: False, True, id="gil disabled"),
+    ],
+)
+def test_free_threaded(monkeypatch, is_gil_enabled, expected_result):
+    """
+    GIVEN whether the global interpreter lock can be checked and is enabled
+    WHEN free_threaded is called
+    THEN whether the global interpreter lock is disabled is returned.
+    """
+    if is_gil_enabled is None:
+        monkeypatch.delattr(parallel.sys, "_is_gil_enabled", raising=False)
+    else:
+        monkeypatch.setattr(
+            parallel.sys, "_is_gil_enabled", is_gil_enabled, raising=False
+        )
+
+    assert parallel.free_threaded() == expected_result
+
+
+@pytest.mark.parametrize(
+    "free_threaded, expected_type",
+    [
+        pytest.param(True, concurrent.futures.ThreadPoolExecutor, id="free-threaded"),
+        pytest.param(False, concurrent.futures.ProcessPoolExecutor, id="gil"),
+    ],
+)
+def test_pool_default(monkeypatch, free_threaded, expected_type):
+    """
+    GIVEN whether the global interpreter lock is disabled
+    WHEN the pool is created without choosing threads or processes
+    THEN threads are used if the global interpreter lock is disabled.
+    """
+    monkeypatch.setattr(parallel, "free_threaded", lambda: free_threaded)
+
+    with parallel._pool(  # pylint: disable=protected-access
+        workers=1, threads=None
+    ) as pool:
+        assert isinstance(pool, expected_type)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param(True, id="not string"),
+        pytest.param("", id="empty"),
+        pytest.param("invalid", id="invalid primitive"),
+        pytest.param("[", id="array not closed"),
+        pytest.param("[1}", id="array wrong close"),
+        pytest.param("[1,]", id="array trailing separator"),
+        pytest.param("[1 2]", id="array missing separator"),
+        pytest.param("[1:2]", id="array name separator"),
+        pytest.param("{]", id="object wrong close"),
+        pytest.param("{:1}", id="object missing key"),
+        pytest.param('{"a" 1}', id="object missing name separator"),
+        pytest.param('{x"a": 1}', id="object characters before key"),
+        pytest.param('{"a\x01": 1}', id="object key control character"),
+        pytest.param('{"\\q": 1}', id="object key invalid escape"),
+        pytest.param('{"a":}', id="object missing value"),
+        pytest.param('{"a":1,}', id="object trailing separator"),
+        pytest.param('{"a":1:2}', id="object second name separator"),
+        pytest.param('{"a":1]', id="object array close"),
+        pytest.param('{"a":1}x', id="characters after end"),
+    ],
+)
+def test_calculate_error(source):
+    """
+    GIVEN invalid source
+    WHEN calculate_parallel is called with the source
+    THEN InvalidInputError is raised.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(errors.InvalidInputError):
+            calculate_parallel(source, executor=executor)
+
+
+@pytest.mark.parametrize(
+    "source, expected_members",
+    [
+        pytest.param("[]", [], id="empty array"),
+        pytest.param(" [ 1 , [2] ]", [(None, None, 3, 4), (None, None, 7, 10)]),
+        pytest.param('{"a": 1, "b": {}}', [(1, 4, 6, 7), (9, 12, 14, 16)]),
+    ],
+)
+def test_members(source, expected_members):
+    """
+    GIVEN source and expected members
+    WHEN members is called with the source
+    THEN the expected member positions are returned.
+    """
+    start = source.index(source.strip()[0])
+
+    returned_members, returned_end = parallel.members(source=source, start=start)
+
+    assert returned_members == expected_members
+    assert returned_end == len(source)
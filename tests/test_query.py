@@ -0,0 +1,179 @@
+"""Tests for looking up entries in the source map."""
+
+import collections
+
+import pytest
+
+from json_source_map import calculate, calculate_tree, errors, lookup_paths, query
+from json_source_map.query import to_pointer
+
+SOURCE = '{"paths": {"/pets": {"get": [1, "a~b"]}}, "a~b": 0}'
+
+
+@pytest.mark.parametrize(
+    "path, expected_pointer",
+    [
+        pytest.param((), "", id="empty"),
+        pytest.param(("paths",), "/paths", id="single"),
+        pytest.param(("paths", "/pets", "get", 1), "/paths/~1pets/get/1", id="many"),
+        pytest.param(("a~b",), "/a~0b", id="tilde"),
+    ],
+)
+def test_to_pointer(path, expected_pointer):
+    """
+    GIVEN path and expected pointer
+    WHEN to_pointer is called with the path
+    THEN the expected pointer is returned.
+    """
+    returned_pointer = to_pointer(path)
+
+    assert returned_pointer == expected_pointer
+
+
+def test_lookup_paths_tuple():
+    """
+    GIVEN source map keyed by tuples and paths
+    WHEN lookup_paths is called with the source map and paths
+    THEN the entries of the paths are returned.
+    """
+    source_map = calculate(SOURCE, key_style="tuple")
+    pointer_source_map = calculate(SOURCE)
+
+    returned_entries = lookup_paths(
+        source_map,
+        [
+            collections.deque(["paths", "/pets", "get"]),
+            ["paths", "/pets", "get", 1],
+            (),
+            ("missing",),
+        ],
+    )
+
+    assert returned_entries == [
+        pointer_source_map["/paths/~1pets/get"],
+        pointer_source_map["/paths/~1pets/get/1"],
+        pointer_source_map[""],
+        None,
+    ]
+
+
+def test_lookup_paths_pointer():
+    """
+    GIVEN source map keyed by pointers and paths
+    WHEN lookup_paths is called with the source map and paths
+    THEN the entries of the paths are returned.
+    """
+    source_map = calculate(SOURCE)
+
+    returned_entries = lookup_paths(
+        source_map,
+        [collections.deque(["paths", "/pets", "get", 1]), ["a~b"], ["missing"]],
+    )
+
+    assert returned_entries == [
+        source_map["/paths/~1pets/get/1"],
+        source_map["/a~0b"],
+        None,
+    ]
+
+
+def test_lookup_paths_empty():
+    """
+    GIVEN empty source map and paths
+    WHEN lookup_paths is called with the source map and paths
+    THEN None is returned for each path.
+    """
+    returned_entries = lookup_paths({}, [["a"], ["b"]])
+
+    assert returned_entries == [None, None]
+
+
+QUERY_SOURCE = (
+    '{"paths": {"/pets": {"get": {"200": 0, "404": 1}, "post": 2}, '
+    '"/users": {"get": [3]}}, "get": 4, "a*b": 5}'
+)
+
+
+@pytest.mark.parametrize(
+    "pattern, expected_pointers",
+    [
+        pytest.param("", [""], id="root"),
+        pytest.param("/paths/~1pets/get", ["/paths/~1pets/get"], id="literal"),
+        pytest.param("/missing/get", [], id="literal missing"),
+        pytest.param(
+            "/paths/*/get", ["/paths/~1pets/get", "/paths/~1users/get"], id="any"
+        ),
+        pytest.param(
+            "/paths/*/get/*",
+            ["/paths/~1pets/get/200", "/paths/~1pets/get/404", "/paths/~1users/get/0"],
+            id="any many",
+        ),
+        pytest.param("/paths/~1pets/get/4*", ["/paths/~1pets/get/404"], id="glob"),
+        pytest.param("/paths/~1p[e]ts", ["/paths/~1pets"], id="glob range"),
+        pytest.param("/a[*]b", ["/a*b"], id="glob escaped"),
+        pytest.param(
+            "/**/get",
+            ["/paths/~1pets/get", "/paths/~1users/get", "/get"],
+            id="any segments",
+        ),
+        pytest.param(
+            "/paths/**/**/0", ["/paths/~1users/get/0"], id="any segments repeated"
+        ),
+        pytest.param(
+            "/paths/~1users/**",
+            ["/paths/~1users", "/paths/~1users/get", "/paths/~1users/get/0"],
+            id="any segments end",
+        ),
+    ],
+)
+def test_query(pattern, expected_pointers):
+    """
+    GIVEN source map and pattern
+    WHEN query is called with the source map or its tree and the pattern
+    THEN the entries with matching pointers are returned in document order.
+    """
+    source_map = calculate(QUERY_SOURCE)
+
+    returned_source_map = query(source_map, pattern)
+
+    assert list(returned_source_map) == expected_pointers
+    assert returned_source_map == {
+        pointer: source_map[pointer] for pointer in expected_pointers
+    }
+    assert query(calculate_tree(QUERY_SOURCE), pattern) == returned_source_map
+
+
+@pytest.mark.parametrize(
+    "pattern, expected_pointers",
+    [
+        pytest.param("/a/*", ["/a/x", "/a/y"], id="any"),
+        pytest.param(
+            "/**", ["", "/a/x", "/b", "/a", "/a/y", "/a/y/0"], id="any segments"
+        ),
+    ],
+)
+def test_query_duplicate_key(pattern, expected_pointers):
+    """
+    GIVEN source map of source with a duplicate key and pattern
+    WHEN query is called with the source map and the pattern
+    THEN the entries with matching pointers of the source map are returned.
+    """
+    source = '{"a": {"x": 1}, "b": 2, "a": {"y": [3]}}'
+    source_map = calculate(source)
+
+    returned_source_map = query(source_map, pattern)
+
+    assert list(returned_source_map) == expected_pointers
+    assert returned_source_map == {
+        pointer: source_map[pointer] for pointer in expected_pointers
+    }
+
+
+def test_query_invalid():
+    """
+    GIVEN pattern that does not start with /
+    WHEN query is called with the pattern
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        query(calculate(QUERY_SOURCE), "paths")
@@ -0,0 +1,148 @@
+"""Tests for the scanner that can be paused and resumed."""
+
+import json
+
+import pytest
+
+from json_source_map import Checkpoint, Scanner, calculate, errors, scanner, structural
+
+SCAN_TESTS = [
+    pytest.param("0", id="primitive"),
+    pytest.param("[]", id="empty array"),
+    pytest.param('[1, {"a": [true, null]}, "b"]', id="array"),
+    pytest.param('{\n  "a": {"b": [1, 2]},\n  "é😀": "é",\n  "c/d": {}\n}', id="object"),
+]
+
+
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+@pytest.mark.parametrize("max_entries", [None, 1, 2])
+@pytest.mark.parametrize("source", SCAN_TESTS)
+def test_scan_resumed(source, max_entries, units):
+    """
+    GIVEN source, max_entries and units
+    WHEN the source is scanned in steps, each resumed from the serialized checkpoint
+        of the previous step
+    THEN the combined source map is equal to the result of calculate.
+    """
+    entries = []
+    checkpoint = None
+    while checkpoint is None or not checkpoint.done:
+        step = Scanner(source, units=units, checkpoint=checkpoint)
+        entries.extend(step.scan(max_entries=max_entries))
+        checkpoint = Checkpoint.from_dict(
+            json.loads(json.dumps(step.checkpoint().to_dict()))
+        )
+
+    assert scanner.to_source_map(entries) == calculate(source, units=units)
+    assert len(entries) == len(calculate(source, units=units))
+
+
+def test_scan_max_entries():
+    """
+    GIVEN scanner
+    WHEN scan is called with max_entries until it is done
+    THEN at most max_entries are returned by each call and nothing after it is done.
+    """
+    step = Scanner('{"a": [1, 2, 3], "b": 4}')
+
+    counts = []
+    while not step.done:
+        counts.append(len(step.scan(max_entries=2)))
+
+    assert counts == [2, 2, 2]
+    assert not step.scan()
+
+
+def test_checkpoint_not_changed():
+    """
+    GIVEN checkpoint
+    WHEN a scanner is resumed from it and scans
+    THEN the checkpoint is not changed.
+    """
+    source = "[[1, 2], 3]"
+    first = Scanner(source)
+    first.scan(max_entries=1)
+    checkpoint = first.checkpoint()
+    expected_dict = checkpoint.to_dict()
+
+    Scanner(source, checkpoint=checkpoint).scan()
+
+    assert checkpoint.to_dict() == expected_dict
+
+
+@pytest.mark.parametrize(
+    "source, checkpoint",
+    [
+        pytest.param("", None, id="invalid json"),
+        pytest.param("[1, 2]", Checkpoint(length=5), id="different length"),
+    ],
+)
+def test_scanner_error(source, checkpoint):
+    """
+    GIVEN invalid source or a checkpoint for a different source
+    WHEN Scanner is constructed
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        Scanner(source, checkpoint=checkpoint)
+
+
+SCAN_ERROR_TESTS = [
+    pytest.param("[,1]", id="leading separator"),
+    pytest.param("[1,]", id="trailing separator"),
+    pytest.param("[1 2]", id="missing separator"),
+    pytest.param('{"a" 1}', id="missing name separator"),
+    pytest.param("{1: 2}", id="key not valid"),
+    pytest.param("[:]", id="unexpected name separator"),
+    pytest.param('["a\\x"]', id="value not valid"),
+    pytest.param("[}", id="wrong close"),
+    pytest.param("[1", id="not closed"),
+    pytest.param("0 1", id="after end"),
+]
+
+
+@pytest.mark.parametrize("source", SCAN_ERROR_TESTS)
+def test_scan_error(source):
+    """
+    GIVEN source that is not valid and a checkpoint at its start
+    WHEN a scanner is resumed from the checkpoint and scans
+    THEN InvalidInputError is raised.
+    """
+    step = Scanner(source, checkpoint=Checkpoint(length=len(source)))
+
+    with pytest.raises(errors.InvalidInputError):
+        step.scan()
+
+
+@pytest.mark.parametrize("source", SCAN_TESTS)
+def test_scan_depths(source):
+    """
+    GIVEN valid source
+    WHEN scan_depths is called with its tokens
+    THEN the end of each token and the number of arrays and objects it is within
+        are returned.
+    """
+    returned_depths = list(scanner.scan_depths(structural.tokens(source)))
+
+    expected_depths = []
+    depth = 0
+    for start, token in structural.tokens(source):
+        if token == "\n":
+            continue
+        if token in {"[", "{"}:
+            depth += 1
+        elif token in {"]", "}"}:
+            depth -= 1
+        expected_depths.append((start + len(token), depth))
+    assert returned_depths == expected_depths
+
+
+@pytest.mark.parametrize("source", SCAN_ERROR_TESTS)
+def test_scan_depths_error(source):
+    """
+    GIVEN source that is not valid
+    WHEN scan_depths is called with its tokens
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        list(scanner.scan_depths(structural.tokens(source)))
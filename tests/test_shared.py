@@ -0,0 +1,128 @@
+"""Tests for sharing the source map between processes."""
+
+import concurrent.futures
+import gc
+import sys
+
+import pytest
+
+from json_source_map import attach, calculate, errors, publish, query
+
+SOURCE = '{\n  "a": [1, {"b": null}],\n  "é😀": "c",\n  "": {}\n}'
+
+
+def _lookup(name, pointer):
+    """Attach to the shared source map and look up a JSON pointer."""
+    with attach(name) as source_map:
+        return source_map[pointer].to_dict()
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param("0", id="primitive"),
+        pytest.param('[1, {"a": [true, null]}, "b"]', id="array"),
+        pytest.param(SOURCE, id="object"),
+    ],
+)
+def test_publish_attach(source):
+    """
+    GIVEN source map calculated from source
+    WHEN it is published and attached to
+    THEN the attached source map is the same as the source map.
+    """
+    source_map = calculate(source)
+    published = publish(source_map)
+
+    try:
+        with attach(published.name) as attached:
+            assert attached == source_map
+            assert list(attached) == list(source_map)
+            assert len(attached) == len(source_map)
+            for pointer, entry in source_map.items():
+                assert pointer in attached
+                assert attached[pointer] == entry
+            assert "/missing" not in attached
+            assert 1 not in attached
+            with pytest.raises(KeyError):
+                attached["/missing"]  # pylint: disable=pointless-statement
+    finally:
+        published.close()
+        published.unlink()
+
+
+def test_publish_empty():
+    """
+    GIVEN empty source map
+    WHEN it is published
+    THEN the shared source map is empty.
+    """
+    published = publish({})
+
+    try:
+        assert not dict(published)
+    finally:
+        published.close()
+        published.unlink()
+
+
+def test_publish_not_closed(monkeypatch):
+    """
+    GIVEN published source map that is used but not closed
+    WHEN it is garbage collected
+    THEN no error is reported.
+    """
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+    published = publish(calculate(SOURCE))
+    published.unlink()
+    assert published["/a/0"] == calculate(SOURCE)["/a/0"]
+
+    del published
+    gc.collect()
+
+    assert not unraisable
+
+
+def test_query():
+    """
+    GIVEN published source map
+    WHEN query is called with the shared source map
+    THEN the matching entries are returned.
+    """
+    source_map = calculate(SOURCE)
+
+    with publish(source_map) as published:
+        returned_source_map = query(published, "/a/*")
+        published.unlink()
+
+    assert returned_source_map == {
+        "/a/0": source_map["/a/0"],
+        "/a/1": source_map["/a/1"],
+    }
+
+
+def test_attach_process():
+    """
+    GIVEN published source map
+    WHEN another process attaches to it and looks up a JSON pointer
+    THEN the entry of the JSON pointer is returned.
+    """
+    source_map = calculate(SOURCE)
+
+    with publish(source_map) as published:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            returned_entry = executor.submit(_lookup, published.name, "/é😀").result()
+        published.unlink()
+
+    assert returned_entry == source_map["/é😀"].to_dict()
+
+
+def test_attach_missing():
+    """
+    GIVEN name of shared memory that does not exist
+    WHEN attach is called with the name
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        attach("json-source-map-missing")
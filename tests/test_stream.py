@@ -0,0 +1,160 @@
+"""Tests for calculating the source map of a file or stream in chunks."""
+
+import gzip
+import io
+import sys
+import types
+
+import pytest
+
+from json_source_map import calculate, calculate_file, calculate_stream, errors
+
+SOURCE = (
+    '{\n  "é😀": [1, {"b\\u00e9": -1.5e3, "c": "d\\"\\\\"}, []],\r\n'
+    '  "e": {}, "f": [true, false, null]\n}  \n'
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1000])
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+def test_calculate_stream(units, chunk_size):
+    """
+    GIVEN stream of a JSON document, units and chunk size
+    WHEN calculate_stream is called with the stream, units and chunk size
+    THEN the source map is the same as the result of calculate.
+    """
+    file = io.BytesIO(SOURCE.encode("utf-8"))
+
+    returned_source_map = calculate_stream(file, units=units, chunk_size=chunk_size)
+
+    expected_source_map = calculate(SOURCE, units=units)
+    assert returned_source_map == expected_source_map
+    assert list(returned_source_map) == list(expected_source_map)
+    assert not file.closed
+
+
+@pytest.mark.parametrize("chunk_size", [2, 7, 64])
+def test_calculate_stream_long_tokens(chunk_size):
+    """
+    GIVEN stream of a JSON document with strings and numbers longer than a chunk
+    WHEN calculate_stream is called with the stream and chunk size
+    THEN the source map is the same as the result of calculate.
+    """
+    source = '["' + 'a\\"\\\\b' * 100 + '", ' + "1" * 500 + ', "' + "c" * 500 + '"]'
+
+    returned_source_map = calculate_stream(
+        io.BytesIO(source.encode("utf-8")), chunk_size=chunk_size
+    )
+
+    assert returned_source_map == calculate(source)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param("", id="empty"),
+        pytest.param("[1,]", id="trailing separator"),
+        pytest.param('{"a" 1}', id="missing name separator"),
+        pytest.param("[1", id="not closed"),
+        pytest.param('"abc', id="string not closed"),
+        pytest.param('["' + "x y," * 8, id="long string not closed"),
+        pytest.param('["a\\\n"]', id="escaped new line"),
+        pytest.param("[1] 2", id="after end"),
+        pytest.param('{"a": tru}', id="value not valid"),
+        pytest.param("{1: 2}", id="key not valid"),
+        pytest.param("[}", id="wrong close"),
+        pytest.param(b'["\xff"]', id="not UTF-8"),
+    ],
+)
+def test_calculate_stream_error(source):
+    """
+    GIVEN stream of a document that is not valid
+    WHEN calculate_stream is called with the stream
+    THEN InvalidInputError is raised.
+    """
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+
+    with pytest.raises(errors.InvalidInputError):
+        calculate_stream(io.BytesIO(source), chunk_size=2)
+
+
+@pytest.mark.parametrize(
+    "compress, compression",
+    [
+        pytest.param(lambda data: data, None, id="not compressed"),
+        pytest.param(gzip.compress, None, id="gzip detected"),
+        pytest.param(gzip.compress, "gzip", id="gzip"),
+    ],
+)
+def test_calculate_file(tmp_path, compress, compression):
+    """
+    GIVEN file with a JSON document that might be compressed
+    WHEN calculate_file is called with the path and compression
+    THEN the source map of the decompressed document is returned.
+    """
+    path = tmp_path / "document.json"
+    path.write_bytes(compress(SOURCE.encode("utf-8")))
+
+    returned_source_map = calculate_file(str(path), compression=compression)
+
+    assert returned_source_map == calculate(SOURCE)
+
+
+def test_calculate_file_zstd(tmp_path):
+    """
+    GIVEN zstd compressed file with a JSON document
+    WHEN calculate_file is called with the path
+    THEN the source map of the decompressed document is returned.
+    """
+    zstd = pytest.importorskip("compression.zstd")
+    path = tmp_path / "document.json.zst"
+    path.write_bytes(zstd.compress(SOURCE.encode("utf-8")))
+
+    returned_source_map = calculate_file(str(path))
+
+    assert returned_source_map == calculate(SOURCE)
+
+
+def test_calculate_file_zstd_module(tmp_path, monkeypatch):
+    """
+    GIVEN zstd module and file compressed by it
+    WHEN calculate_file is called with the path and zstd compression
+    THEN the file is decompressed with the zstd module.
+    """
+    monkeypatch.setitem(
+        sys.modules, "compression.zstd", types.SimpleNamespace(open=gzip.open)
+    )
+    path = tmp_path / "document.json.zst"
+    path.write_bytes(gzip.compress(SOURCE.encode("utf-8")))
+
+    returned_source_map = calculate_file(str(path), compression="zstd")
+
+    assert returned_source_map == calculate(SOURCE)
+
+
+def test_calculate_file_zstd_not_available(tmp_path, monkeypatch):
+    """
+    GIVEN Python without the zstd module and zstd compressed file
+    WHEN calculate_file is called with the path
+    THEN InvalidInputError is raised.
+    """
+    monkeypatch.setitem(sys.modules, "compression.zstd", None)
+    path = tmp_path / "document.json.zst"
+    path.write_bytes(b"\x28\xb5\x2f\xfd")
+
+    with pytest.raises(errors.InvalidInputError):
+        calculate_file(str(path))
+
+
+def test_calculate_file_compression_error(tmp_path):
+    """
+    GIVEN file and compression that is not supported
+    WHEN calculate_file is called with the path and compression
+    THEN InvalidInputError is raised.
+    """
+    path = tmp_path / "document.json"
+    path.write_text("[]")
+
+    with pytest.raises(errors.InvalidInputError):
+        calculate_file(str(path), compression="bz2")
@@ -0,0 +1,114 @@
+"""Tests for calculating the source map from the structural index."""
+
+import pytest
+
+from json_source_map import calculate, calculate_indexed, errors, line_index, structural
+
+
+@pytest.mark.parametrize("numpy", [True, False], ids=["numpy", "regex"])
+def test_index(numpy, monkeypatch):
+    """
+    GIVEN source
+    WHEN index is called with the source with and without NumPy
+    THEN the start and end of each token is returned.
+    """
+    if not numpy:
+        monkeypatch.setattr(line_index, "import_numpy", lambda: None)
+    source = '{"a\\"": [1, true],\n "b": null}'
+
+    returned_index = structural.index(source)
+
+    assert [
+        source[start:end]
+        for start, end in zip(returned_index.starts, returned_index.ends)
+    ] == [
+        "{",
+        '"a\\""',
+        ":",
+        "[",
+        "1",
+        ",",
+        "true",
+        "]",
+        ",",
+        "\n",
+        '"b"',
+        ":",
+        "null",
+        "}",
+    ]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        pytest.param('"a"', id="string"),
+        pytest.param('["\\\\", "\\\\\\"", "\\\\\\\\"]', id="backslashes"),
+        pytest.param('{"a": -1.5e3,\r\n"b" :[]} ', id="whitespace"),
+        pytest.param('["\U0001f600", "é\\u00e9"]', id="non ascii"),
+        pytest.param("12", id="number"),
+    ],
+)
+@pytest.mark.parametrize("block", [1, 2, 3, 1 << 14])
+def test_index_numpy(source, block, monkeypatch):
+    """
+    GIVEN source and the number of characters classified at once
+    WHEN index is called with the source with and without NumPy
+    THEN the same tokens are returned.
+    """
+    monkeypatch.setattr(structural, "_BLOCK", block)
+    returned_index = structural.index(source)
+
+    monkeypatch.setattr(line_index, "import_numpy", lambda: None)
+    expected_index = structural.index(source)
+    assert returned_index.starts == expected_index.starts
+    assert returned_index.ends == expected_index.ends
+
+
+CALCULATE_TESTS = [
+    pytest.param("0", id="number"),
+    pytest.param(' "value" ', id="string whitespace"),
+    pytest.param("[]", id="empty array"),
+    pytest.param("{}", id="empty object"),
+    pytest.param("[[], {}]", id="nested empty"),
+    pytest.param('[1, "a,]}", [true, null]]', id="array"),
+    pytest.param('{"a": {"b": [1, {"c": -1.5e3}]}, "d": ""}', id="object"),
+    pytest.param('{\n  "a": [\n    1,\r\n\t2\n  ]\n}\n', id="new lines"),
+    pytest.param('{"": {"\\"": "\\\\"}}', id="escaped keys"),
+    pytest.param('{"a/b": {"m~n": [0]}, "\\u0041": 1}', id="pointer escaped keys"),
+    pytest.param('["é😀", {"é😀": "é"}]', id="non-ascii"),
+]
+
+
+@pytest.mark.parametrize("units", ["codepoint", "utf16", "utf8"])
+@pytest.mark.parametrize("source", CALCULATE_TESTS)
+def test_calculate(source, units):
+    """
+    GIVEN source and units
+    WHEN calculate_indexed is called with the source and units
+    THEN the same source map as calculate is returned.
+    """
+    returned_source_map = calculate_indexed(source, units=units)
+
+    expected_source_map = calculate(source, units=units)
+    assert returned_source_map == expected_source_map
+    assert list(returned_source_map) == list(expected_source_map)
+
+
+@pytest.mark.parametrize(
+    "source, units",
+    [
+        pytest.param(True, "codepoint", id="not string"),
+        pytest.param("", "codepoint", id="empty"),
+        pytest.param("[1,]", "codepoint", id="invalid"),
+        pytest.param("0", "invalid", id="invalid units"),
+    ],
+)
+def test_calculate_error(source, units):
+    """
+    GIVEN invalid source or units
+    WHEN calculate_indexed is called with the source and units
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate_indexed(source, units=units)
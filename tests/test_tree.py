@@ -0,0 +1,176 @@
+"""Tests for the tree representation of the source map."""
+
+import pytest
+
+from json_source_map import calculate, calculate_tree, errors, tree, types
+
+SOURCE = '{"foo": [1, {"bar": null}], "a~b": {"c/d": true}, "": 0}'
+DUPLICATE_SOURCE = '{"a": {"x": 1}, "b": 2, "a": {"y": [3]}}'
+
+
+@pytest.mark.parametrize(
+    "segment, expected_escaped",
+    [
+        pytest.param("", "", id="empty"),
+        pytest.param("a", "a", id="plain"),
+        pytest.param("~", "~0", id="tilde"),
+        pytest.param("/", "~1", id="slash"),
+        pytest.param("~1", "~01", id="tilde one"),
+    ],
+)
+def test_escape_unescape(segment, expected_escaped):
+    """
+    GIVEN segment and expected escaped segment
+    WHEN escape and then unescape are called with the segment
+    THEN the expected escaped segment and then the segment are returned.
+    """
+    returned_escaped = tree.escape(segment)
+
+    assert returned_escaped == expected_escaped
+    assert tree.unescape(returned_escaped) == segment
+
+
+def test_calculate_tree_mapping():
+    """
+    GIVEN source
+    WHEN calculate_tree is called with the source
+    THEN the tree is a mapping equal to the source map.
+    """
+    returned_tree = calculate_tree("[1, [2, 3], {}]")
+
+    assert returned_tree == calculate("[1, [2, 3], {}]")
+    assert list(returned_tree) == list(calculate("[1, [2, 3], {}]"))
+    assert len(returned_tree) == 6
+    assert len(calculate_tree("1")) == 1
+
+
+def test_calculate_tree_hashes_kinds():
+    """
+    GIVEN source
+    WHEN calculate_tree is called with the source and hashes and kinds
+    THEN the tree has the same entries as the source map of calculate.
+    """
+    returned_tree = calculate_tree(SOURCE, hashes=True, kinds=True)
+
+    assert dict(returned_tree) == calculate(SOURCE, hashes=True, kinds=True)
+
+
+def test_calculate_tree_escaped():
+    """
+    GIVEN source with keys that need escaping
+    WHEN calculate_tree is called with the source
+    THEN the segments are unescaped and the pointers escaped.
+    """
+    root = tree.from_entries(
+        [
+            ("", types.Entry(types.Location(0, 0, 0), types.Location(0, 2, 2))),
+            ("/a~1b", types.Entry(types.Location(0, 1, 1), types.Location(0, 2, 2))),
+            ("/c~0", types.Entry(types.Location(0, 1, 1), types.Location(0, 2, 2))),
+        ]
+    )
+
+    assert list(root.children) == ["a/b", "c~"]
+    assert root.node("/a~1b").segment == "a/b"
+    assert root.node("/a~1b").pointer == "/a~1b"
+    assert list(root) == ["", "/a~1b", "/c~0"]
+
+
+def test_calculate_tree_navigation():
+    """
+    GIVEN source
+    WHEN calculate_tree is called with the source
+    THEN the nodes are linked to their parents and children.
+    """
+    root = calculate_tree(SOURCE)
+    source_map = calculate(SOURCE)
+
+    assert root.parent is None
+    assert root.pointer == ""
+    assert list(root.children) == ["foo", "a~b", ""]
+
+    array_node = root.children["foo"]
+    assert array_node.parent is root
+    assert list(array_node.children) == ["0", "1"]
+
+    null_node = root.node("/foo/1/bar")
+    assert null_node.segment == "bar"
+    assert null_node.pointer == "/foo/1/bar"
+    assert null_node.entry == source_map["/foo/1/bar"]
+
+    assert dict(array_node) == {
+        "": source_map["/foo"],
+        "/0": source_map["/foo/0"],
+        "/1": source_map["/foo/1"],
+        "/1/bar": source_map["/foo/1/bar"],
+    }
+    assert root["/"] == source_map["/"]
+    assert root.child("foo") is array_node
+    assert root.node("/foo/0").parent is array_node
+    assert len(array_node.children) == 2
+    assert "Node(pointer='/foo/1/bar'" in repr(null_node)
+
+
+@pytest.mark.parametrize(
+    "source_map",
+    [
+        pytest.param(calculate(DUPLICATE_SOURCE), id="source map"),
+        pytest.param(calculate_tree(DUPLICATE_SOURCE), id="tree"),
+    ],
+)
+def test_from_entries_duplicate_key(source_map):
+    """
+    GIVEN source map or tree of source with a duplicate key
+    WHEN from_entries is called with the entries
+    THEN each value is within its parent and the last value of the key is kept.
+    """
+    returned_tree = tree.from_entries(source_map.items())
+
+    assert returned_tree == calculate(DUPLICATE_SOURCE)
+    assert list(returned_tree.children) == ["a", "b"]
+    assert list(returned_tree.children["a"].children) == ["x", "y"]
+    assert returned_tree.node("/a/y/0").pointer == "/a/y/0"
+    assert len(returned_tree.children["a"]) == 4
+
+
+def test_from_entries_missing_parent():
+    """
+    GIVEN entries with a value that is not within a value of the entries
+    WHEN from_entries is called with the entries
+    THEN KeyError is raised.
+    """
+    entry = types.Entry(types.Location(0, 0, 0), types.Location(0, 2, 2))
+
+    with pytest.raises(KeyError):
+        tree.from_entries([("", entry), ("/a/b", entry)])
+
+
+@pytest.mark.parametrize(
+    "pointer",
+    [
+        pytest.param("foo", id="no leading separator"),
+        pytest.param("/missing", id="missing"),
+        pytest.param("/foo/2", id="missing nested"),
+        pytest.param("/foo/0/bar", id="within primitive"),
+    ],
+)
+def test_node_missing(pointer):
+    """
+    GIVEN pointer that is not in the tree
+    WHEN node and get are called with the pointer
+    THEN KeyError is raised and None is returned.
+    """
+    root = calculate_tree(SOURCE)
+
+    with pytest.raises(KeyError):
+        root.node(pointer)
+    assert root.get(pointer) is None
+
+
+def test_calculate_tree_invalid():
+    """
+    GIVEN invalid source
+    WHEN calculate_tree is called with the source
+    THEN InvalidInputError is raised.
+    """
+    with pytest.raises(errors.InvalidInputError):
+        calculate_tree("invalid JSON")
@@ -0,0 +1,75 @@
+"""Tests for finding the entries that overlap a range of lines."""
+
+import json
+
+import pytest
+
+from json_source_map import ViewportIndex, calculate
+
+SOURCE = '{\n  "a": [\n    1,\n    {"b": 2}\n  ],\n  "c": 3, "d": [\n\n  ]\n}'
+
+
+@pytest.mark.parametrize(
+    "first, last, expected_pointers",
+    [
+        pytest.param(0, 0, [""], id="first line"),
+        pytest.param(1, 1, ["", "/a"], id="container start"),
+        pytest.param(2, 2, ["", "/a", "/a/0"], id="enclosed"),
+        pytest.param(3, 3, ["", "/a", "/a/1", "/a/1/b"], id="nested"),
+        pytest.param(4, 5, ["", "/a", "/c", "/d"], id="container end"),
+        pytest.param(6, 6, ["", "/d"], id="empty line"),
+        pytest.param(0, 8, list(calculate(SOURCE)), id="all"),
+        pytest.param(8, 20, [""], id="after end"),
+        pytest.param(9, 20, [], id="beyond end"),
+        pytest.param(-5, -1, [], id="before start"),
+        pytest.param(3, 2, [], id="reversed"),
+    ],
+)
+def test_entries_in_lines(first, last, expected_pointers):
+    """
+    GIVEN source map and range of lines
+    WHEN entries_in_lines is called on the index of the source map with the range
+    THEN the entries that overlap the range are returned ordered by value start.
+    """
+    source_map = calculate(SOURCE)
+    index = ViewportIndex.from_source_map(source_map)
+
+    returned_source_map = index.entries_in_lines(first, last)
+
+    assert list(returned_source_map) == expected_pointers
+    for pointer in expected_pointers:
+        assert returned_source_map[pointer] is source_map[pointer]
+
+
+def test_entries_in_lines_every_range():
+    """
+    GIVEN source map of a nested document
+    WHEN entries_in_lines is called with every range of lines
+    THEN the same entries are returned as filtering the whole source map.
+    """
+    source = json.dumps(
+        {"a": [[1, {"b": [2, 3]}], {}], "c": {"d": [[]], "e": None}}, indent=1
+    ).replace("[\n", "[\n\n")
+    source_map = calculate(source)
+    index = ViewportIndex.from_source_map(source_map)
+    lines = source.count("\n") + 1
+
+    for first in range(lines):
+        for last in range(first, lines):
+            expected_pointers = [
+                pointer
+                for pointer, entry in source_map.items()
+                if entry.value_start.line <= last and entry.value_end.line >= first
+            ]
+            assert list(index.entries_in_lines(first, last)) == expected_pointers
+
+
+def test_from_source_map_empty():
+    """
+    GIVEN empty source map
+    WHEN entries_in_lines is called on its index
+    THEN no entries are returned.
+    """
+    index = ViewportIndex.from_source_map({})
+
+    assert not index.entries_in_lines(0, 10)